@@ -1,36 +1,99 @@
 import pandas as pd
 import config
 import requests
-from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from io import StringIO
 from datetime import datetime, timedelta
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
+from fred_cache import FredSeriesCache
+from fred_ingest import SERIES_REGISTRY, FredIngestionEngine, MarketDataStore
+from llm_cache import LLM_RESPONSE_CACHE, cache_key
+from market_cache import FRED_FLIGHTS, SHARED_MARKET_CACHE, frame_version
+from circuit_breaker import HTTP_CIRCUITS, CircuitBreakerAdapter
+from rate_analytics import compute_rate_analytics
+from rate_price_correlation import rate_price_correlation
+from rate_paths import simulate_outlook
+from rate_regimes import current_regime, detect_regimes
+from series_store import SeriesStore
+from affordability import affordability_grid
+from asof_index import AsOfIndex
+from derivations import DerivationCache
+from trend_backtest import backtest_trend_signal
 try:
     from anthropic import Anthropic
 except ImportError:
     Anthropic = None
 
+# Actions that only download data and can run ahead of the plan
+PREFETCHABLE_ACTIONS = ("fetch_mortgage_rates", "fetch_home_prices", "fetch_market_series")
+# Series behind rate_insights / comparison, refreshed together by revalidate_market_data
+CORE_SERIES = ("MORTGAGE30US", "CSUSHPINSA")
+# Knowledge entries backed by a registry series ("mortgage_rates" -> "MORTGAGE30US", ...)
+KNOWLEDGE_SERIES = {spec.knowledge_key: spec.series_id for spec in SERIES_REGISTRY.values() if spec.knowledge_key}
+# Derived knowledge entries and the entries they are computed from (see derivations.py)
+DERIVED_INPUTS = {
+    "rate_insights": ("mortgage_rates",),
+    "comparison": ("mortgage_rates", "home_prices"),
+    "summary": ("rate_insights", "comparison"),
+    "role_insights": ("rate_insights", "comparison", "summary"),
+    # Keyed on market data only: regenerating the summary must not discard a finished debate
+    "debate_round_1": ("rate_insights", "comparison"),
+    "debate_round_2": ("debate_round_1",),
+    "debate_round_3": ("debate_round_2",),
+    "debate_results": ("debate_round_3",),
+}
+# Debate entries are only produced on request, so stale ones are dropped rather than recomputed
+DEBATE_KEYS = ("debate_round_1", "debate_round_2", "debate_round_3", "debate_results")
+# Token counts reported in each Claude response's usage
+USAGE_FIELDS = ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens", "output_tokens")
+
 class AgenticMortgageResearchAgent:
     import config
-    def __init__(self, log_callback=None, llm_client: Optional['Anthropic'] = None, debate_db=None):
+    def __init__(self, log_callback=None, llm_client: Optional['Anthropic'] = None, debate_db=None, stream_callback=None):
         self.goal = "Understand current US mortgage rate trends and risks"
         self.knowledge = {}
         self.logs = []
         self.log_callback = log_callback
+        # stream_callback(role, delta, text_so_far) receives Claude's reply as it streams in
+        self.stream_callback = stream_callback
         self.last_fetch_dates = {}  # track when data was fetched
         self.llm_client = llm_client  # Optional Claude client for LLM-based reasoning
         self.debate_db = debate_db  # Database for storing/retrieving debate patterns
         self.session_cost = 0.0  # Track estimated LLM API costs
+        self._cost_lock = threading.Lock()  # Role calls add their cost from _map_roles' threads
+        self.llm_usage = dict.fromkeys(USAGE_FIELDS, 0)  # Session token totals, incl. prompt-cache reads/writes
+        # Replies to identical requests are reused from disk; bypass_llm_cache forces fresh ones
+        self.llm_cache = LLM_RESPONSE_CACHE if config.LLM_CACHE_ENABLED else None
+        self.bypass_llm_cache = False
         # Initialize fetch_timestamps in knowledge for dashboard status display
         self.knowledge["fetch_timestamps"] = {}
+        # Independent FRED downloads run ahead of the plan here (I/O bound, so threads are enough).
+        # Owned by the agent, not the module, which the dashboard reloads on every rerun
+        self._fetch_pool = ThreadPoolExecutor(max_workers=config.FRED_MAX_WORKERS, thread_name_prefix="fred-fetch")
+        # Per-thread log buffer used while an action runs on the fetch pool
+        self._log_buffer = threading.local()
+        # Per-thread Claude call state: `started` is set once the reply begins streaming (see _map_roles)
+        self._call_state = threading.local()
+        # Pending stale-while-revalidate refresh (future from _submit_action)
+        self._background_refresh = None
+        self._last_refresh_attempt = datetime.min  # when the last background refresh was submitted
+        # Input-version stamps of derived entries (rate_insights, comparison, summary, ...)
+        self.derivations = DerivationCache(self.knowledge, DERIVED_INPUTS, self._knowledge_version)
         
         # Set up resilient HTTP session with retries
         self.session = self._create_resilient_session()
+        # Disk-backed series cache beneath the session (survives restarts and new sessions)
+        self.series_cache = FredSeriesCache(config.FRED_CACHE_DIR)
+        self.ingestion = FredIngestionEngine(self.session, self.series_cache,
+                                             shared=SHARED_MARKET_CACHE, flights=FRED_FLIGHTS)
+        # All downloaded FRED series, aligned on date; mortgage_rates/home_prices are views into it
+        self.market_data = MarketDataStore(shared=SHARED_MARKET_CACHE)
+        self.knowledge["market_data"] = self.market_data
     
     def _create_resilient_session(self):
-        """Create a requests session with retry logic for API calls."""
+        """Create a requests session with retry logic, per-host circuit breakers and adaptive timeouts."""
         session = requests.Session()
         retry_strategy = Retry(
             total=3,
@@ -38,7 +101,7 @@ class AgenticMortgageResearchAgent:
             status_forcelist=[429, 500, 502, 503, 504],
             allowed_methods=["GET"]
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = CircuitBreakerAdapter(HTTP_CIRCUITS, max_retries=retry_strategy)
         session.mount("http://", adapter)
         session.mount("https://", adapter)
         return session
@@ -47,6 +110,14 @@ class AgenticMortgageResearchAgent:
     def log(self, message: str):
         timestamp = datetime.now().strftime("%H:%M:%S")
         log_message = f"[{timestamp}] {message}"
+        buffered = getattr(self._log_buffer, "messages", None)
+        if buffered is not None:
+            # Background action: replayed in plan order by _collect_action
+            buffered.append(log_message)
+            return
+        self._emit_log(log_message)
+
+    def _emit_log(self, log_message: str):
         self.logs.append(log_message)
         if self.log_callback:
             self.log_callback(log_message)
@@ -54,6 +125,88 @@ class AgenticMortgageResearchAgent:
     def get_logs(self):
         return "\n".join(self.logs)
 
+    # ---------- Claude calls ----------
+    def _llm_text(self, prompt: str, max_tokens: int, role: Optional[str] = None, cost: float = 0.0,
+                  shared_context: Optional[str] = None) -> str:
+        """Send one user prompt to Claude and return the reply text.
+
+        shared_context is the part of the request that is identical for every role in a
+        round; it is sent as the system prompt and marked for Anthropic prompt caching,
+        so only the first call of a round pays full price for it.
+        With config.LLM_STREAMING and a stream_callback, the reply is streamed and each
+        text delta is passed on as it arrives; the returned text is the same either way.
+        A reply cached for the same model, max_tokens and prompt is returned without a
+        call (unless bypass_llm_cache is set) and adds nothing to session_cost.
+        """
+        key = cache_key(config.MODEL_NAME, max_tokens, [shared_context, prompt] if shared_context else prompt)
+        if self.llm_cache is not None and not self.bypass_llm_cache:
+            cached = self.llm_cache.get(key)
+            if cached is not None:
+                self.log(f"💾 {role or 'Planner'}: reused cached Claude reply (no API cost).")
+                self._stream_text(role, cached, cached)
+                return cached
+
+        request = {
+            "model": config.MODEL_NAME,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        if shared_context:
+            block = {"type": "text", "text": shared_context}
+            if config.LLM_PROMPT_CACHING:
+                block["cache_control"] = {"type": "ephemeral"}
+            request["system"] = [block]
+        # A caller waiting for this reply to start (prompt-cache warm-up) needs it streamed too
+        started = getattr(self._call_state, "started", None)
+        streaming = (config.LLM_STREAMING and self.stream_callback) or started is not None
+        if not (streaming and hasattr(self.llm_client.messages, "stream")):
+            message = self.llm_client.messages.create(**request)
+            text = message.content[0].text.strip()
+        else:
+            parts = []
+            with self.llm_client.messages.stream(**request) as stream:
+                for delta in stream.text_stream:
+                    if started is not None:
+                        started.set()
+                    parts.append(delta)
+                    self._stream_text(role, delta, "".join(parts))
+                message = stream.get_final_message() if hasattr(stream, "get_final_message") else None
+            text = "".join(parts).strip()
+        with self._cost_lock:
+            self.session_cost += cost
+        self._record_usage(role, getattr(message, "usage", None))
+        if self.llm_cache is not None:
+            self.llm_cache.put(key, text, config.MODEL_NAME)
+        return text
+
+    def _record_usage(self, role, usage):
+        """Add a response's token counts to llm_usage and log its prompt-cache reads/writes."""
+        if usage is None:
+            return
+        counts = {field: getattr(usage, field, None) or 0 for field in USAGE_FIELDS}
+        with self._cost_lock:
+            for field, count in counts.items():
+                self.llm_usage[field] += count
+        self.log(
+            f"🧾 {role or 'Planner'}: {counts['input_tokens']} input tokens, "
+            f"{counts['cache_read_input_tokens']} read from / {counts['cache_creation_input_tokens']} written to prompt cache, "
+            f"{counts['output_tokens']} output tokens."
+        )
+
+    @staticmethod
+    def _transcript(entries, field):
+        """Every role's `field` from one debate round, labelled by role, in role order."""
+        return "\n\n".join(f"**{name}** {data['emoji']}:\n{data.get(field, 'N/A')}" for name, data in entries.items())
+
+    def _stream_text(self, role, delta, text):
+        callback = self.stream_callback
+        if callback is None:
+            return
+        try:
+            callback(role, delta, text)
+        except Exception:
+            pass  # A display problem must not fail the call
+
     # ---------- Action dispatcher ----------
     def run_action(self, action_name: str, force: bool = False):
         if not hasattr(self, action_name):
@@ -69,17 +222,155 @@ class AgenticMortgageResearchAgent:
             raise
         return result
 
+    def _submit_action(self, action_name: str, force: bool = False):
+        """Start an action on the fetch pool; its logs are held until it is collected."""
+        def task():
+            messages = []
+            self._log_buffer.messages = messages
+            try:
+                return messages, self.run_action(action_name, force=force), None
+            except Exception as e:
+                return messages, None, e
+            finally:
+                self._log_buffer.messages = None
+        return self._fetch_pool.submit(task)
+
+    def _collect_action(self, future):
+        """Wait for a submitted action and replay its logs on the calling thread."""
+        messages, result, error = future.result()
+        self._replay_logs(messages)
+        if error is not None:
+            raise error
+        return result
+
+    def _settle_actions(self, futures):
+        """Cancel submitted actions that have not started and collect the rest, ignoring their errors.
+
+        Used when a plan stops early, so downloads already under way keep their
+        results and logs (errors were logged by run_action).
+        """
+        for future in futures:
+            if future.cancel():
+                continue
+            try:
+                self._collect_action(future)
+            except Exception:
+                pass
+
+    def _replay_logs(self, messages):
+        """Emit buffered messages, or pass them on if this thread is itself buffering."""
+        buffered = getattr(self._log_buffer, "messages", None)
+        if buffered is not None:
+            buffered.extend(messages)
+            return
+        for log_message in messages:
+            self._emit_log(log_message)
+
+    def _map_roles(self, fn, roles, shared_context: Optional[str] = None):
+        """Run fn(role) for every role at once, at most LLM_MAX_CONCURRENCY at a time.
+
+        Returns {role: (result, error)} in the order given, after every call has
+        finished (and added its cost), even when some failed. Logs written by fn are
+        held per role and replayed in that order, so the log reads the same as a
+        sequential loop no matter which call finishes first. When the roles share a
+        prompt prefix long enough for Anthropic prompt caching, the other roles are
+        sent once the first role's reply starts streaming (the cache entry is readable
+        from then on), so they read the entry it writes instead of each writing one;
+        if it has not started within LLM_PROMPT_CACHE_WAIT_SECONDS they are sent anyway.
+        The threads belong to this call only, so other sessions' calls never queue
+        ahead of it.
+        """
+        def task(role, started=None):
+            messages = []
+            self._log_buffer.messages = messages
+            self._call_state.started = started
+            try:
+                return messages, fn(role), None
+            except Exception as e:
+                return messages, None, e
+            finally:
+                self._log_buffer.messages = None
+                self._call_state.started = None
+                if started is not None:
+                    # Cache hit, failure or no streaming support: never leave the others waiting
+                    started.set()
+        roles = list(roles)
+        if not roles:
+            return {}
+        futures = []
+        workers = min(len(roles), config.LLM_MAX_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-call") as pool:
+            if self._prefix_cacheable(shared_context) and len(roles) > 1:
+                started = threading.Event()
+                first = roles.pop(0)
+                futures.append((first, pool.submit(task, first, started)))
+                if not started.wait(timeout=config.LLM_PROMPT_CACHE_WAIT_SECONDS):
+                    # Stalled before its first token: do not hold up the rest of the round
+                    self.log(f"⏱️ {first}: reply not started after {config.LLM_PROMPT_CACHE_WAIT_SECONDS:g}s "
+                             "→ sending the other roles without waiting for the prompt cache.")
+            futures += [(role, pool.submit(task, role)) for role in roles]
+            outcomes = {}
+            for role, future in futures:
+                messages, result, error = future.result()
+                self._replay_logs(messages)
+                outcomes[role] = (result, error)
+        return outcomes
+
+    @staticmethod
+    def _prefix_cacheable(shared_context: Optional[str]) -> bool:
+        """Whether a shared prefix is long enough to be cached (about 4 characters a token)."""
+        return bool(config.LLM_PROMPT_CACHING and shared_context
+                    and len(shared_context) / 4 >= config.LLM_PROMPT_CACHE_MIN_TOKENS)
+
+    def collect_background_refresh(self) -> bool:
+        """Replay the logs of a finished background refresh; True if one completed."""
+        future = self._background_refresh
+        if future is None or not future.done():
+            return False
+        self._background_refresh = None
+        try:
+            self._collect_action(future)
+        except Exception:
+            pass  # already logged by run_action; cached data stays in place
+        self.prune_stale_debate()
+        return True
+
+    def _knowledge_version(self, key: str):
+        """Version of a base knowledge entry: the series content hash for market data frames."""
+        frame = self.knowledge.get(key)
+        if frame is None:
+            return None
+        series_id = KNOWLEDGE_SERIES.get(key)
+        version = self.market_data.version(series_id, frame) if series_id else None
+        return version or frame_version(frame)
+
+    def prune_stale_debate(self):
+        """Drop debate rounds computed from market data (or an earlier round) that has since changed."""
+        changed = []
+        with self.derivations.lock:
+            for name in DEBATE_KEYS:
+                if name in self.knowledge and not self.derivations.is_current(name):
+                    changed += [dep for dep in self.derivations.changed_inputs(name) if dep not in changed]
+            removed = self.derivations.prune(DEBATE_KEYS)
+        if removed:
+            # Name the root cause, not the rounds invalidated because an earlier round went
+            causes = [dep for dep in changed if dep not in DEBATE_KEYS] or changed
+            self.log(f"{', '.join(causes) or 'Debate inputs'} changed → cleared stale debate ({', '.join(removed)}).")
+
     # ---------- Agentic planner ----------
     def agentic_plan(self, force=False):
         """Automatically decide which actions to run based on current knowledge."""
+        self.collect_background_refresh()
         self.log("🤖 Agentic planning started...")
         self.log("📊 Planner: Evaluating system state and data freshness...")
         
         # Use LLM-based planning if available, otherwise fall back to heuristics
         if self.llm_client:
-            return self._llm_based_plan(force)
+            result = self._llm_based_plan(force)
         else:
-            return self._heuristic_plan(force)
+            result = self._heuristic_plan(force)
+        self.prune_stale_debate()
+        return result
     
     def _llm_based_plan(self, force=False):
         """Use Claude to decide which actions should be executed."""
@@ -100,13 +391,14 @@ class AgenticMortgageResearchAgent:
 Current Knowledge State:
 {state_summary}
 
-Current Date: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+Current Date: {datetime.now().strftime("%Y-%m-%d")}
 Force Refresh: {force}
 
 Available actions:
 - fetch_mortgage_rates: Get latest 30-year mortgage rates from FRED
 - analyze_rates: Compute statistics on mortgage rates
 - fetch_home_prices: Get latest US home price index from FRED
+- fetch_market_series: Get additional FRED series (15Y mortgage, 10Y Treasury, CPI, Fed Funds)
 - compare_with_home_prices: Correlate rates with home prices
 - summarize_insights: Generate insights from all data
 
@@ -116,17 +408,12 @@ Based on the state above, return a JSON object with:
 Only include actions that should be run. Skip actions if data is recent and unchanged."""
 
             try:
-                message = self.llm_client.messages.create(
-                    model=config.MODEL_NAME,
-                    max_tokens=500,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                self.session_cost += 0.002  # Approximate cost for planning call
+                # Approximate cost for planning call
+                response_text = self._llm_text(prompt, max_tokens=500, cost=0.002)
             except Exception as conn_e:
                 self.log(f"LLM connection error: {conn_e}")
                 raise
             
-            response_text = message.content[0].text
             # Extract JSON from response
             try:
                 import re
@@ -144,12 +431,20 @@ Only include actions that should be run. Skip actions if data is recent and unch
                 self.log("Failed to parse LLM JSON, falling back to heuristics")
                 return self._heuristic_plan(force)
             
-            # Execute the planned actions
-            for action in actions:
-                if hasattr(self, action):
-                    self.run_action(action, force=force)
-                else:
-                    self.log(f"Skipping unknown action: {action}")
+            # Execute the planned actions; later downloads start now and are collected in order
+            planned_fetches = [a for a in actions if a in PREFETCHABLE_ACTIONS]
+            prefetched = {a: self._submit_action(a, force=force) for a in planned_fetches[1:]}
+            try:
+                for action in actions:
+                    if action in prefetched:
+                        self._collect_action(prefetched.pop(action))
+                    elif hasattr(self, action):
+                        self.run_action(action, force=force)
+                    else:
+                        self.log(f"Skipping unknown action: {action}")
+            finally:
+                # An action failed: settle the downloads still pending before falling back
+                self._settle_actions(prefetched.values())
             
             # Always summarize at the end
             if "summarize_insights" not in actions:
@@ -157,7 +452,7 @@ Only include actions that should be run. Skip actions if data is recent and unch
                 self.run_action("summarize_insights", force=force)
             
             # Auto-run Round 1 debate (initial positions) for display
-            if self.llm_client and "debate_round_1" not in self.knowledge:
+            if self.llm_client and not self.derivations.is_current("debate_round_1"):
                 self.log("🎯 Auto-generating Round 1 debate positions...")
                 self._debate_round_1_initial_positions()
             
@@ -193,6 +488,9 @@ Only include actions that should be run. Skip actions if data is recent and unch
         else:
             summary.append("- Home prices: NOT LOADED")
         
+        extra_loaded = [sid for sid in config.FRED_EXTRA_SERIES if self.market_data.get(sid) is not None]
+        summary.append(f"- Additional series: {', '.join(extra_loaded) if extra_loaded else 'NOT LOADED'}")
+
         if "comparison" in self.knowledge:
             summary.append(f"- Comparison: {self.knowledge['comparison']}")
         else:
@@ -214,31 +512,46 @@ Only include actions that should be run. Skip actions if data is recent and unch
         else:
             last_fetch = self.last_fetch_dates.get("mortgage_rates", datetime.min)
             if datetime.now() - last_fetch > timedelta(days=1):
-                fetch_rates = True
-                self.log("Mortgage rates >1 day old → will fetch.")
+                if config.STALE_WHILE_REVALIDATE:
+                    # Answer from the cached series now; frames and analytics are swapped in when ready
+                    since_attempt = datetime.now() - self._last_refresh_attempt
+                    if self._background_refresh is not None:
+                        self.log("Mortgage rates >1 day old → serving cached data, refresh already running.")
+                    elif since_attempt < timedelta(seconds=config.REVALIDATE_RETRY_SECONDS):
+                        # The last refresh did not update the data (FRED failing): back off
+                        self.log("Mortgage rates >1 day old → serving cached data, last refresh failed; retrying later.")
+                    else:
+                        self._last_refresh_attempt = datetime.now()
+                        self._background_refresh = self._submit_action("revalidate_market_data")
+                        self.log("Mortgage rates >1 day old → serving cached data, refreshing in background.")
+                else:
+                    fetch_rates = True
+                    self.log("Mortgage rates >1 day old → will fetch.")
             else:
                 self.log("Mortgage rates up-to-date → skipping fetch.")
 
+        # Home prices needed regardless of the rate move are downloaded alongside the rates
+        prices_missing = "home_prices" not in self.knowledge
+        prices_future = None
+        if fetch_rates and (prices_missing or force):
+            prices_future = self._submit_action("fetch_home_prices", force=force)
+        extras_future = None
+        if fetch_rates and config.FRED_EXTRA_SERIES:
+            extras_future = self._submit_action("fetch_market_series", force=force)
+
         if fetch_rates:
             self.run_action("fetch_mortgage_rates", force=force)
             self.last_fetch_dates["mortgage_rates"] = datetime.now()
 
-        # 2️⃣ Analyze rates
-        analyze = False
-        if "rate_insights" not in self.knowledge:
-            analyze = True
-        elif force:
-            analyze = True
-        elif fetch_rates:
-            analyze = True  # only analyze if rates updated
-        if analyze:
-            self.run_action("analyze_rates", force=force)
+        # 2️⃣ Analyze rates (only when the rates version changed since the last analysis)
+        if not self.derivations.is_current("rate_insights"):
+            self.run_action("analyze_rates")
         else:
-            self.log("Rates already analyzed → skipping.")
+            self.log("Rates already analyzed for this data → skipping.")
 
         # 3️⃣ Home prices
         fetch_prices = False
-        if "home_prices" not in self.knowledge:
+        if prices_missing:
             fetch_prices = True
             self.log("Home prices missing → will fetch.")
         elif force:
@@ -251,50 +564,85 @@ Only include actions that should be run. Skip actions if data is recent and unch
             if latest is not None and prior is not None and abs(latest - prior) > 0.25:
                 fetch_prices = True
                 self.log("Mortgage rate changed >0.25% → fetching home prices.")
-        if fetch_prices:
+        if prices_future is not None:
+            self._collect_action(prices_future)
+            self.last_fetch_dates["home_prices"] = datetime.now()
+        elif fetch_prices:
             self.run_action("fetch_home_prices", force=force)
             self.last_fetch_dates["home_prices"] = datetime.now()
         else:
             self.log("Home prices up-to-date → skipping fetch.")
 
         # 4️⃣ Compare with home prices
-        compare = False
-        if "comparison" not in self.knowledge:
-            compare = True
-        elif force:
-            compare = True
-        elif fetch_prices or fetch_rates:
-            compare = True
-        if compare:
-            self.run_action("compare_with_home_prices", force=force)
+        if not self.derivations.is_current("comparison"):
+            self.run_action("compare_with_home_prices")
         else:
-            self.log("Comparison already done → skipping.")
+            self.log("Comparison already done for this data → skipping.")
+
+        if extras_future is not None:
+            self._collect_action(extras_future)
 
-        # 5️⃣ Summarize
-        self.run_action("summarize_insights", force=force)
+        # 5️⃣ Summarize (downloads above already honoured force)
+        self.run_action("summarize_insights")
 
         self.log("🤖 Agentic planning finished.")
         return "Agentic plan executed."
 
     # ---------- Core actions ----------
+    def _cached_series(self, spec):
+        if spec.knowledge_key:
+            return self.knowledge.get(spec.knowledge_key)
+        return self.market_data.get(spec.series_id)
+
+    def _log_fetch_result(self, spec, result):
+        if result.mode == "shared":
+            self.log(f"{spec.series_id} served from shared process cache (version {result.version}).")
+        elif result.mode == "circuit_open":
+            self.log(f"⚡ FRED circuit open → serving cached {spec.series_id} without a request.")
+        elif result.mode == "coalesced":
+            self.log(f"{spec.series_id} joined an in-flight refresh from another session (version {result.version}).")
+        elif result.mode == "not_modified":
+            self.log(f"{spec.series_id} not modified → using disk cache.")
+        elif result.mode == "incremental":
+            self.log(f"Incremental fetch for {spec.series_id}: {result.rows_fetched} row(s) since {result.since.date()}.")
+
+    def _store_series(self, spec, result):
+        """Publish a refreshed series to the market data store and its knowledge entry."""
+        self._log_fetch_result(spec, result)
+        self.market_data.update(spec.series_id, result.frame, result.version, result.store)
+        key = spec.knowledge_key or spec.series_id
+        if spec.knowledge_key:
+            self.knowledge[spec.knowledge_key] = result.frame
+        # Track fetch timestamp
+        if "fetch_timestamps" not in self.knowledge:
+            self.knowledge["fetch_timestamps"] = {}
+        self.knowledge["fetch_timestamps"][key] = pd.Timestamp.now()
+
+    def _shared_derivation(self, name: str, versions, compute):
+        """Reuse an analytic other sessions computed from the same series versions.
+
+        Falls back to computing locally when any input is not a published version.
+        """
+        if not versions or any(v is None for v in versions):
+            return compute()
+        return SHARED_MARKET_CACHE.derived(name, tuple(versions), compute)
+
+    def _refresh_fred_series(self, series_id: str, force: bool = False):
+        """Fetch one registered series, appending only new observations when cached.
+
+        force asks FRED even when another session refreshed the series recently.
+        """
+        spec = SERIES_REGISTRY[series_id]
+        result = self.ingestion.refresh(spec, self._cached_series(spec),
+                                        incremental=config.FRED_INCREMENTAL_FETCH, force=force)
+        self._store_series(spec, result)
+
     def fetch_mortgage_rates(self, force=False):
         if "mortgage_rates" in self.knowledge and not force:
             return "Mortgage rates already loaded."
         self.log("⚙️ System: Fetching mortgage rates from FRED API...")
         try:
-            url = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=MORTGAGE30US"
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            df = pd.read_csv(StringIO(response.text))
-            df.columns = df.columns.str.strip()
-            df = df.rename(columns={"observation_date": "date", "MORTGAGE30US": "rate"})
-            df["date"] = pd.to_datetime(df["date"])
-            df["rate"] = pd.to_numeric(df["rate"], errors="coerce")
-            self.knowledge["mortgage_rates"] = df.dropna()
-            # Track fetch timestamp
-            if "fetch_timestamps" not in self.knowledge:
-                self.knowledge["fetch_timestamps"] = {}
-            self.knowledge["fetch_timestamps"]["mortgage_rates"] = pd.Timestamp.now()
+            self._refresh_fred_series("MORTGAGE30US", force=force)
             return "Mortgage rates fetched."
         except Exception as e:
             self.log(f"⚠️ Failed to fetch mortgage rates: {e}")
@@ -306,11 +654,27 @@ Only include actions that should be run. Skip actions if data is recent and unch
     def analyze_rates(self, force=False):
         if "mortgage_rates" not in self.knowledge or force:
             self.fetch_mortgage_rates(force=force)
+        result = self.derivations.derive("rate_insights", self._analyze_rates)
+        if result is None:
+            self.log("Rate insights current for this data → skipping analysis.")
+            return "Mortgage rates already analyzed."
+        return result
+
+    def _analyze_rates(self):
         self.log("⚙️ System: Analyzing mortgage rate trends...")
-        df = self.knowledge["mortgage_rates"].sort_values("date")
+        rates = self.knowledge["mortgage_rates"]
+        version = self.market_data.version("MORTGAGE30US", rates)
+        store = self._series_store("MORTGAGE30US", rates)
+        analytics = self._rate_analytics(store, version)
+        regimes = self._rate_regimes(store, version)
+        insights = self._shared_derivation(
+            "rate_insights", [version], lambda: self._compute_rate_insights(analytics, regimes)
+        )
+        self.knowledge["rate_analytics"] = analytics
+        self.knowledge["rate_regimes"] = regimes
         
         # Check if we have enough data
-        if df.empty or len(df) < 2:
+        if insights is None:
             self.log("⚠️ Insufficient mortgage rate data. Using placeholder insights.")
             self.knowledge["rate_insights"] = {
                 "latest_rate": 6.5,
@@ -320,36 +684,108 @@ Only include actions that should be run. Skip actions if data is recent and unch
             }
             return "Mortgage rates analyzed (insufficient data)."
         
-        latest = df.iloc[-1]
-        prior = df.iloc[-2]
-        avg_12 = df.tail(52)["rate"].mean()
-        insights = {
+        self.knowledge["rate_insights"] = dict(insights)
+        return "Mortgage rates analyzed."
+
+    def _rate_analytics(self, store, version):
+        """Rolling-analytics frame for a rates SeriesStore, extending the previous one where possible."""
+        if store is None or not len(store):
+            return None
+        previous = self.knowledge.get("rate_analytics")
+        return self._shared_derivation(
+            "rate_analytics", [version], lambda: compute_rate_analytics(store.dates, store.values, previous)
+        )
+
+    def _rate_regimes(self, store, version):
+        """Regime segmentation of a rates SeriesStore, re-segmenting only the tail of the previous one."""
+        if store is None or not len(store):
+            return None
+        previous = self.knowledge.get("rate_regimes")
+        return self._shared_derivation(
+            "rate_regimes", [version], lambda: detect_regimes(store.dates, store.values, previous)
+        )
+
+    def trend_backtest(self):
+        """Backtest of the weekly trend signal over the loaded rate history (cached per data version)."""
+        rates = self.knowledge.get("mortgage_rates")
+        if rates is None or rates.empty:
+            return None
+        version = self.market_data.version("MORTGAGE30US", rates)
+        store = self._series_store("MORTGAGE30US", rates)
+        return self._shared_derivation(
+            "trend_backtest", [version], lambda: backtest_trend_signal(store.dates, store.values)
+        )
+
+    def rate_outlook(self):
+        """Monte Carlo 12-month rate outlook at the current regime's volatility (cached per data version)."""
+        rates = self.knowledge.get("mortgage_rates")
+        if rates is None or rates.empty:
+            return None
+        version = self.market_data.version("MORTGAGE30US", rates)
+        store = self._series_store("MORTGAGE30US", rates)
+        regime = current_regime(self._rate_regimes(store, version))
+        volatility = regime["volatility"] if regime else None
+        return self._shared_derivation(
+            "rate_outlook", [version], lambda: simulate_outlook(store.dates, store.values, volatility, log=self.log)
+        )
+
+    def outlook_text(self):
+        """One-line Monte Carlo summary for the Risk Officer, or "N/A"."""
+        try:
+            outlook = self.rate_outlook()
+        except Exception as e:
+            self.log(f"⚠️ Rate outlook simulation failed: {e}")
+            outlook = None
+        if not outlook:
+            return "N/A"
+        threshold = outlook["threshold"]
+        return (
+            f"{outlook['paths']:,} simulated 12-month paths (mean-reverting toward {outlook['model'].mu:.2f}%): "
+            f"median {outlook['median_end']:.2f}%, 90% band {outlook['p5_end']:.2f}-{outlook['p95_end']:.2f}%; "
+            f"P(ending {threshold:+.2f} pts or more) {outlook['p_end_above']:.0%}, "
+            f"P(ending {-threshold:+.2f} pts or less) {outlook['p_end_below']:.0%}; "
+            f"P(touching {threshold:+.2f} pts at some point) {outlook['p_touch_above']:.0%}, "
+            f"{-threshold:+.2f} pts {outlook['p_touch_below']:.0%}"
+        )
+
+    def _role_context(self):
+        """Extra context lines for specific roles (role perspectives and Round 1 prompts)."""
+        return {
+            "Market Analyst": f"\n- Rate/price lead-lag: {self.correlation_text()}",
+            "Risk Officer": f"\n- Rate outlook (Monte Carlo): {self.outlook_text()}",
+        }
+
+    def _compute_rate_insights(self, analytics, regimes=None):
+        """Rate statistics from the analytics frame, or None if there are fewer than two rows."""
+        if analytics is None or len(analytics) < 2:
+            return None
+        latest = analytics.iloc[-1]
+        prior = analytics.iloc[-2]
+        avg_12 = latest["ma_52"]
+        regime = current_regime(regimes)
+        return {
             "latest_rate": round(latest["rate"], 2),
             "prior_rate": round(prior["rate"], 2),
             "12_month_avg": round(avg_12, 2),
             "trend_signal": "Rates Elevated" if latest["rate"] > avg_12 else "Rates Cooling",
+            "4_week_avg": round(latest["ma_4"], 2),
+            "13_week_avg": round(latest["ma_13"], 2),
+            "ewma": round(latest["ewma"], 2),
+            "volatility": round(latest["volatility"], 3),
+            "momentum_4w": round(latest["momentum_4"], 2) if pd.notna(latest["momentum_4"]) else None,
+            "momentum_13w": round(latest["momentum_13"], 2) if pd.notna(latest["momentum_13"]) else None,
+            "drawdown": round(latest["drawdown"], 2),
+            "regime": regime["regime"] if regime else None,
+            "regime_since": regime["since"].strftime("%Y-%m-%d") if regime else None,
+            "regime_age_weeks": regime["age_weeks"] if regime else None,
         }
-        self.knowledge["rate_insights"] = insights
-        return "Mortgage rates analyzed."
 
     def fetch_home_prices(self, force=False):
         if "home_prices" in self.knowledge and not force:
             return "Home prices already loaded."
         self.log("⚙️ System: Fetching home price data from FRED API...")
         try:
-            url = "https://fred.stlouisfed.org/graph/fredgraph.csv?id=CSUSHPINSA"
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            df = pd.read_csv(StringIO(response.text))
-            df.columns = df.columns.str.strip()
-            df = df.rename(columns={df.columns[0]: "date", df.columns[1]: "price"})
-            df["date"] = pd.to_datetime(df["date"])
-            df["price"] = pd.to_numeric(df["price"], errors="coerce")
-            self.knowledge["home_prices"] = df.dropna()
-            # Track fetch timestamp
-            if "fetch_timestamps" not in self.knowledge:
-                self.knowledge["fetch_timestamps"] = {}
-            self.knowledge["fetch_timestamps"]["home_prices"] = pd.Timestamp.now()
+            self._refresh_fred_series("CSUSHPINSA", force=force)
             return "Home prices fetched."
         except Exception as e:
             self.log(f"⚠️ Failed to fetch home prices: {e}")
@@ -358,54 +794,255 @@ Only include actions that should be run. Skip actions if data is recent and unch
                 self.knowledge["home_prices"] = pd.DataFrame(columns=["date", "price"])
             return f"Failed to fetch prices (using cache): {str(e)}"
 
+    def fetch_market_series(self, force=False):
+        """Fetch the additional registry series (config.FRED_EXTRA_SERIES) in parallel."""
+        specs = [SERIES_REGISTRY[sid] for sid in config.FRED_EXTRA_SERIES if sid in SERIES_REGISTRY]
+        pending = [spec for spec in specs if force or self.market_data.get(spec.series_id) is None]
+        if not pending:
+            return "Market series already loaded."
+        self.log(f"⚙️ System: Fetching {len(pending)} additional FRED series...")
+        results = self.ingestion.refresh_many(
+            pending,
+            {spec.series_id: self._cached_series(spec) for spec in pending},
+            incremental=config.FRED_INCREMENTAL_FETCH,
+            force=force,
+        )
+        failed = []
+        for spec, result in zip(pending, results):
+            if result.error is not None:
+                self.log(f"⚠️ Failed to fetch {spec.series_id}: {result.error}")
+                failed.append(spec.series_id)
+            else:
+                self._store_series(spec, result)
+        if failed:
+            return f"Market series fetched ({len(failed)} failed: {', '.join(failed)})."
+        return "Market series fetched."
+
     def compare_with_home_prices(self, force=False):
         if "mortgage_rates" not in self.knowledge or force:
             self.fetch_mortgage_rates(force=force)
         if "home_prices" not in self.knowledge or force:
             self.fetch_home_prices(force=force)
+        result = self.derivations.derive("comparison", self._compare_with_home_prices)
+        if result is None:
+            self.log("Comparison current for this data → skipping.")
+            return "Mortgage rates already compared with home prices."
+        return result
+
+    def _compare_with_home_prices(self):
         self.log("⚙️ System: Correlating rates with home price trends...")
-        m = self.knowledge["mortgage_rates"].sort_values("date")
-        h = self.knowledge["home_prices"].sort_values("date")
+        m = self.knowledge["mortgage_rates"]
+        h = self.knowledge["home_prices"]
         
         # Check if we have enough data
         if m.empty or h.empty:
             self.log("⚠️ Insufficient data for price correlation. Using placeholder.")
+            self.knowledge.pop("rate_price_correlation", None)
             self.knowledge["comparison"] = "Home prices data unavailable."
             return "Compared mortgage rates with home prices (insufficient data)."
         
-        merged = pd.merge_asof(m, h, on="date")
-        if merged.empty:
+        versions = [self.market_data.version("MORTGAGE30US", m), self.market_data.version("CSUSHPINSA", h)]
+        comparison = self._shared_derivation(
+            "comparison", versions, lambda: self._compute_comparison(m, h, *versions)
+        )
+        self.knowledge["rate_price_correlation"] = self._rate_price_correlation(m, h, *versions)
+        if comparison is None:
             self.log("⚠️ No matching dates for correlation. Using placeholder.")
             self.knowledge["comparison"] = "Home prices data unavailable."
             return "Compared mortgage rates with home prices (no matching data)."
         
-        latest = merged.iloc[-1]
-        year_ago_date = latest['date'] - pd.DateOffset(years=1)
-        year_ago = merged.iloc[(merged['date'] - year_ago_date).abs().argsort()[0]]
-        trend = "rising" if latest["price"] > year_ago["price"] else "falling"
-        self.knowledge["comparison"] = (
+        self.knowledge["comparison"] = comparison
+        return "Compared mortgage rates with home prices."
+
+    def _series_index(self, series_id: str, frame, version=None):
+        """As-of date index for a series frame, shared per published version."""
+        if frame is None or frame.empty:
+            return None
+        store = self.market_data.store(series_id) if self.market_data.version(series_id, frame) else None
+        if store is not None:
+            # Zero-copy over the stored arrays
+            return self._shared_derivation(f"asof_index:{series_id}", [version], lambda: AsOfIndex.from_store(store))
+        column = SERIES_REGISTRY[series_id].column
+        return self._shared_derivation(f"asof_index:{series_id}", [version], lambda: AsOfIndex(frame, column))
+
+    def series_index(self, series_id: str):
+        """As-of index over the series currently in knowledge (WoW/MoM/YoY lookups), or None."""
+        spec = SERIES_REGISTRY[series_id]
+        frame = self.knowledge.get(spec.knowledge_key) if spec.knowledge_key else self.market_data.get(series_id)
+        return self._series_index(series_id, frame, self.market_data.version(series_id, frame))
+
+    def _series_store(self, series_id: str, frame):
+        """SeriesStore for a frame: the stored arrays when it is the stored version, else a copy."""
+        if self.market_data.version(series_id, frame):
+            store = self.market_data.store(series_id)
+            if store is not None:
+                return store
+        return SeriesStore.from_frame(series_id, SERIES_REGISTRY[series_id].column, frame)
+
+    def _rate_price_correlation(self, rates, prices, rates_version=None, prices_version=None):
+        """Lagged rate-change / home-price-YoY correlation profile, shared per pair of versions."""
+        if rates is None or rates.empty or prices is None or prices.empty:
+            return None
+        return self._shared_derivation(
+            "rate_price_correlation",
+            [rates_version, prices_version],
+            lambda: rate_price_correlation(
+                self._series_store("MORTGAGE30US", rates), self._series_store("CSUSHPINSA", prices)
+            ),
+        )
+
+    def correlation_text(self):
+        """One-line lead/lag summary for the Market Analyst, or "N/A"."""
+        corr = self.knowledge.get("rate_price_correlation")
+        if not corr:
+            return "N/A"
+        return (
+            f"YoY rate changes correlate {corr['correlation']:+.2f} with home-price YoY "
+            f"{corr['best_lag_months']} months later (monthly since {corr['since']:%Y}); "
+            f"that lag holds in {corr['lag_stability']:.0%} of rolling 5-year windows and its sign in "
+            f"{corr['sign_stability']:.0%}; latest 5-year correlation {corr['recent_correlation']:+.2f}"
+        )
+
+    def typical_home_price(self):
+        """config.AFFORDABILITY_REFERENCE_PRICE moved by the home-price index since its reference date."""
+        index = self.series_index("CSUSHPINSA")
+        if index is None:
+            return None
+        reference = index.asof(config.AFFORDABILITY_REFERENCE_DATE) or index.asof(index.dates[0])
+        return config.AFFORDABILITY_REFERENCE_PRICE * index.latest()[1] / reference[1]
+
+    def affordability(self):
+        """Affordability scenario grid around the current rate and typical price (cached per data version)."""
+        latest_rate = self.knowledge.get("rate_insights", {}).get("latest_rate")
+        typical_price = self.typical_home_price()
+        if latest_rate is None or typical_price is None:
+            return None
+        versions = [
+            self.market_data.version("MORTGAGE30US", self.knowledge.get("mortgage_rates")),
+            self.market_data.version("CSUSHPINSA", self.knowledge.get("home_prices")),
+        ]
+        return self._shared_derivation(
+            "affordability", versions, lambda: affordability_grid(float(latest_rate), typical_price)
+        )
+
+    def _compute_comparison(self, rates, prices, rates_version=None, prices_version=None):
+        """Year-over-year home price statement, or None if the series do not overlap."""
+        rate_index = self._series_index("MORTGAGE30US", rates, rates_version)
+        price_index = self._series_index("CSUSHPINSA", prices, prices_version)
+        if rate_index is None or price_index is None:
+            return None
+        latest_date = rate_index.latest()[0]
+        latest = price_index.asof(latest_date)
+        if latest is None:
+            return None
+        year_ago = price_index.lag("YoY", latest_date) or price_index.asof(price_index.dates[0])
+        trend = "rising" if latest[1] > year_ago[1] else "falling"
+        return (
             f"Home prices are {trend} year-over-year "
-            f"(latest index: {round(latest['price'], 1)})."
+            f"(latest index: {round(latest[1], 1)})."
         )
-        return "Compared mortgage rates with home prices."
+
+    def revalidate_market_data(self, force=False):
+        """Refresh rates and home prices, then publish frames and derived analytics together.
+
+        Runs off the script thread for stale-while-revalidate: nothing is written until
+        both series are in and rate_insights/comparison are recomputed. The new frames,
+        entries and derivation stamps are then published under the derivations lock, so
+        readers never see new frames with old analytics or new entries with old stamps.
+        """
+        self.log("⚙️ System: Revalidating market data in the background...")
+        specs = [SERIES_REGISTRY[sid] for sid in CORE_SERIES]
+        results = self.ingestion.refresh_many(
+            specs,
+            {spec.series_id: self._cached_series(spec) for spec in specs},
+            incremental=config.FRED_INCREMENTAL_FETCH,
+            force=force,
+        )
+        frames = {}
+        versions = {}
+        stores = {}
+        for spec, result in zip(specs, results):
+            if result.error is not None:
+                self.log(f"⚠️ Failed to refresh {spec.series_id}: {result.error}")
+            else:
+                self._log_fetch_result(spec, result)
+                frames[spec.series_id] = result.frame
+                versions[spec.series_id] = result.version
+                stores[spec.series_id] = result.store
+        if not frames:
+            return "Market data revalidation failed (serving cached data)."
+
+        rates = frames.get("MORTGAGE30US", self.knowledge.get("mortgage_rates"))
+        prices = frames.get("CSUSHPINSA", self.knowledge.get("home_prices"))
+        rates_version = versions.get("MORTGAGE30US", self.market_data.version("MORTGAGE30US", rates))
+        prices_version = versions.get("CSUSHPINSA", self.market_data.version("CSUSHPINSA", prices))
+        now = pd.Timestamp.now()
+        timestamps = dict(self.knowledge.get("fetch_timestamps", {}))
+        updates = {}
+        for spec in specs:
+            if spec.series_id in frames:
+                updates[spec.knowledge_key] = frames[spec.series_id]
+                timestamps[spec.knowledge_key] = now
+        updates["fetch_timestamps"] = timestamps
+        insights = None
+        if rates is not None:
+            rates_store = stores.get("MORTGAGE30US")
+            if rates_store is None:
+                rates_store = self._series_store("MORTGAGE30US", rates)
+            analytics = self._rate_analytics(rates_store, rates_version)
+            regimes = self._rate_regimes(rates_store, rates_version)
+            insights = self._shared_derivation(
+                "rate_insights", [rates_version], lambda: self._compute_rate_insights(analytics, regimes)
+            )
+        if insights is not None:
+            updates["rate_analytics"] = analytics
+            updates["rate_regimes"] = regimes
+            updates["rate_insights"] = dict(insights)
+        comparison = None
+        if rates is not None and prices is not None:
+            comparison = self._shared_derivation(
+                "comparison",
+                [rates_version, prices_version],
+                lambda: self._compute_comparison(rates, prices, rates_version, prices_version),
+            )
+        if comparison is not None:
+            updates["comparison"] = comparison
+            updates["rate_price_correlation"] = self._rate_price_correlation(
+                rates, prices, rates_version, prices_version
+            )
+
+        # Frames, entries and their stamps become visible to the script thread together
+        with self.derivations.lock:
+            self.market_data.update_many(frames, versions, stores)
+            self.knowledge.update(updates)
+            for name in ("rate_insights", "comparison"):
+                # Unchanged inputs keep the existing stamp so nothing downstream is recomputed
+                if name in updates and not self.derivations.is_current(name):
+                    self.derivations.record(name)
+            for spec in specs:
+                if spec.series_id in frames:
+                    self.last_fetch_dates[spec.knowledge_key] = now.to_pydatetime()
+        return f"Market data revalidated ({', '.join(frames)})."
 
     def summarize_insights(self, force=False):
-        if "rate_insights" not in self.knowledge or force:
+        if force or not self.derivations.is_current("rate_insights"):
             self.analyze_rates(force=force)
-        if "comparison" not in self.knowledge or force:
+        if force or not self.derivations.is_current("comparison"):
             self.compare_with_home_prices(force=force)
         
-        # Use LLM for insights if available, otherwise use simple summary
-        if self.llm_client:
-            summary = self._llm_based_insights()
-        else:
-            summary = self._simple_summary()
+        # Use LLM for insights if available, otherwise use simple summary;
+        # both are skipped while the summary matches the current insights
+        summary = self.derivations.derive(
+            "summary", self._llm_based_insights if self.llm_client else self._simple_summary, force=force
+        )
+        if summary is None:
+            self.log("Summary current for this data → skipping.")
+            summary = self.knowledge["summary"]
 
-        if "role_insights" not in self.knowledge or force:
-            if self.llm_client:
-                self._llm_role_insights()
-            else:
-                self._simple_role_insights()
+        self.derivations.derive(
+            "role_insights", self._llm_role_insights if self.llm_client else self._simple_role_insights,
+            force=force,
+        )
 
         return summary
     
@@ -415,13 +1052,21 @@ Only include actions that should be run. Skip actions if data is recent and unch
         summary = (
             f"Current 30Y rate: {i['latest_rate']}% "
             f"(12-mo avg: {i['12_month_avg']}%).\n"
-            f"Trend: {i['trend_signal']}.\n\n"
+            f"Trend: {i['trend_signal']} (regime: {self.regime_text(i)}).\n\n"
             f"{self.knowledge['comparison']}"
         )
         self.knowledge["summary"] = summary
         self.log("Insights summarized.")
         return summary
     
+    @staticmethod
+    def regime_text(rate_insights):
+        """e.g. "falling for 22 weeks (since 2025-09-11)"."""
+        if not rate_insights.get("regime"):
+            return "N/A"
+        return (f"{rate_insights['regime']} for {rate_insights['regime_age_weeks']} weeks "
+                f"(since {rate_insights['regime_since']})")
+
     def _llm_based_insights(self):
         """Use Claude to generate sophisticated insights from mortgage and housing data."""
         self.log("⚙️ System: Generating market insights with Claude...")
@@ -430,12 +1075,12 @@ Only include actions that should be run. Skip actions if data is recent and unch
             rate_insights = self.knowledge.get("rate_insights", {})
             comparison = self.knowledge.get("comparison", "No price comparison available")
             
-            # Get recent rate trends
-            if "mortgage_rates" in self.knowledge:
-                df_rates = self.knowledge["mortgage_rates"].sort_values("date")
-                recent_rates = df_rates.tail(10)
-                rate_trend = "stable" if recent_rates["rate"].std() < 0.1 else "volatile"
-                rate_direction = "rising" if df_rates.iloc[-1]["rate"] > df_rates.iloc[-10]["rate"] else "falling"
+            # Recent rate trends, precomputed by analyze_rates
+            analytics = self.knowledge.get("rate_analytics")
+            if analytics is not None and len(analytics) >= 10:
+                latest = analytics.iloc[-1]
+                rate_trend = "stable" if latest["volatility"] < 0.1 else "volatile"
+                rate_direction = "rising" if latest["momentum_9"] > 0 else "falling"
             else:
                 rate_trend = "unknown"
                 rate_direction = "unknown"
@@ -446,6 +1091,7 @@ Only include actions that should be run. Skip actions if data is recent and unch
 - Current 30-year rate: {rate_insights.get('latest_rate', 'N/A')}%
 - 12-month average: {rate_insights.get('12_month_avg', 'N/A')}%
 - Trend signal: {rate_insights.get('trend_signal', 'N/A')}
+- Rate regime: {self.regime_text(rate_insights)}
 - Recent trend: {rate_direction} ({rate_trend})
 
 ## Housing Market Data:
@@ -458,14 +1104,9 @@ Based on this data, provide:
 
 Keep the response concise and actionable."""
 
-            message = self.llm_client.messages.create(
-                model=config.MODEL_NAME,
-                max_tokens=400,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            self.session_cost += 0.003  # Approximate cost for insights call
+            # Approximate cost for insights call
+            summary = self._llm_text(prompt, max_tokens=400, role="Summary", cost=0.003)
             
-            summary = message.content[0].text
             self.knowledge["summary"] = summary
             self.log("LLM-based insights generated.")
             return summary
@@ -500,13 +1141,13 @@ Keep the response concise and actionable."""
 
     def generate_role_perspectives(self, force=False):
         """Public action to generate multi-agent role perspectives."""
-        if not force and "role_insights" in self.knowledge:
+        if not force and self.derivations.is_current("role_insights"):
             return "Multi-agent perspectives already generated."
         
         if self.llm_client is None:
             return "LLM client not available. Cannot generate role perspectives."
         
-        self._llm_role_insights()
+        self.derivations.derive("role_insights", self._llm_role_insights, force=True)
         return "Multi-agent perspectives generated successfully."
 
     def _llm_role_insights(self):
@@ -527,29 +1168,38 @@ Keep the response concise and actionable."""
             "Market Analyst": "📉",
             "Risk Officer": "🛡️"
         }
+        role_context = self._role_context()
 
-        role_outputs = {}
-        for role, role_prompt in role_prompts.items():
+        for role in role_prompts:
             self.log(f"{role_emojis[role]} {role}: Analyzing data and generating perspective...")
-            
-            prompt = f"""{role_prompt}
+
+        # Identical for every role, so it is sent once as a cacheable prefix
+        shared_context = f"""Three agents (Planner, Market Analyst, Risk Officer) each give their perspective on the US mortgage market.
 
 Context:
 - Summary: {summary}
 - Current 30-year rate: {rate_insights.get('latest_rate', 'N/A')}%
 - 12-month average: {rate_insights.get('12_month_avg', 'N/A')}%
 - Trend signal: {rate_insights.get('trend_signal', 'N/A')}
-- Housing: {comparison}
+- Rate regime: {self.regime_text(rate_insights)}
+- Housing: {comparison}"""
+
+        def generate(role):
+            extra = f"\n\nAdditional context for your role:{role_context[role]}" if role in role_context else ""
+            prompt = f"""{role_prompts[role]}{extra}
 
 Provide 2-3 concise bullet points for your perspective."""
 
-            message = self.llm_client.messages.create(
-                model=config.MODEL_NAME,
-                max_tokens=250,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            self.session_cost += 0.002  # Approximate cost per role perspective
-            role_outputs[role] = message.content[0].text.strip()
+            # Approximate cost per role perspective
+            return self._llm_text(prompt, max_tokens=250, role=role, cost=0.002, shared_context=shared_context)
+
+        # The three calls are independent: run them together and collect in role order.
+        # Roles that succeeded were already billed in _llm_text, so re-raising drops no cost
+        role_outputs = {}
+        for role, (text, error) in self._map_roles(generate, role_prompts, shared_context).items():
+            if error is not None:
+                raise error
+            role_outputs[role] = text
 
         self.knowledge["role_insights"] = role_outputs
 
@@ -569,9 +1219,9 @@ Provide 2-3 concise bullet points for your perspective."""
         self.log("🎯 Starting Multi-Round Agent Debate System...")
         
         # Ensure we have data to debate about
-        if "rate_insights" not in self.knowledge:
+        if not self.derivations.is_current("rate_insights"):
             self.analyze_rates()
-        if "comparison" not in self.knowledge:
+        if not self.derivations.is_current("comparison"):
             self.compare_with_home_prices()
         
         # Round 1: Initial Positions
@@ -616,11 +1266,7 @@ Provide 2-3 concise bullet points for your perspective."""
         """Round 1: Each agent presents their initial position."""
         self.log("📋 Round 1: Initial Positions")
 
-        # Reset downstream rounds when starting a new debate cycle.
-        for key in ("debate_round_2", "debate_round_3", "debate_results"):
-            if key in self.knowledge:
-                del self.knowledge[key]
-        
+        inputs = self.derivations.inputs("debate_round_1")
         rate_insights = self.knowledge.get("rate_insights", {})
         comparison = self.knowledge.get("comparison", "No comparison available")
         summary = self.knowledge.get("summary", "Basic market summary")
@@ -645,17 +1291,19 @@ Provide 2-3 concise bullet points for your perspective."""
             }
         }
         
-        debate_positions = {}
-        
+        role_context = self._role_context()
+
         for role_name, role_config in roles.items():
             self.log(f"{role_config['emoji']} {role_name}: Formulating initial position...")
-            try:
-                prompt = f"""{role_config['prompt']}{learned_patterns}
+
+        # Lessons, market context and task are the same for every role: one cacheable prefix
+        shared_context = f"""Three agents (Planner, Market Analyst, Risk Officer) are debating the US mortgage rate outlook.{learned_patterns}
 
 Market Context:
 - Current 30-year mortgage rate: {rate_insights.get('latest_rate', 'N/A')}%
 - 12-month average rate: {rate_insights.get('12_month_avg', 'N/A')}%
 - Trend signal: {rate_insights.get('trend_signal', 'N/A')}
+- Rate regime: {self.regime_text(rate_insights)}
 - Housing market: {comparison}
 - Overall summary: {summary}
 
@@ -665,65 +1313,75 @@ Task:
 3. At the very end, on a new line, state your overall confidence as: Confidence level: XX% (one value only, do not include confidence in any bullet points or anywhere else).
 """
 
-                message = self.llm_client.messages.create(
-                    model=config.MODEL_NAME,
-                    max_tokens=300,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                self.session_cost += 0.003
-                position_text = message.content[0].text.strip()
+        def initial_position(role_name):
+            extra = f"\n\nAdditional context for your role:{role_context[role_name]}" if role_name in role_context else ""
+            prompt = f"""{roles[role_name]['prompt']}{extra}
 
-                # Improved stance extraction: find all 'Initial Position' lines and use the first valid stance
-                import re
-                stance = "NEUTRAL"
-                confidence = 70.0  # default
-                stance_matches = re.findall(r'Initial Position[:\-]?\s*(BULLISH|BEARISH|NEUTRAL)', position_text, re.IGNORECASE)
-                if stance_matches:
-                    stance_val = stance_matches[0].strip().upper()
-                    if "BULLISH" in stance_val:
-                        stance = "BULLISH"
-                    elif "BEARISH" in stance_val:
-                        stance = "BEARISH"
-                    elif "NEUTRAL" in stance_val:
-                        stance = "NEUTRAL"
-                else:
-                    # Fallback: search for stance anywhere
-                    if "BULLISH" in position_text.upper():
-                        stance = "BULLISH"
-                    elif "BEARISH" in position_text.upper():
-                        stance = "BEARISH"
-                    elif "NEUTRAL" in position_text.upper():
-                        stance = "NEUTRAL"
-
-                # Improved confidence extraction: find all confidence values (including parenthetical and inline)
-                conf_matches = re.findall(r'(\d+(?:\.\d+)?)%\s*confidence|confidence:?\s*(\d+(?:\.\d+)?)%|confidence level:?\s*(\d+(?:\.\d+)?)%|confidence level of (\d+(?:\.\d+)?)%|\((\d+(?:\.\d+)?)%\)', position_text, re.IGNORECASE)
-                # Flatten and filter out empty matches
-                conf_values = [float(val) for group in conf_matches for val in group if val]
-                if conf_values:
-                    confidence = conf_values[0]  # Use only the first confidence value found
-
-                # Log for debugging
-                self.log(f"DEBUG: Round 1 position_text = {position_text}")
-                self.log(f"DEBUG: Extracted stance = {stance}, confidence = {confidence}")
-
-                debate_positions[role_name] = {
-                    "round": 1,
-                    "position": position_text,
-                    "stance": stance,
-                    "confidence": confidence,
-                    "emoji": role_config['emoji']
-                }
-            except Exception as e:
-                self.log(f"❌ ERROR generating initial position for {role_name}: {e}")
-                debate_positions[role_name] = {
-                    "round": 1,
-                    "position": f"ERROR: {e}",
-                    "stance": "NEUTRAL",
-                    "confidence": 0.0,
-                    "emoji": role_config['emoji']
-                }
+Give your initial position following the task above."""
+
+            position_text = self._llm_text(prompt, max_tokens=300, role=role_name, cost=0.003,
+                                           shared_context=shared_context)
+
+            # Improved stance extraction: find all 'Initial Position' lines and use the first valid stance
+            import re
+            stance = "NEUTRAL"
+            confidence = 70.0  # default
+            stance_matches = re.findall(r'Initial Position[:\-]?\s*(BULLISH|BEARISH|NEUTRAL)', position_text, re.IGNORECASE)
+            if stance_matches:
+                stance_val = stance_matches[0].strip().upper()
+                if "BULLISH" in stance_val:
+                    stance = "BULLISH"
+                elif "BEARISH" in stance_val:
+                    stance = "BEARISH"
+                elif "NEUTRAL" in stance_val:
+                    stance = "NEUTRAL"
+            else:
+                # Fallback: search for stance anywhere
+                if "BULLISH" in position_text.upper():
+                    stance = "BULLISH"
+                elif "BEARISH" in position_text.upper():
+                    stance = "BEARISH"
+                elif "NEUTRAL" in position_text.upper():
+                    stance = "NEUTRAL"
+
+            # Improved confidence extraction: find all confidence values (including parenthetical and inline)
+            conf_matches = re.findall(r'(\d+(?:\.\d+)?)%\s*confidence|confidence:?\s*(\d+(?:\.\d+)?)%|confidence level:?\s*(\d+(?:\.\d+)?)%|confidence level of (\d+(?:\.\d+)?)%|\((\d+(?:\.\d+)?)%\)', position_text, re.IGNORECASE)
+            # Flatten and filter out empty matches
+            conf_values = [float(val) for group in conf_matches for val in group if val]
+            if conf_values:
+                confidence = conf_values[0]  # Use only the first confidence value found
+
+            # Log for debugging
+            self.log(f"DEBUG: Round 1 position_text = {position_text}")
+            self.log(f"DEBUG: Extracted stance = {stance}, confidence = {confidence}")
+
+            return {
+                "round": 1,
+                "position": position_text,
+                "stance": stance,
+                "confidence": confidence,
+                "emoji": roles[role_name]['emoji']
+            }
+
+        # Roles answer concurrently; results and logs are taken in role order
+        debate_positions = {}
+        for role_name, (position, error) in self._map_roles(initial_position, roles, shared_context).items():
+            if error is None:
+                debate_positions[role_name] = position
+                continue
+            self.log(f"❌ ERROR generating initial position for {role_name}: {error}")
+            debate_positions[role_name] = {
+                "round": 1,
+                "position": f"ERROR: {error}",
+                "stance": "NEUTRAL",
+                "confidence": 0.0,
+                "emoji": roles[role_name]['emoji']
+            }
         
         self.knowledge["debate_round_1"] = debate_positions
+        self.derivations.record("debate_round_1", inputs)
+        # Rounds 2/3 from the previous cycle no longer match this round 1
+        self.derivations.prune(DEBATE_KEYS[1:])
         self.log("✓ Round 1 complete: All initial positions recorded")
     
     def _debate_round_2_cross_examination(self):
@@ -734,34 +1392,26 @@ Task:
         if not round_1_positions:
             self.log("ERROR: Round 1 not completed. Cannot proceed to Round 2.")
             return
+        inputs = self.derivations.inputs("debate_round_2")
         
         # Get learned patterns from previous validated debates
         learned_patterns = ""
         if self.debate_db:
             learned_patterns = self.debate_db.get_patterns_summary_for_agents()
         
-        round_2_responses = {}
-        
         for role_name, agent_data in round_1_positions.items():
-            # Get the other agents' positions
-            other_positions = {k: v for k, v in round_1_positions.items() if k != role_name}
-            
-            other_positions_text = "\n\n".join([
-                f"**{name}** {data['emoji']}:\n{data['position']}"
-                for name, data in other_positions.items()
-            ])
-            
             self.log(f"{agent_data['emoji']} {role_name}: Reviewing peer positions and responding...")
-            
-            prompt = f"""You are the {role_name}. You previously stated:
 
-YOUR POSITION:
-{agent_data['position']}{learned_patterns}
+        # Every role reads the same Round 1 transcript: send it once as a cacheable prefix
+        shared_context = f"""Three agents (Planner, Market Analyst, Risk Officer) are debating the US mortgage rate outlook.{learned_patterns}
+
+ROUND 1 POSITIONS:
 
-Now you have seen the positions from your peer agents:
+{self._transcript(round_1_positions, 'position')}"""
 
-PEER POSITIONS:
-{other_positions_text}
+        def cross_examine(role_name):
+            agent_data = round_1_positions[role_name]
+            prompt = f"""You are the {role_name}. Your own Round 1 position is the one under **{role_name}** above; the others are your peer agents' positions.
 
 Task: 
 1. Identify ONE specific point from the peer positions that you either:
@@ -772,23 +1422,25 @@ Task:
 
 Provide 2-3 bullet points. Be specific about which agent you're addressing."""
 
-            message = self.llm_client.messages.create(
-                model=config.MODEL_NAME,
-                max_tokens=600,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            self.session_cost += 0.003
+            response_text = self._llm_text(prompt, max_tokens=600, role=role_name, cost=0.003,
+                                           shared_context=shared_context)
             
-            response_text = message.content[0].text.strip()
-            
-            round_2_responses[role_name] = {
+            return {
                 "round": 2,
                 "original_position": agent_data['position'],
                 "cross_examination": response_text,
                 "emoji": agent_data['emoji']
             }
+
+        # All roles respond to the same round 1, so they can answer concurrently
+        round_2_responses = {}
+        for role_name, (response, error) in self._map_roles(cross_examine, round_1_positions, shared_context).items():
+            if error is not None:
+                raise error
+            round_2_responses[role_name] = response
         
         self.knowledge["debate_round_2"] = round_2_responses
+        self.derivations.record("debate_round_2", inputs)
         self.log("✓ Round 2 complete: All cross-examinations recorded")
     
     def _debate_round_3_consensus(self):
@@ -801,16 +1453,30 @@ Provide 2-3 bullet points. Be specific about which agent you're addressing."""
         if not round_1 or not round_2:
             self.log("ERROR: Previous rounds not completed. Cannot proceed to Round 3.")
             return
+        inputs = self.derivations.inputs("debate_round_3")
         
         # Get learned patterns from previous validated debates
         learned_patterns = ""
         if self.debate_db:
             learned_patterns = self.debate_db.get_patterns_summary_for_agents()
         
-        final_votes = {}
-        vote_stances = []
-        
-        for role_name in round_1.keys():
+        for role_name, agent_r1 in round_1.items():
+            self.log(f"{agent_r1['emoji']} {role_name}: Casting final vote...")
+
+        # Lessons and the voting task are shared; each voter still sees only its own history
+        shared_context = f"""Three agents (Planner, Market Analyst, Risk Officer) are debating the US mortgage rate outlook.{learned_patterns}
+
+Task: Cast your FINAL VOTE on the mortgage rate outlook:
+1. Choose: BULLISH (rates falling), BEARISH (rates rising/high), or NEUTRAL
+2. Provide final confidence level (0-100%)
+3. Give 1-2 sentences justifying your vote
+
+Format your response as:
+VOTE: [BULLISH/BEARISH/NEUTRAL]
+CONFIDENCE: [0-100]%
+REASONING: [your justification]"""
+
+        def final_vote(role_name):
             agent_r1 = round_1[role_name]
             agent_r2 = round_2.get(role_name, {})
             prior_cross = agent_r2.get('cross_examination', '').upper()
@@ -821,8 +1487,7 @@ Provide 2-3 bullet points. Be specific about which agent you're addressing."""
                 if f"MAINTAIN {s}" in prior_cross or f"REMAIN {s}" in prior_cross or f"KEEP {s}" in prior_cross:
                     prior_stance = s
                     break
-            self.log(f"{agent_r1['emoji']} {role_name}: Casting final vote...")
-            prompt = f"""You are the {role_name}. Review your debate history:{learned_patterns}
+            prompt = f"""You are the {role_name}. Review your debate history:
 
 ROUND 1 - Your Initial Position:
 {agent_r1['position']}
@@ -832,23 +1497,10 @@ ROUND 2 - Your Cross-Examination Response:
 
 IMPORTANT: In Round 2, you stated your intention to {'maintain your ' + prior_stance + ' stance' if prior_stance else 'take a specific stance'}. If you change your stance in this final vote, you MUST provide a clear and specific reason for doing so. Your reasoning should explicitly mention why you are changing from your previous stance.
 
-Task: Cast your FINAL VOTE on the mortgage rate outlook:
-1. Choose: BULLISH (rates falling), BEARISH (rates rising/high), or NEUTRAL
-2. Provide final confidence level (0-100%)
-3. Give 1-2 sentences justifying your vote
-
-Format your response as:
-VOTE: [BULLISH/BEARISH/NEUTRAL]
-CONFIDENCE: [0-100]%
-REASONING: [your justification]"""
+Cast your final vote following the task and format above."""
 
-            message = self.llm_client.messages.create(
-                model=config.MODEL_NAME,
-                max_tokens=400,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            self.session_cost += 0.002
-            vote_text = message.content[0].text.strip()
+            vote_text = self._llm_text(prompt, max_tokens=400, role=role_name, cost=0.002,
+                                       shared_context=shared_context)
 
             # Parse vote using explicit VOTE: line
             stance = "NEUTRAL"
@@ -878,14 +1530,22 @@ REASONING: [your justification]"""
                     self.log(f"WARNING: {role_name} changed stance from {prior_stance} to {stance} in Round 3 without explicit justification. Appending clarification request.")
                     vote_text += f"\n\n[NOTE: You changed your stance from {prior_stance} to {stance} but did not provide a clear reason. Please explain why you changed your stance.]"
 
-            final_votes[role_name] = {
+            return {
                 "round": 3,
                 "stance": stance,
                 "confidence": confidence,
                 "reasoning": vote_text,
                 "emoji": agent_r1['emoji']
             }
-            vote_stances.append(stance)
+
+        # Votes are independent of each other; tally them in role order
+        final_votes = {}
+        vote_stances = []
+        for role_name, (vote, error) in self._map_roles(final_vote, round_1, shared_context).items():
+            if error is not None:
+                raise error
+            final_votes[role_name] = vote
+            vote_stances.append(vote["stance"])
         
         # Calculate consensus
         from collections import Counter
@@ -909,6 +1569,8 @@ REASONING: [your justification]"""
             "majority_vote": majority_vote,
             "vote_breakdown": dict(vote_counts)
         }
+        self.derivations.record("debate_round_3", inputs)
+        self.derivations.record("debate_results")
         
         self.log(f"✅ Consensus reached: {final_recommendation}")
         self.log(f"   Vote breakdown: {dict(vote_counts)}")
@@ -972,21 +1634,20 @@ REASONING: [your justification]"""
         
         # Collect market snapshot
         rate_insights = self.knowledge.get("rate_insights", {})
-        home_prices = self.knowledge.get("home_prices")
+        price_index = self.series_index("CSUSHPINSA")
         
         latest_price = None
         price_yoy = None
-        if home_prices is not None and len(home_prices) > 0:
-            latest_price = float(home_prices.iloc[-1]['price'])
-            if len(home_prices) > 12:
-                year_ago_price = float(home_prices.iloc[-13]['price'])
-                price_yoy = ((latest_price - year_ago_price) / year_ago_price) * 100
+        if price_index is not None:
+            latest_price = price_index.latest()[1]
+            price_yoy = price_index.change("YoY", pct=True)
         
         market_snapshot = {
             "mortgage_rate": rate_insights.get('latest_rate'),
             "home_price_index": latest_price,
             "rate_12mo_avg": rate_insights.get('12_month_avg'),
-            "price_yoy_change": price_yoy
+            "price_yoy_change": price_yoy,
+            "rate_regime": rate_insights.get('regime'),
         }
         
         # Save to database
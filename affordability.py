@@ -0,0 +1,149 @@
+"""
+Batch affordability scenarios for homebuyers.
+
+affordability_grid evaluates every combination of mortgage rate, home price,
+down payment, household income and loan term in one broadcast NumPy pass:
+monthly principal & interest, payment-to-income, and how many months a rate
+buy-down takes to pay for itself. The payment factor depends only on rate and
+term and the loan only on price and down payment, so the full grid is one outer
+product plus a division by income (tens of millions of scenarios a second).
+The result is small enough to precompute once per data version and slice for
+the dashboard without recomputing anything.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Grid axes: rates are offsets around the current rate, prices multiples of a typical home
+RATE_OFFSETS = np.arange(-2.0, 2.0 + 1e-9, 0.125)  # percentage points
+PRICE_MULTIPLIERS = np.round(np.arange(0.5, 2.0 + 1e-9, 0.1), 2)
+DOWN_PAYMENTS = np.array([0.035, 0.05, 0.10, 0.15, 0.20, 0.25, 0.30])
+INCOMES = np.arange(40_000, 300_000 + 1, 10_000)
+TERMS = np.array([15, 20, 30])  # years
+
+# One discount point (1% of the loan) typically buys the rate down by this much
+BUYDOWN_BPS_PER_POINT = 25
+# Common lender ceiling for housing payment as a share of gross income
+MAX_PAYMENT_TO_INCOME = 0.28
+
+
+def payment_factor(rate_pct, term_years):
+    """Monthly P&I per dollar borrowed: r / (1 - (1 + r)^-n), or 1/n at a zero rate."""
+    r = np.asarray(rate_pct, dtype=float) / 1200
+    n = np.asarray(term_years, dtype=float) * 12
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(r > 0, r / -np.expm1(-n * np.log1p(r)), 1 / n)
+
+
+def monthly_payment(rate_pct, principal, term_years):
+    """Monthly principal & interest; all arguments broadcast."""
+    return np.asarray(principal, dtype=float) * payment_factor(rate_pct, term_years)
+
+
+def buydown_break_even_months(rate_pct, term_years, points: float = 1.0):
+    """Months of payment savings needed to recover `points` of discount points.
+
+    Cost and savings both scale with the loan, so this depends only on rate and term.
+    """
+    rate_pct = np.asarray(rate_pct, dtype=float)
+    bought_down = np.maximum(rate_pct - points * BUYDOWN_BPS_PER_POINT / 100, 0.0)
+    savings = payment_factor(rate_pct, term_years) - payment_factor(bought_down, term_years)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(savings > 0, points / 100 / savings, np.inf)
+
+
+@dataclass
+class AffordabilityGrid:
+    """Precomputed scenarios; arrays are indexed [rate, price, down, income, term] (subsets as noted)."""
+    base_rate: float
+    typical_price: float
+    rates: np.ndarray
+    prices: np.ndarray
+    down_payments: np.ndarray
+    incomes: np.ndarray
+    terms: np.ndarray
+    payment: np.ndarray  # [rate, price, down, term]
+    payment_to_income: np.ndarray  # [rate, price, down, income, term]
+    break_even_months: np.ndarray  # [rate, term]
+
+    @property
+    def size(self) -> int:
+        return self.payment_to_income.size
+
+    @staticmethod
+    def _nearest(axis: np.ndarray, value) -> int:
+        return int(np.abs(axis - value).argmin())
+
+    def scenario(self, rate, price, down_payment, income, term) -> dict:
+        """Nearest precomputed scenario to the given inputs."""
+        i, j, k, m, t = (self._nearest(self.rates, rate), self._nearest(self.prices, price),
+                         self._nearest(self.down_payments, down_payment), self._nearest(self.incomes, income),
+                         self._nearest(self.terms, term))
+        return {
+            "rate": float(self.rates[i]),
+            "price": float(self.prices[j]),
+            "down_payment": float(self.down_payments[k]),
+            "income": float(self.incomes[m]),
+            "term": int(self.terms[t]),
+            "loan": float(self.prices[j] * (1 - self.down_payments[k])),
+            "payment": float(self.payment[i, j, k, t]),
+            "payment_to_income": float(self.payment_to_income[i, j, k, m, t]),
+            "break_even_months": float(self.break_even_months[i, t]),
+        }
+
+    def payment_to_income_table(self, price, down_payment, term) -> pd.DataFrame:
+        """Payment-to-income (%) by rate (rows) and income (columns) for one price/down/term slice."""
+        j = self._nearest(self.prices, price)
+        k = self._nearest(self.down_payments, down_payment)
+        t = self._nearest(self.terms, term)
+        return pd.DataFrame(
+            self.payment_to_income[:, j, k, :, t] * 100,
+            index=pd.Index(np.round(self.rates, 3), name="rate"),
+            columns=pd.Index(self.incomes, name="income"),
+        )
+
+    def max_price_table(self, down_payment, term) -> pd.DataFrame:
+        """Highest home price (on a continuous scale) within MAX_PAYMENT_TO_INCOME, by rate and income."""
+        k = self._nearest(self.down_payments, down_payment)
+        t = self._nearest(self.terms, term)
+        factor = payment_factor(self.rates, self.terms[t])
+        monthly_budget = self.incomes * MAX_PAYMENT_TO_INCOME / 12
+        max_loan = monthly_budget[None, :] / factor[:, None]
+        return pd.DataFrame(
+            max_loan / (1 - self.down_payments[k]),
+            index=pd.Index(np.round(self.rates, 3), name="rate"),
+            columns=pd.Index(self.incomes, name="income"),
+        )
+
+
+def affordability_grid(base_rate: float, typical_price: float,
+                       rate_offsets=RATE_OFFSETS, price_multipliers=PRICE_MULTIPLIERS,
+                       down_payments=DOWN_PAYMENTS, incomes=INCOMES, terms=TERMS) -> Optional[AffordabilityGrid]:
+    """Evaluate the full rates x prices x down payments x incomes x terms grid."""
+    if base_rate is None or typical_price is None or not np.isfinite([base_rate, typical_price]).all():
+        return None
+    rates = np.maximum(base_rate + np.asarray(rate_offsets, dtype=float), 0.0)
+    prices = typical_price * np.asarray(price_multipliers, dtype=float)
+    down_payments = np.asarray(down_payments, dtype=float)
+    incomes = np.asarray(incomes, dtype=float)
+    terms = np.asarray(terms)
+
+    factor = payment_factor(rates[:, None], terms[None, :])  # [rate, term]
+    loans = prices[:, None] * (1 - down_payments[None, :])  # [price, down]
+    payment = factor[:, None, None, :] * loans[None, :, :, None]  # [rate, price, down, term]
+    payment_to_income = payment[:, :, :, None, :] * (12 / incomes)[None, None, None, :, None]
+    return AffordabilityGrid(
+        base_rate=float(base_rate),
+        typical_price=float(typical_price),
+        rates=rates,
+        prices=prices,
+        down_payments=down_payments,
+        incomes=incomes,
+        terms=terms,
+        payment=payment,
+        payment_to_income=payment_to_income,
+        break_even_months=buydown_break_even_months(rates[:, None], terms[None, :]),
+    )
@@ -0,0 +1,82 @@
+"""
+Sorted-date index for as-of lookups on a single series.
+
+"As of" a date means the latest observation on or before it, found with a
+binary search (np.searchsorted) instead of sorting or scanning the frame. The
+comparison text, the saved market snapshot and the dashboard all read their
+week/month/year-over-year figures through this index, so they agree.
+"""
+
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+Horizon = Union[str, pd.DateOffset, pd.Timedelta]
+
+LAGS = {
+    "WoW": pd.DateOffset(weeks=1),
+    "MoM": pd.DateOffset(months=1),
+    "YoY": pd.DateOffset(years=1),
+}
+
+
+class AsOfIndex:
+    __slots__ = ("column", "dates", "values")
+
+    def __init__(self, frame: pd.DataFrame, column: str):
+        if not frame["date"].is_monotonic_increasing:
+            frame = frame.sort_values("date")
+        self.column = column
+        self.dates = frame["date"].to_numpy(dtype="datetime64[ns]")
+        self.values = frame[column].to_numpy(dtype=float)
+
+    @classmethod
+    def from_store(cls, store) -> "AsOfIndex":
+        """Index sharing a SeriesStore's (already sorted) arrays."""
+        index = cls.__new__(cls)
+        index.column = store.column
+        index.dates = store.dates
+        index.values = store.values
+        return index
+
+    def __len__(self):
+        return len(self.dates)
+
+    def position(self, when) -> int:
+        """Row of the last observation on or before `when`; -1 if there is none."""
+        target = np.datetime64(pd.Timestamp(when), "ns").astype(self.dates.dtype)
+        return int(np.searchsorted(self.dates, target, side="right")) - 1
+
+    def _row(self, i: int) -> Optional[Tuple[pd.Timestamp, float]]:
+        if i < 0:
+            return None
+        return pd.Timestamp(self.dates[i]), float(self.values[i])
+
+    def asof(self, when) -> Optional[Tuple[pd.Timestamp, float]]:
+        """(date, value) of the last observation on or before `when`."""
+        return self._row(self.position(when))
+
+    def latest(self) -> Optional[Tuple[pd.Timestamp, float]]:
+        return self._row(len(self.dates) - 1)
+
+    def lag(self, horizon: Horizon, when=None) -> Optional[Tuple[pd.Timestamp, float]]:
+        """Observation `horizon` before `when` (default: the latest date), e.g. lag("YoY")."""
+        offset = LAGS[horizon] if isinstance(horizon, str) else horizon
+        anchor = self.asof(when) if when is not None else self.latest()
+        if anchor is None:
+            return None
+        return self.asof(anchor[0] - offset)
+
+    def change(self, horizon: Horizon, when=None, pct: bool = False) -> Optional[float]:
+        """Change in value over `horizon` ending at `when`; percent if pct, else absolute."""
+        anchor = self.asof(when) if when is not None else self.latest()
+        prior = self.lag(horizon, when)
+        if anchor is None or prior is None:
+            return None
+        if pct:
+            return (anchor[1] - prior[1]) / prior[1] * 100 if prior[1] else None
+        return anchor[1] - prior[1]
+
+    def changes(self, horizons: Iterable[Horizon] = ("WoW", "MoM", "YoY"), pct: bool = False) -> Dict:
+        return {h: self.change(h, pct=pct) for h in horizons}
@@ -0,0 +1,116 @@
+"""
+Micro-benchmark: legacy pandas CSV path vs. typed Arrow path for fredgraph.csv payloads.
+
+Usage:
+    python benchmarks/fred_parse_benchmark.py [payload.csv] [--repeat N]
+
+With no payload file the live MORTGAGE30US CSV is downloaded; if that fails the
+payload is rebuilt from the mortgage_rates history recorded in agent_state.json.
+Reports median parse time, Python heap peak (tracemalloc) and Arrow pool peak.
+"""
+
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from io import StringIO
+
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from fred_ingest import parse_fred_csv  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Frames returned by to_pandas() can share buffers with the pool they were read
+# into, so measurement pools must outlive the results.
+_MEASUREMENT_POOLS = []
+
+
+def legacy_parse(payload: bytes) -> pd.DataFrame:
+    """The pre-Arrow pipeline: decode, StringIO, inferred read_csv, then three conversion passes."""
+    df = pd.read_csv(StringIO(payload.decode("utf-8")))
+    df.columns = df.columns.str.strip()
+    df = df.rename(columns={df.columns[0]: "date", df.columns[1]: "rate"})
+    df["date"] = pd.to_datetime(df["date"])
+    df["rate"] = pd.to_numeric(df["rate"], errors="coerce")
+    return df.dropna()
+
+
+def arrow_parse(payload: bytes) -> pd.DataFrame:
+    return parse_fred_csv(payload, "rate")
+
+
+def load_payload(path=None) -> bytes:
+    if path:
+        with open(path, "rb") as f:
+            return f.read()
+    try:
+        import requests
+        response = requests.get(config.FRED_GRAPH_URL, params={"id": "MORTGAGE30US"}, timeout=10)
+        response.raise_for_status()
+        return response.content
+    except Exception as e:
+        print(f"Live download failed ({e}); rebuilding payload from agent_state.json")
+    with open(os.path.join(ROOT, "agent_state.json"), "r", encoding="utf-8") as f:
+        state = json.load(f)
+    df = pd.read_json(StringIO(state["mortgage_rates"]))
+    df = df.rename(columns={"date": "observation_date", "rate": "MORTGAGE30US"})
+    df["observation_date"] = df["observation_date"].dt.strftime("%Y-%m-%d")
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def measure(fn, payload: bytes, repeat: int):
+    fn(payload)  # warm-up (imports, Arrow thread pool)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(payload)
+        timings.append(time.perf_counter() - start)
+
+    # A fresh proxy pool isolates the Arrow allocations made by this single run
+    gc.collect()
+    default_pool = pa.default_memory_pool()
+    pool = pa.proxy_memory_pool(default_pool)
+    _MEASUREMENT_POOLS.append(pool)
+    pa.set_memory_pool(pool)
+    tracemalloc.start()
+    try:
+        result = fn(payload)
+        _, heap_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        pa.set_memory_pool(default_pool)
+    return statistics.median(timings), heap_peak, pool.max_memory(), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("payload", nargs="?", help="fredgraph.csv file to parse")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    payload = load_payload(args.payload)
+    lines = payload.count(b"\n")
+    print(f"Payload: {len(payload) / 1024:.1f} KB, {lines} lines, {args.repeat} runs")
+
+    legacy_time, legacy_heap, legacy_pool, legacy_df = measure(legacy_parse, payload, args.repeat)
+    arrow_time, arrow_heap, arrow_pool, arrow_df = measure(arrow_parse, payload, args.repeat)
+
+    pd.testing.assert_frame_equal(legacy_df.reset_index(drop=True), arrow_df)
+
+    print(f"{'path':<8}{'median ms':>12}{'heap peak KB':>15}{'arrow peak KB':>15}")
+    print(f"{'pandas':<8}{legacy_time * 1000:>12.2f}{legacy_heap / 1024:>15.1f}{legacy_pool / 1024:>15.1f}")
+    print(f"{'arrow':<8}{arrow_time * 1000:>12.2f}{arrow_heap / 1024:>15.1f}{arrow_pool / 1024:>15.1f}")
+    print(f"Speed-up: {legacy_time / arrow_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
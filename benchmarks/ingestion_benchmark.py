@@ -0,0 +1,81 @@
+"""
+Offline ingestion benchmark against the local FRED stand-in (fred_stub_server.py).
+
+Usage:
+    python benchmarks/ingestion_benchmark.py [--runs N] [--latency-ms MS] [--error-rate P]
+                                             [--history-multiplier K] [--seed S]
+
+Each run builds a fresh agent with an empty disk cache and times a cold heuristic
+plan, then a second agent on the same cache (warm start: conditional GETs only).
+The process-wide caches (shared series, in-flight requests, circuit breakers)
+are reset before every plan so each one goes to the stand-in as a new process would.
+Server-side counters show how many requests the retry policy issued per status.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from circuit_breaker import HTTP_CIRCUITS  # noqa: E402
+from fred_stub_server import FredStubServer  # noqa: E402
+from market_cache import SHARED_MARKET_CACHE, SingleFlight  # noqa: E402
+from AgenticMortgageResearchAgent import AgenticMortgageResearchAgent  # noqa: E402
+
+
+def build_agent(stub_url: str) -> AgenticMortgageResearchAgent:
+    """Fresh agent with no process-wide state left over from the previous plan."""
+    SHARED_MARKET_CACHE.clear()
+    HTTP_CIRCUITS.reset()
+    agent = AgenticMortgageResearchAgent()
+    agent.ingestion.base_url = stub_url
+    agent.ingestion.flights = SingleFlight()
+    return agent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--history-multiplier", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stub = FredStubServer(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        retry_after=0, history_multiplier=args.history_multiplier, seed=args.seed,
+    ).start()
+    # Only request series the stand-in has recordings for
+    config.FRED_EXTRA_SERIES = [sid for sid in config.FRED_EXTRA_SERIES if sid in stub.series]
+    print(f"Stand-in at {stub.url} serving {', '.join(sorted(stub.series))}")
+
+    cold, warm = [], []
+    try:
+        for _ in range(args.runs):
+            with tempfile.TemporaryDirectory() as cache_dir:
+                config.FRED_CACHE_DIR = cache_dir
+                start = time.perf_counter()
+                build_agent(stub.url).agentic_plan()
+                cold.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                build_agent(stub.url).agentic_plan()
+                warm.append(time.perf_counter() - start)
+        stats = dict(stub.stats)
+    finally:
+        stub.stop()
+
+    print(f"cold plan: median {statistics.median(cold) * 1000:.0f} ms, max {max(cold) * 1000:.0f} ms")
+    print(f"warm plan: median {statistics.median(warm) * 1000:.0f} ms, max {max(warm) * 1000:.0f} ms")
+    print(f"requests: {stats['requests']} ({stats['by_status']}), {stats['bytes_sent'] / 1024:.1f} KB sent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Per-host circuit breakers and latency-adaptive timeouts for outbound HTTP.
+
+Each host gets a breaker with the usual three states:
+    closed     requests flow; consecutive failures are counted
+    open       requests fail immediately with CircuitOpenError until the reset delay passes
+    half_open  a single probe request is let through; success closes, failure re-opens
+
+CircuitBreakerAdapter plugs this into a requests.Session. It also replaces the
+caller's fixed timeout with one derived from the host's recent latency
+percentiles, so a slow or dead host costs seconds rather than minutes.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request while the host's circuit is open."""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"circuit open for {host} (retry in {retry_in:.0f}s)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class LatencyTracker:
+    """Rolling window of successful response times for one host."""
+
+    def __init__(self, window: int = 100):
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def __len__(self):
+        return len(self._samples)
+
+
+class CircuitBreaker:
+    def __init__(self, host: str, failure_threshold: int = config.FRED_CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = config.FRED_CIRCUIT_RESET_SECONDS,
+                 min_timeout: float = config.FRED_TIMEOUT_MIN_SECONDS,
+                 max_timeout: float = config.FRED_TIMEOUT_SECONDS,
+                 timeout_multiplier: float = config.FRED_TIMEOUT_P99_MULTIPLIER,
+                 min_samples: int = 5):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+        self.latency = LatencyTracker()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "successes": 0, "failures": 0, "short_circuited": 0, "opened": 0}
+        self.transitions = deque(maxlen=50)
+
+    def _transition(self, state: str):
+        if state != self.state:
+            self.transitions.append((time.time(), self.state, state))
+            self.state = state
+            if state == OPEN:
+                self.counters["opened"] += 1
+                self.opened_at = time.monotonic()
+
+    def before_request(self) -> bool:
+        """Admit a request; returns True if it is the half-open probe. Raises CircuitOpenError otherwise."""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.reset_seconds - (time.monotonic() - self.opened_at)
+                if remaining > 0:
+                    self.counters["short_circuited"] += 1
+                    raise CircuitOpenError(self.host, remaining)
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    self.counters["short_circuited"] += 1
+                    raise CircuitOpenError(self.host, 0)
+                self._probe_in_flight = True
+                self.counters["requests"] += 1
+                return True
+            self.counters["requests"] += 1
+            return False
+
+    def record_success(self, seconds: float, probe: bool = False):
+        with self._lock:
+            if probe:
+                self._probe_in_flight = False
+            self.counters["successes"] += 1
+            self.consecutive_failures = 0
+            self.latency.record(seconds)
+            self._transition(CLOSED)
+
+    def record_failure(self, probe: bool = False):
+        with self._lock:
+            if probe:
+                self._probe_in_flight = False
+            self.counters["failures"] += 1
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    def timeout(self) -> float:
+        """p99 latency times the multiplier, clamped; the maximum until enough samples exist."""
+        if len(self.latency) < self.min_samples:
+            return self.max_timeout
+        p99 = self.latency.percentile(0.99)
+        return max(self.min_timeout, min(self.max_timeout, p99 * self.timeout_multiplier))
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            p50 = self.latency.percentile(0.5)
+            p95 = self.latency.percentile(0.95)
+            return {
+                "host": self.host,
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "timeout_s": round(self.timeout(), 2),
+                "latency_p50_ms": None if p50 is None else round(p50 * 1000, 1),
+                "latency_p95_ms": None if p95 is None else round(p95 * 1000, 1),
+                **self.counters,
+                "transitions": [
+                    {"at": at, "from": old, "to": new} for at, old, new in self.transitions
+                ],
+            }
+
+
+class CircuitBreakerRegistry:
+    """One breaker per host, shared process-wide so every session sees the same outage."""
+
+    def __init__(self, **breaker_kwargs):
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.breaker_kwargs = breaker_kwargs
+
+    def get(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(host, **self.breaker_kwargs)
+            return breaker
+
+    def metrics(self) -> List[Dict]:
+        return [breaker.metrics() for breaker in list(self._breakers.values())]
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+
+
+def _is_host_failure(response: requests.Response) -> bool:
+    return response.status_code == 429 or response.status_code >= 500
+
+
+class CircuitBreakerAdapter(HTTPAdapter):
+    """HTTPAdapter that consults the host's breaker and applies its adaptive timeout.
+
+    The breaker sees one outcome per send(), i.e. after urllib3 has exhausted its
+    retries, so a single flaky response does not count against the host.
+    """
+
+    def __init__(self, circuits: CircuitBreakerRegistry, **kwargs):
+        self.circuits = circuits
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        breaker = self.circuits.get(urlparse(request.url).netloc)
+        probe = breaker.before_request()
+        timeout = breaker.timeout()
+        if isinstance(kwargs.get("timeout"), (int, float)):
+            timeout = min(timeout, kwargs["timeout"])
+        kwargs["timeout"] = timeout
+        start = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            breaker.record_failure(probe)
+            raise
+        if _is_host_failure(response):
+            breaker.record_failure(probe)
+        else:
+            breaker.record_success(time.perf_counter() - start, probe)
+        return response
+
+
+# Shared by every session in the process
+HTTP_CIRCUITS = CircuitBreakerRegistry()
@@ -34,6 +34,47 @@ MODEL_NAME = "claude-3-haiku-20240307"
 CACHE_VALIDITY_HOURS = 24
 RATE_CHANGE_THRESHOLD = 0.25  # percentage point
 
+# FRED data fetching
+# Override to point the agent at a stand-in server (see fred_stub_server.py)
+FRED_GRAPH_URL = os.getenv("FRED_GRAPH_URL", "https://fred.stlouisfed.org/graph/fredgraph.csv")
+FRED_TIMEOUT_SECONDS = 30
+# Per-request timeouts adapt to p99 latency x multiplier, kept within [min, FRED_TIMEOUT_SECONDS]
+FRED_TIMEOUT_MIN_SECONDS = float(os.getenv("FRED_TIMEOUT_MIN_SECONDS", "2"))
+FRED_TIMEOUT_P99_MULTIPLIER = float(os.getenv("FRED_TIMEOUT_P99_MULTIPLIER", "3"))
+# Consecutive failed requests that open a host's circuit, and how long it stays open before a probe
+FRED_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("FRED_CIRCUIT_FAILURE_THRESHOLD", "3"))
+FRED_CIRCUIT_RESET_SECONDS = float(os.getenv("FRED_CIRCUIT_RESET_SECONDS", "60"))
+# Refresh cached series by requesting only the most recent observations instead of the full history
+FRED_INCREMENTAL_FETCH = os.getenv("FRED_INCREMENTAL_FETCH", "1") == "1"
+# Trailing cached observations re-requested by an incremental refresh, so FRED revisions to
+# recent months (e.g. Case-Shiller) replace the cached values
+FRED_REVISION_WINDOW = max(1, int(os.getenv("FRED_REVISION_WINDOW", "6")))
+# Parquet copies of downloaded series plus their ETag/Last-Modified validators
+FRED_CACHE_DIR = os.getenv("FRED_CACHE_DIR", ".fred_cache")
+# Sessions reuse series another session fetched within this window (process-wide cache)
+SHARED_MARKET_DATA_TTL_SECONDS = int(os.getenv("SHARED_MARKET_DATA_TTL_SECONDS", "900"))
+# Concurrent series downloads (planner prefetch)
+FRED_MAX_WORKERS = int(os.getenv("FRED_MAX_WORKERS", "4"))
+# Serve stale market data immediately and refresh it on a background thread
+STALE_WHILE_REVALIDATE = os.getenv("STALE_WHILE_REVALIDATE", "1") == "1"
+# Minimum wait before another background refresh after one was attempted (e.g. while FRED is failing)
+REVALIDATE_RETRY_SECONDS = int(os.getenv("REVALIDATE_RETRY_SECONDS", "300"))
+# Registry series fetched alongside the mortgage rates (see fred_ingest.SERIES_REGISTRY)
+FRED_EXTRA_SERIES = [s.strip() for s in os.getenv("FRED_EXTRA_SERIES", "MORTGAGE15US,DGS10,CPIAUCSL,FEDFUNDS").split(",") if s.strip()]
+
+# Affordability scenarios: a typical US home price on a reference date, moved with the home-price index since
+AFFORDABILITY_REFERENCE_PRICE = float(os.getenv("AFFORDABILITY_REFERENCE_PRICE", "420000"))
+AFFORDABILITY_REFERENCE_DATE = os.getenv("AFFORDABILITY_REFERENCE_DATE", "2024-06-01")
+
+# Monte Carlo rate paths (rate_paths.py): paths per outlook, seed, and worker processes (1 = in-process)
+MONTE_CARLO_PATHS = int(os.getenv("MONTE_CARLO_PATHS", "50000"))
+MONTE_CARLO_SEED = int(os.getenv("MONTE_CARLO_SEED", "42"))
+MONTE_CARLO_WORKERS = int(os.getenv("MONTE_CARLO_WORKERS", "1"))
+# With several workers, runs below this many paths still simulate in-process (pool start-up costs ~0.5 s).
+# The pool is an opt-in to measure on your own host, not a speed-up: in our runs 500,000 paths were
+# slower with spawned workers (~2.9 s with 4, ~4.5 s with 2) than in-process (~2.6 s).
+MONTE_CARLO_POOL_MIN_PATHS = int(os.getenv("MONTE_CARLO_POOL_MIN_PATHS", "500000"))
+
 # Local cost guardrails
 # Detect Streamlit Cloud by checking for typical Cloud paths or env vars
 RUNNING_IN_CLOUD = (
@@ -47,6 +88,22 @@ ENABLE_LLM_PLANNING = bool(ANTHROPIC_API_KEY) and (RUNNING_IN_CLOUD or ALLOW_LLM
 # LLM usage limits (per session)
 LLM_MAX_CALLS_PER_SESSION = int(os.getenv("LLM_MAX_CALLS_PER_SESSION", "8"))
 LLM_COOLDOWN_SECONDS = int(os.getenv("LLM_COOLDOWN_SECONDS", "45"))
+# Independent per-role Claude calls in flight at once within one session's round (role perspectives, debate rounds)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "3"))
+# Stream role replies token by token to the dashboard (when a stream callback is attached)
+LLM_STREAMING = os.getenv("LLM_STREAMING", "1") == "1"
+# Persistent cache of Claude replies keyed by model, max_tokens and prompt (see llm_cache.py)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+# Mark the context shared by a round's role calls for Anthropic prompt caching (system prompt prefix).
+# The API only caches prefixes above a model-specific minimum (1024-2048 tokens); shorter ones are sent normally
+LLM_PROMPT_CACHING = os.getenv("LLM_PROMPT_CACHING", "1") == "1"
+# Smallest cacheable prefix for MODEL_NAME; above it a round's first role call runs alone to write the cache
+LLM_PROMPT_CACHE_MIN_TOKENS = int(os.getenv("LLM_PROMPT_CACHE_MIN_TOKENS", "2048"))
+# Longest the other roles wait for that first reply to start before being sent without the cache
+LLM_PROMPT_CACHE_WAIT_SECONDS = float(os.getenv("LLM_PROMPT_CACHE_WAIT_SECONDS", "30"))
 
 # Streamlit Configuration
 STREAMLIT_PAGE_TITLE = "Agentic Mortgage Research"
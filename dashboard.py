@@ -169,11 +169,17 @@ st.markdown(
 )
 import streamlit as st
 import importlib
+import threading
+from contextlib import contextmanager
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
+import numpy as np
 import altair as alt
 import AgenticMortgageResearchAgent
 import config
 from database import DebateDatabase
+from circuit_breaker import HTTP_CIRCUITS
+from affordability import BUYDOWN_BPS_PER_POINT, MAX_PAYMENT_TO_INCOME
 import sys
 import platform
 import os
@@ -597,6 +603,56 @@ if st.session_state.first_run:
 agent = st.session_state.agent
 debate_db = st.session_state.debate_db
 
+# Surface a stale-while-revalidate refresh that finished since the last rerun
+if agent.collect_background_refresh():
+    st.toast("📊 Market data refreshed in the background")
+
+# Roles whose replies stream into their own placeholder
+STREAM_ROLES = ("Planner", "Market Analyst", "Risk Officer")
+
+
+@contextmanager
+def streaming_panel(container=None):
+    """Show each role's Claude reply in its own column as tokens arrive.
+
+    The columns are added to container (default: where the caller is rendering).
+    """
+    if not config.LLM_STREAMING or not agent.llm_client:
+        yield
+        return
+    ctx = get_script_run_ctx()
+    columns = (container or st).columns(len(STREAM_ROLES))
+    placeholders = {role: col.empty() for role, col in zip(STREAM_ROLES, columns)}
+    latest = {}  # role -> text streamed so far
+
+    def on_stream(role, delta, text):
+        placeholder = placeholders.get(role)
+        if placeholder is None:
+            return
+        # Replies stream on the agent's role-call threads; bind them to this session's script run
+        add_script_run_ctx(threading.current_thread(), ctx)
+        latest[role] = text
+        placeholder.markdown(f"**{role}**\n\n{text}▌")
+
+    agent.stream_callback = on_stream
+    try:
+        yield
+    finally:
+        agent.stream_callback = None
+        # Every call has returned: show the final replies without the typing cursor
+        for role, text in latest.items():
+            placeholders[role].markdown(f"**{role}**\n\n{text}")
+
+
+@contextmanager
+def fresh_llm_replies():
+    """Skip cached Claude replies for an explicit Regenerate; the new replies replace them."""
+    agent.bypass_llm_cache = True
+    try:
+        yield
+    finally:
+        agent.bypass_llm_cache = False
+
 # Helper function to convert markdown to HTML for perspectives
 def markdown_to_html(text):
     """Convert basic markdown to HTML for role perspectives."""
@@ -659,6 +715,9 @@ def run_action_ui(action_name, force=False, use_spinner=True, requires_llm=False
 
 # ---------- Sidebar ----------
 
+# Main-area slot for role replies streamed while a sidebar control runs
+sidebar_stream_area = st.container()
+
 with st.sidebar.expander("⚙️ Agent Controls", expanded=False):
     force_refresh = st.checkbox("Force refresh (Agentic Plan only)", value=False)
 
@@ -667,13 +726,15 @@ with st.sidebar.expander("⚙️ Agent Controls", expanded=False):
         run_action_ui("agentic_plan", force=force_refresh, requires_llm=False)
     
     if st.button("📝 Regenerate Summary", help="Generate fresh executive summary"):
-        run_action_ui("summarize_insights", force=True, requires_llm=False)
+        with fresh_llm_replies():
+            run_action_ui("summarize_insights", force=True, requires_llm=False)
     
     st.divider()
     st.caption("**Debate Controls**")
     
     if st.button("🔄 Regenerate Round 1", help="Refresh initial agent positions"):
-        with st.spinner("Regenerating Round 1 positions..."):
+        with st.spinner("Regenerating Round 1 positions..."), streaming_panel(sidebar_stream_area), \
+                fresh_llm_replies():
             if not agent.llm_client:
                 st.error("LLM client required")
             else:
@@ -736,7 +797,8 @@ if should_auto_run:
                 st.session_state.status_placeholder.text("📊 Planner: Evaluating system state...")
             
             # Run the agentic plan (logs will update the placeholder via callback)
-            agent.run_action("agentic_plan", force=False)
+            with streaming_panel():
+                agent.run_action("agentic_plan", force=False)
             
             # Clear the placeholder reference
             st.session_state.status_placeholder = None
@@ -812,18 +874,19 @@ with col_status3:
 with col_status4:
     session_cost = agent.session_cost if hasattr(agent, 'session_cost') else 0.0
     st.metric(label="💵 Session Cost", value=f"${session_cost:.4f}")
+    llm_usage = getattr(agent, "llm_usage", None)
+    if llm_usage and llm_usage["input_tokens"] + llm_usage["cache_read_input_tokens"]:
+        st.caption(
+            f"Prompt cache: {llm_usage['cache_read_input_tokens']:,} tokens read, "
+            f"{llm_usage['cache_creation_input_tokens']:,} written · {llm_usage['input_tokens']:,} uncached input"
+        )
 
 # ---------- Agent Debate System ----------
+# Rounds 2/3 computed from an earlier Round 1 (or older market data) are dropped by their version stamps
+agent.prune_stale_debate()
 round_1_positions = agent.knowledge.get("debate_round_1", {})
 debate_complete = "debate_results" in agent.knowledge
 
-# If Round 1 exists but no results yet, clear stale Round 2/3 data.
-if round_1_positions and not debate_complete:
-    if "debate_round_2" in agent.knowledge:
-        del agent.knowledge["debate_round_2"]
-    if "debate_round_3" in agent.knowledge:
-        del agent.knowledge["debate_round_3"]
-
 # Show debate interface if Round 1 exists
 if round_1_positions:
     # Get debate data
@@ -912,7 +975,9 @@ if round_1_positions:
                 st.session_state.pending_debate = True
                 # Actually run the debate rounds 2 & 3
                 try:
-                    with st.spinner("Running Rounds 2 & 3 (Cross-Examination & Voting)..."):
+                    # A forced rerun must produce a new debate, not replay cached replies
+                    with st.spinner("Running Rounds 2 & 3 (Cross-Examination & Voting)..."), streaming_panel(), \
+                            fresh_llm_replies():
                         agent.run_action("continue_debate", force=True)
                     st.success("✅ Rounds 2 & 3 complete!")
                 except Exception as e:
@@ -1133,6 +1198,7 @@ Vote Breakdown: {agent.knowledge['debate_results']['vote_breakdown']}
 
 Current mortgage rate: {agent.knowledge.get('rate_insights', {}).get('latest_rate', 'N/A')}%
 12-month average: {agent.knowledge.get('rate_insights', {}).get('12_month_avg', 'N/A')}%
+Rate regime: {agent.regime_text(agent.knowledge.get('rate_insights', {}))}
 Home price trend: {agent.knowledge.get('comparison', 'N/A')}
 
 Provide:
@@ -1203,7 +1269,8 @@ Provide:
                     "Prediction": pattern['pattern'],
                     "Accuracy": round(float(pattern['accuracy']), 2),
                     "Frequency": pattern['frequency'],
-                    "Condition": pattern['condition']
+                    "Condition": pattern['condition'],
+                    "Regime": pattern.get('regime') or "—"
                 })
             df_patterns = pd.DataFrame(pattern_data)
             # Render as HTML table for bulletproof readability
@@ -1237,12 +1304,13 @@ Provide:
                   <th>Accuracy</th>
                   <th>Frequency</th>
                   <th>Condition</th>
+                  <th>Regime</th>
                 </tr>
               </thead>
               <tbody>
             """
             for _, row in df_patterns.iterrows():
-                table_html += f"<tr><td>{row['Prediction']}</td><td>{row['Accuracy']}</td><td>{row['Frequency']}</td><td>{row['Condition']}</td></tr>"
+                table_html += f"<tr><td>{row['Prediction']}</td><td>{row['Accuracy']}</td><td>{row['Frequency']}</td><td>{row['Condition']}</td><td>{row['Regime']}</td></tr>"
             table_html += "</tbody></table>"
             st.markdown(table_html, unsafe_allow_html=True)
         # Always show the formula explanation and LaTeX, even if no patterns/validation yet
@@ -1275,7 +1343,25 @@ else:
 # ---------- Visualizations ----------
 with st.expander("📈 Data Visualizations (Market Context)", expanded=False):
     st.caption("Historical mortgage rates and home prices that inform the agents' analysis")
-    
+
+    # Week/month/year-over-year changes (same as-of lookups as the comparison and saved snapshots)
+    rate_index = agent.series_index("MORTGAGE30US")
+    price_index = agent.series_index("CSUSHPINSA")
+    if rate_index is not None:
+        rate_changes = rate_index.changes()
+        change_cols = st.columns(4)
+        change_cols[0].metric("30Y Rate", f"{rate_index.latest()[1]:.2f}%")
+        for col, (label, delta) in zip(change_cols[1:], rate_changes.items()):
+            col.metric(f"Rate {label}", "n/a" if delta is None else f"{delta:+.2f} pp",
+                       delta=None if delta is None else f"{delta:+.2f}", delta_color="inverse")
+    if price_index is not None:
+        price_changes = price_index.changes(("MoM", "YoY"), pct=True)
+        change_cols = st.columns(4)
+        change_cols[0].metric("Home Price Index", f"{price_index.latest()[1]:.1f}")
+        for col, (label, delta) in zip(change_cols[1:], price_changes.items()):
+            col.metric(f"Price {label}", "n/a" if delta is None else f"{delta:+.2f}%",
+                       delta=None if delta is None else f"{delta:+.2f}%")
+
     # Mortgage Rates Chart
     if "mortgage_rates" in agent.knowledge and not agent.knowledge["mortgage_rates"].empty:
         df_rates = agent.knowledge["mortgage_rates"]
@@ -1312,17 +1398,14 @@ with st.expander("📈 Data Visualizations (Market Context)", expanded=False):
             width="stretch"
         )
     
-    # Combined normalized chart
-    if all(k in agent.knowledge for k in ["mortgage_rates", "home_prices"]):
-        df_rates = agent.knowledge["mortgage_rates"]
-        df_prices = agent.knowledge["home_prices"]
-        df_combined = pd.merge_asof(
-            df_rates.sort_values("date"),
-            df_prices.sort_values("date"),
-            on="date"
+    # Combined normalized chart (rates/prices join maintained by the market data store)
+    market_data = agent.knowledge.get("market_data")
+    df_joined = market_data.asof_joined("MORTGAGE30US", "CSUSHPINSA") if market_data is not None else None
+    if df_joined is not None:
+        df_combined = df_joined.assign(
+            rate_norm=df_joined['rate'] / df_joined['rate'].max(),
+            price_norm=df_joined['price'] / df_joined['price'].max(),
         )
-        df_combined['rate_norm'] = df_combined['rate'] / df_combined['rate'].max()
-        df_combined['price_norm'] = df_combined['price'] / df_combined['price'].max()
 
         chart_combined = alt.Chart(df_combined).transform_fold(
             ['rate_norm', 'price_norm'],
@@ -1340,6 +1423,146 @@ with st.expander("📈 Data Visualizations (Market Context)", expanded=False):
         ).configure_title(color='#111')
         st.altair_chart(chart_combined, width="stretch")
 
+    # Additional registry series (15Y mortgage, Treasury, CPI, Fed Funds)
+    market_data = agent.knowledge.get("market_data")
+    extra_ids = [sid for sid in config.FRED_EXTRA_SERIES if market_data is not None and market_data.get(sid) is not None]
+    if extra_ids:
+        df_extra = market_data.aligned(extra_ids, ffill=True).dropna()
+        extra_columns = [c for c in df_extra.columns if c != "date"]
+        df_extra[extra_columns] = df_extra[extra_columns] / df_extra[extra_columns].max()
+        chart_extra = alt.Chart(df_extra).transform_fold(
+            extra_columns,
+            as_=['Metric', 'Value']
+        ).mark_line().encode(
+            x=alt.X('date:T', axis=alt.Axis(labelColor='#111', titleColor='#111', gridColor='#bbb')),
+            y=alt.Y('Value:Q', axis=alt.Axis(labelColor='#111', titleColor='#111', gridColor='#bbb')),
+            color='Metric:N',
+            tooltip=['date:T', 'Metric:N', 'Value:Q']
+        ).properties(title=alt.TitleParams(text='Additional FRED Series (Normalized)', color='#111'), height=300)
+        chart_extra = chart_extra.configure_axis(
+            labelColor='#111',
+            titleColor='#111',
+            gridColor='#bbb'
+        ).configure_title(color='#111')
+        st.altair_chart(chart_extra, width="stretch")
+
+# ---------- Affordability Explorer ----------
+with st.expander("🏠 Affordability Explorer", expanded=False):
+    grid = agent.affordability()
+    if grid is None:
+        st.caption("Load mortgage rates and home prices to explore affordability scenarios.")
+    else:
+        st.caption(
+            f"{grid.size:,} precomputed scenarios around today's {grid.base_rate:.2f}% rate and a typical "
+            f"${grid.typical_price:,.0f} home (reference price moved with the Case-Shiller index)."
+        )
+        col_a1, col_a2, col_a3 = st.columns(3)
+        with col_a1:
+            aff_rate = st.select_slider("Rate (%)", options=[round(r, 3) for r in grid.rates],
+                                        value=round(grid.base_rate, 3), key="aff_rate")
+            aff_term = st.select_slider("Term (years)", options=[int(t) for t in grid.terms],
+                                        value=int(grid.terms[-1]), key="aff_term")
+        with col_a2:
+            aff_price = st.select_slider("Home price", options=[float(p) for p in grid.prices],
+                                         value=float(grid.prices[np.abs(grid.prices - grid.typical_price).argmin()]),
+                                         format_func=lambda p: f"${p:,.0f}", key="aff_price")
+            aff_down = st.select_slider("Down payment", options=[float(d) for d in grid.down_payments],
+                                        value=0.2, format_func=lambda d: f"{d:.1%}", key="aff_down")
+        with col_a3:
+            aff_income = st.select_slider("Household income", options=[float(i) for i in grid.incomes],
+                                          value=120000.0, format_func=lambda i: f"${i:,.0f}", key="aff_income")
+
+        scenario = grid.scenario(aff_rate, aff_price, aff_down, aff_income, aff_term)
+        col_m1, col_m2, col_m3 = st.columns(3)
+        col_m1.metric("Monthly P&I", f"${scenario['payment']:,.0f}", help=f"Loan ${scenario['loan']:,.0f}")
+        col_m2.metric(
+            "Payment-to-Income", f"{scenario['payment_to_income']:.1%}",
+            delta="within 28%" if scenario["payment_to_income"] <= MAX_PAYMENT_TO_INCOME else "above 28%",
+            delta_color="normal" if scenario["payment_to_income"] <= MAX_PAYMENT_TO_INCOME else "inverse",
+        )
+        col_m3.metric("1-Point Buy-Down Break-Even", f"{scenario['break_even_months']:.0f} months",
+                      help=f"One discount point buys the rate down {BUYDOWN_BPS_PER_POINT} bps")
+
+        st.markdown("**Payment-to-income (%) for this price, down payment and term**")
+        st.dataframe(
+            grid.payment_to_income_table(aff_price, aff_down, aff_term).iloc[::4, ::3].round(1),
+            width="stretch",
+        )
+        st.markdown("**Most house affordable at 28% of income**")
+        st.dataframe(
+            grid.max_price_table(aff_down, aff_term).iloc[::4, ::3].round(-3).astype(int),
+            width="stretch",
+        )
+
+# ---------- Rate / Home-Price Lead-Lag ----------
+with st.expander("🔗 Rate / Home-Price Lead-Lag", expanded=False):
+    correlation = agent.knowledge.get("rate_price_correlation")
+    if not correlation:
+        st.caption("Compare rates with home prices to compute the lead-lag profile.")
+    else:
+        st.caption(agent.correlation_text() + ".")
+        chart_lag = alt.Chart(correlation["profile"]).mark_bar().encode(
+            x=alt.X('lag_months:O', title='Home-price YoY lag (months)', axis=alt.Axis(labelColor='#111', titleColor='#111')),
+            y=alt.Y('correlation:Q', title='Correlation', axis=alt.Axis(labelColor='#111', titleColor='#111', gridColor='#bbb')),
+            color=alt.condition(alt.datum.correlation > 0, alt.value('#c0392b'), alt.value('#2471a3')),
+        ).properties(title=alt.TitleParams(text='Rate Change vs Later Home-Price Growth', color='#111'), height=250)
+        st.altair_chart(chart_lag, width="stretch")
+        chart_rolling = alt.Chart(correlation["rolling"]).transform_fold(
+            ['corr_lag_0', 'corr_best_lag'], as_=['Lag', 'Correlation']
+        ).mark_line().encode(
+            x=alt.X('date:T', axis=alt.Axis(labelColor='#111', titleColor='#111', gridColor='#bbb')),
+            y=alt.Y('Correlation:Q', axis=alt.Axis(labelColor='#111', titleColor='#111', gridColor='#bbb')),
+            color='Lag:N',
+        ).properties(title=alt.TitleParams(text='Rolling 5-Year Correlation', color='#111'), height=250)
+        st.altair_chart(chart_rolling, width="stretch")
+
+# ---------- 12-Month Rate Outlook ----------
+with st.expander("🎲 12-Month Rate Outlook (Monte Carlo)", expanded=False):
+    outlook = agent.rate_outlook()
+    if outlook is None:
+        st.caption("Load mortgage rates to simulate the rate outlook.")
+    else:
+        st.caption(agent.outlook_text() + ".")
+        base = alt.Chart(outlook["bands"]).encode(
+            x=alt.X('date:T', axis=alt.Axis(labelColor='#111', titleColor='#111', gridColor='#bbb'))
+        )
+        chart_outlook = (
+            base.mark_area(opacity=0.2, color='#2471a3').encode(
+                y=alt.Y('p5:Q', title='Rate (%)', scale=alt.Scale(zero=False),
+                        axis=alt.Axis(labelColor='#111', titleColor='#111', gridColor='#bbb')),
+                y2='p95:Q',
+            )
+            + base.mark_area(opacity=0.35, color='#2471a3').encode(y='p25:Q', y2='p75:Q')
+            + base.mark_line(color='#1b4f72').encode(y='p50:Q')
+        ).properties(title=alt.TitleParams(text='Simulated 30Y Rate: 5-95% and 25-75% Bands', color='#111'), height=300)
+        st.altair_chart(chart_outlook, width="stretch")
+
+# ---------- Trend Signal Backtest ----------
+with st.expander("🧮 Trend Signal Backtest (Heuristic Accuracy)", expanded=False):
+    backtest = agent.trend_backtest()
+    if backtest is None:
+        st.caption("Load mortgage rates to backtest the trend signal.")
+    else:
+        st.caption(
+            f"What the \"Rates Elevated / Cooling\" signal would have called every week since "
+            f"{backtest['since']:%Y} ({backtest['weeks']:,} weeks), scored with the same rules as debate validation. "
+            f"**trend**: Elevated → BEARISH, Cooling → BULLISH. "
+            f"**banded**: NEUTRAL within ±{config.RATE_CHANGE_THRESHOLD} pts of the 52-week average."
+        )
+        st.dataframe(
+            backtest["summary"][[
+                "rule", "horizon_weeks", "weeks", "hit_rate", "mean_accuracy", "base_rate",
+                "bullish_hit_rate", "bearish_hit_rate", "neutral_hit_rate",
+            ]].rename(columns={
+                "horizon_weeks": "Horizon (wks)", "hit_rate": "Hit Rate %", "mean_accuracy": "Avg Accuracy",
+                "base_rate": "Rates Rose %", "bullish_hit_rate": "BULLISH %", "bearish_hit_rate": "BEARISH %",
+                "neutral_hit_rate": "NEUTRAL %",
+            }).round(1),
+            hide_index=True,
+            width="stretch",
+        )
+        st.caption("No LLM calls: computed from the rate history and cached until the data changes.")
+
 # ---------- Agent Logs ----------
 
 # Move logs to sidebar expander
@@ -1409,6 +1632,20 @@ with st.sidebar.expander("🧪 Diagnostics", expanded=False):
         prices_df = agent.knowledge.get("home_prices")
         st.text(f"Mortgage Rates: {0 if rates_df is None else len(rates_df)} rows")
         st.text(f"Home Prices: {0 if prices_df is None else len(prices_df)} rows")
+        market_data = agent.knowledge.get("market_data")
+        st.text(f"FRED Series Loaded: {0 if market_data is None else len(market_data.series_ids())}")
+        if market_data is not None:
+            st.text(f"Series Arrays: {market_data.nbytes() / 1024:.0f} KB (shared across sessions)")
+
+        st.markdown("**HTTP Circuits**")
+        circuits = HTTP_CIRCUITS.metrics()
+        if not circuits:
+            st.text("No requests yet")
+        for circuit in circuits:
+            p50 = "n/a" if circuit["latency_p50_ms"] is None else f"{circuit['latency_p50_ms']:.0f} ms"
+            st.text(f"{circuit['host']}: {circuit['state'].upper()} | timeout {circuit['timeout_s']}s | p50 {p50}")
+            st.text(f"  ok {circuit['successes']} / failed {circuit['failures']} / "
+                    f"short-circuited {circuit['short_circuited']} | opened {circuit['opened']}x")
 
         st.markdown("**Debate Status**")
         round_1 = agent.knowledge.get("debate_round_1", {})
@@ -9,6 +9,8 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 import pandas as pd
 
+from outcome_scoring import score_stance, stance_of
+
 
 class DebateDatabase:
     def __init__(self, db_path: str = "agent_debates.db"):
@@ -62,9 +64,14 @@ class DebateDatabase:
                 rate_12mo_avg REAL,
                 price_yoy_change REAL,
                 snapshot_date DATETIME NOT NULL,
+                rate_regime TEXT,
                 FOREIGN KEY (debate_id) REFERENCES debates(id)
             )
         """)
+        # Databases created before rate regimes were tracked
+        cursor.execute("PRAGMA table_info(market_snapshots)")
+        if "rate_regime" not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE market_snapshots ADD COLUMN rate_regime TEXT")
         
         # Lessons learned: stores patterns extracted from validated outcomes
         cursor.execute("""
@@ -78,9 +85,14 @@ class DebateDatabase:
                 times_observed INTEGER DEFAULT 1,
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                 last_updated DATETIME DEFAULT CURRENT_TIMESTAMP,
+                rate_regime TEXT,
                 FOREIGN KEY (debate_id) REFERENCES debates(id)
             )
         """)
+        # Databases created before rate regimes were tracked; their lessons keep a NULL regime
+        cursor.execute("PRAGMA table_info(lessons_learned)")
+        if "rate_regime" not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE lessons_learned ADD COLUMN rate_regime TEXT")
         
         conn.commit()
         conn.close()
@@ -140,15 +152,16 @@ class DebateDatabase:
         cursor.execute("""
             INSERT INTO market_snapshots (
                 debate_id, mortgage_rate, home_price_index,
-                rate_12mo_avg, price_yoy_change, snapshot_date
-            ) VALUES (?, ?, ?, ?, ?, ?)
+                rate_12mo_avg, price_yoy_change, snapshot_date, rate_regime
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (
             debate_id,
             market_snapshot.get('mortgage_rate'),
             market_snapshot.get('home_price_index'),
             market_snapshot.get('rate_12mo_avg'),
             market_snapshot.get('price_yoy_change'),
-            datetime.now()
+            datetime.now(),
+            market_snapshot.get('rate_regime')
         ))
         
         conn.commit()
@@ -246,25 +259,10 @@ class DebateDatabase:
         rate_change = current_rate - original_rate
         rate_change_pct = (rate_change / original_rate) * 100
         
-        # Determine if prediction was correct
-        accuracy = 0.0
-        status = "incorrect"
-        
-        if recommendation and "bearish" in recommendation.lower():
-            # Bearish = expected rates to rise or remain high
-            if rate_change >= 0:
-                status = "correct"
-                accuracy = min(100.0, abs(rate_change_pct) * 20)  # Scale accuracy
-        elif recommendation and "bullish" in recommendation.lower():
-            # Bullish = expected rates to fall
-            if rate_change < 0:
-                status = "correct"
-                accuracy = min(100.0, abs(rate_change_pct) * 20)
-        else:
-            # Neutral prediction
-            if abs(rate_change_pct) < 5:  # Within 5% is neutral
-                status = "correct"
-                accuracy = 50.0
+        # Determine if prediction was correct (same rules as the trend-signal backtest):
+        # Bearish = rates rise or remain high, Bullish = rates fall, Neutral = move within 5%
+        correct, accuracy = score_stance(stance_of(recommendation), rate_change, original_rate)
+        status = "correct" if correct else "incorrect"
         
         # Update database with validation
         conn = sqlite3.connect(self.db_path)
@@ -372,13 +370,14 @@ class DebateDatabase:
         # Create pattern description
         condition_desc = f"Market condition: rates {rate_trend}"
         pattern_desc = f"{prediction_type} prediction when {rate_trend}"
+        rate_regime = market_snapshot.get('rate_regime') or None
         
-        # Check if similar pattern exists
+        # Check if similar pattern exists (same regime, or both without one)
         cursor.execute("""
             SELECT id, times_observed, accuracy_observed FROM lessons_learned
-            WHERE prediction_type = ? AND condition_description = ?
+            WHERE prediction_type = ? AND condition_description = ? AND rate_regime IS ?
             ORDER BY last_updated DESC LIMIT 1
-        """, (prediction_type, condition_desc))
+        """, (prediction_type, condition_desc, rate_regime))
         
         existing = cursor.fetchone()
         
@@ -401,9 +400,9 @@ class DebateDatabase:
             cursor.execute("""
                 INSERT INTO lessons_learned
                 (debate_id, pattern_description, prediction_type, 
-                 condition_description, accuracy_observed, times_observed)
-                VALUES (?, ?, ?, ?, ?, 1)
-            """, (debate_id, pattern_desc, prediction_type, condition_desc, accuracy))
+                 condition_description, accuracy_observed, times_observed, rate_regime)
+                VALUES (?, ?, ?, ?, ?, 1, ?)
+            """, (debate_id, pattern_desc, prediction_type, condition_desc, accuracy, rate_regime))
         
         conn.commit()
         conn.close()
@@ -419,14 +418,15 @@ class DebateDatabase:
                 prediction_type,
                 condition_description,
                 accuracy_observed,
-                times_observed
+                times_observed,
+                rate_regime
             FROM lessons_learned
             WHERE times_observed >= ?
             ORDER BY accuracy_observed DESC, times_observed DESC
             LIMIT ?
         """, (min_times, limit))
         
-        columns = ['pattern', 'prediction', 'condition', 'accuracy', 'frequency']
+        columns = ['pattern', 'prediction', 'condition', 'accuracy', 'frequency', 'regime']
         results = [dict(zip(columns, row)) for row in cursor.fetchall()]
         
         conn.close()
@@ -446,5 +446,7 @@ class DebateDatabase:
                 f"   - Accuracy: {p['accuracy']:.1f}% (observed in {p['frequency']} debates)\n"
                 f"   - Condition: {p['condition']}\n"
             )
+            if p['regime']:
+                summary += f"   - Rate regime: {p['regime']}\n"
         
         return summary
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Version stamps for derived knowledge entries.
+
+Every derived entry (rate_insights, comparison, summary, ...) records the
+versions of the inputs it was computed from. An entry is current while those
+versions still match. Base series are versioned by content hash and derived
+entries get a new version each time they are written, so a data refresh or a
+regenerated upstream entry makes everything below it stale without any
+explicit invalidation.
+
+Stamps are read and written under DerivationCache.lock. A writer on another
+thread (the background market-data refresh) holds it around its knowledge
+update and the matching record() calls, so readers see new entries only
+together with their stamps.
+"""
+
+import itertools
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+Stamp = Tuple[Tuple[str, Optional[str]], ...]
+
+
+class DerivationCache:
+    def __init__(self, knowledge: Dict[str, Any], graph: Dict[str, Tuple[str, ...]],
+                 base_version: Callable[[str], Optional[str]]):
+        """graph maps each derived entry to its inputs; base_version versions everything else."""
+        self.knowledge = knowledge
+        self.graph = graph
+        self.base_version = base_version
+        self._stamps: Dict[str, Stamp] = {}
+        self._writes: Dict[str, int] = {}
+        self._counter = itertools.count(1)
+        # Reentrant so a publisher can hold it across knowledge writes and record()
+        self.lock = threading.RLock()
+
+    def version(self, name: str) -> Optional[str]:
+        """Version of an entry, or None if it is missing or stale."""
+        if name not in self.graph:
+            return self.base_version(name)
+        with self.lock:
+            if not self.is_current(name):
+                return None
+            return f"{name}#{self._writes[name]}"
+
+    def inputs(self, name: str) -> Stamp:
+        """Current versions of name's inputs; capture before computing, pass to record() after."""
+        with self.lock:
+            return tuple((dep, self.version(dep)) for dep in self.graph[name])
+
+    def is_current(self, name: str) -> bool:
+        with self.lock:
+            stamp = self._stamps.get(name)
+            return stamp is not None and name in self.knowledge and stamp == self.inputs(name)
+
+    def record(self, name: str, inputs: Optional[Stamp] = None) -> None:
+        """Stamp a freshly written entry with the input versions it was computed from."""
+        with self.lock:
+            self._stamps[name] = self.inputs(name) if inputs is None else inputs
+            self._writes[name] = next(self._counter)
+
+    def changed_inputs(self, name: str) -> List[str]:
+        """Inputs of name whose version differs from the one it was computed from."""
+        with self.lock:
+            stamp = dict(self._stamps.get(name, ()))
+            return [dep for dep, version in self.inputs(name) if stamp.get(dep) != version]
+
+    def derive(self, name: str, compute: Callable[[], Any], force: bool = False) -> Any:
+        """Run compute (which writes knowledge[name]) unless the entry is current.
+
+        Returns compute's result, or None when the entry was already current.
+        """
+        with self.lock:
+            if not force and self.is_current(name):
+                return None
+            inputs = self.inputs(name)
+        result = compute()
+        with self.lock:
+            if name in self.knowledge:
+                self.record(name, inputs)
+        return result
+
+    def prune(self, names: Iterable[str]) -> List[str]:
+        """Drop stale entries among names from knowledge; returns the names removed."""
+        removed = []
+        with self.lock:
+            for name in names:
+                if name in self.knowledge and not self.is_current(name):
+                    del self.knowledge[name]
+                    self._stamps.pop(name, None)
+                    self._writes.pop(name, None)
+                    removed.append(name)
+        return removed
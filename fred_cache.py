@@ -0,0 +1,104 @@
+"""
+Disk-backed cache for FRED series downloads.
+
+Each series is stored as a Parquet file next to a small JSON sidecar holding the
+HTTP validators (ETag / Last-Modified) of the response it came from, so a refresh
+can be sent as a conditional GET and a 304 served straight from disk.
+"""
+
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, Optional
+
+import pandas as pd
+
+
+class FredSeriesCache:
+    def __init__(self, cache_dir: str = ".fred_cache"):
+        self.cache_dir = cache_dir
+
+    def _data_path(self, series_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{series_id}.parquet")
+
+    def _meta_path(self, series_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{series_id}.json")
+
+    def load(self, series_id: str) -> Optional[pd.DataFrame]:
+        """Return the cached frame for a series, or None if absent or unreadable."""
+        path = self._data_path(series_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            return None
+
+    def load_metadata(self, series_id: str) -> Dict[str, str]:
+        """Return the stored validators and bookkeeping for a series."""
+        try:
+            with open(self._meta_path(series_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def conditional_headers(self, series_id: str) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for a cached series.
+
+        Returns an empty dict when there is no local copy to fall back on.
+        """
+        if not os.path.exists(self._data_path(series_id)):
+            return {}
+        meta = self.load_metadata(series_id)
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def store(self, series_id: str, df: pd.DataFrame, response_headers=None) -> None:
+        """Persist a series frame and the validators of the response it was built from.
+
+        Frames assembled from partial (delta) responses should be stored without
+        headers: their validators would not describe the full series.
+        """
+        response_headers = response_headers or {}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._write_atomic(self._data_path(series_id), lambda path: df.to_parquet(path, index=False))
+
+            meta = {
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified"),
+                "stored_at": datetime.now().isoformat(),
+                "rows": int(len(df)),
+            }
+            self._write_atomic(self._meta_path(series_id), lambda path: self._write_json(path, meta))
+        except Exception:
+            # The disk cache is an optimization; a failed write must not fail the fetch.
+            pass
+
+    @staticmethod
+    def _write_json(path: str, data: Dict) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def _write_atomic(self, path: str, write) -> None:
+        """write(tmp_path) to a temp file unique to this writer, then move it over path.
+
+        Concurrent stores of the same series (fetch pool, background refresh, other
+        sessions) each write their own temp file, so the last replace wins intact.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,390 @@
+"""
+Registry-driven ingestion of FRED series.
+
+A series is declared once in SERIES_REGISTRY (ID, target column, frequency, parser);
+FredIngestionEngine downloads any set of them in parallel through the shared HTTP
+session and disk cache, and MarketDataStore keeps the results aligned on date.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+import config
+from fred_cache import FredSeriesCache
+from circuit_breaker import CircuitOpenError
+from market_cache import SharedMarketCache, SingleFlight, frame_version
+from series_store import SeriesStore
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def parse_fred_csv(payload: bytes, column: str) -> pd.DataFrame:
+    """Parse a fredgraph.csv payload into a typed (date, column) frame in one pass.
+
+    The bytes are wrapped without copying and read by the Arrow CSV engine with
+    declared types. FRED's '.' placeholders become nulls and are dropped in Arrow,
+    so pandas only sees the final columns. Gzip bodies that were not decoded by
+    the transport are decompressed on the fly.
+    """
+    stream = pa.BufferReader(payload)
+    if payload[:2] == GZIP_MAGIC:
+        stream = pa.CompressedInputStream(stream, "gzip")
+    table = pa_csv.read_csv(
+        stream,
+        read_options=pa_csv.ReadOptions(skip_rows=1, column_names=["date", column]),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={"date": pa.timestamp("ns"), column: pa.float64()},
+            null_values=[".", ""],
+        ),
+    )
+    return table.drop_null().to_pandas()
+
+
+@dataclass(frozen=True)
+class FredSeries:
+    series_id: str
+    column: str
+    frequency: str  # "daily", "weekly" or "monthly"
+    description: str = ""
+    # Turns the raw response body into a (date, column) frame
+    parser: Callable[[bytes, str], pd.DataFrame] = parse_fred_csv
+    # Legacy knowledge entry that exposes this series directly (e.g. "mortgage_rates")
+    knowledge_key: Optional[str] = None
+
+
+SERIES_REGISTRY: Dict[str, FredSeries] = {}
+
+
+def register_series(series: FredSeries) -> FredSeries:
+    SERIES_REGISTRY[series.series_id] = series
+    return series
+
+
+register_series(FredSeries("MORTGAGE30US", "rate", "weekly", "30-Year Fixed Rate Mortgage Average", knowledge_key="mortgage_rates"))
+register_series(FredSeries("CSUSHPINSA", "price", "monthly", "S&P CoreLogic Case-Shiller U.S. National Home Price Index", knowledge_key="home_prices"))
+register_series(FredSeries("MORTGAGE15US", "rate_15y", "weekly", "15-Year Fixed Rate Mortgage Average"))
+register_series(FredSeries("DGS10", "treasury_10y", "daily", "10-Year Treasury Constant Maturity Rate"))
+register_series(FredSeries("CPIAUCSL", "cpi", "monthly", "Consumer Price Index for All Urban Consumers"))
+register_series(FredSeries("FEDFUNDS", "fed_funds", "monthly", "Effective Federal Funds Rate"))
+
+
+@dataclass
+class FetchResult:
+    series_id: str
+    frame: Optional[pd.DataFrame] = None
+    mode: str = "full"  # "full", "not_modified", "incremental", "shared", "coalesced" or "circuit_open"
+    rows_fetched: int = 0
+    since: Optional[pd.Timestamp] = None
+    error: Optional[Exception] = None
+    version: Optional[str] = None
+    store: Optional[SeriesStore] = None
+
+
+# Series downloads are I/O bound; kept separate from the agent's action pool so a
+# background action fanning out here can never starve itself of workers.
+_SERIES_POOL = ThreadPoolExecutor(max_workers=config.FRED_MAX_WORKERS, thread_name_prefix="fred-series")
+
+
+class FredIngestionEngine:
+    def __init__(self, session, cache: FredSeriesCache, base_url: str = config.FRED_GRAPH_URL,
+                 timeout: float = config.FRED_TIMEOUT_SECONDS, shared: Optional[SharedMarketCache] = None,
+                 shared_ttl: float = config.SHARED_MARKET_DATA_TTL_SECONDS,
+                 flights: Optional[SingleFlight] = None,
+                 revision_window: int = config.FRED_REVISION_WINDOW):
+        self.session = session
+        self.cache = cache
+        self.base_url = base_url
+        self.timeout = timeout
+        # Process-wide cache shared with other sessions; entries younger than shared_ttl skip the network
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        # Process-wide single-flight group: one in-flight request per series and endpoint
+        self.flights = flights
+        # Trailing cached observations an incremental refresh asks for again (revisions)
+        self.revision_window = max(1, revision_window)
+
+    def download(self, spec: FredSeries, start_date=None):
+        """Download one series; returns (frame, not_modified).
+
+        With start_date only observations on or after that date are requested.
+        Full downloads are revalidated against the disk cache with a conditional GET
+        and a 304 serves the cached frame without parsing any CSV.
+        """
+        params = {"id": spec.series_id}
+        headers = {}
+        if start_date is not None:
+            params["cosd"] = pd.Timestamp(start_date).strftime("%Y-%m-%d")
+        else:
+            headers = self.cache.conditional_headers(spec.series_id)
+        response = self.session.get(self.base_url, params=params, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            cached = self.cache.load(spec.series_id)
+            if cached is not None:
+                return cached, True
+            # Cache vanished between the request and now; fetch unconditionally.
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        df = spec.parser(response.content, spec.column)
+        if start_date is None:
+            self.cache.store(spec.series_id, df, response.headers)
+        return df, False
+
+    def refresh(self, spec: FredSeries, cached: Optional[pd.DataFrame] = None,
+                incremental: bool = True, force: bool = False) -> FetchResult:
+        """Bring a series up to date, requesting only its recent tail when possible.
+
+        The delta request starts revision_window observations before the end of the
+        cached series and replaces that tail, so revisions to recent observations
+        are picked up along with new ones; older revisions need a full download
+        (incremental=False). A recent copy in the shared process cache is returned
+        without any request, and the result of a network refresh is published there
+        for other sessions. While a refresh of the same series is in flight, callers
+        wait for it and share its result (or its error) instead of sending their own
+        request. While FRED's circuit is open the best cached copy is returned
+        immediately. force skips the shared copy's freshness window and always asks
+        FRED.
+        """
+        if self.shared is not None:
+            entry = self.shared.get(spec.series_id)
+            if entry is not None:
+                if not force and entry.age() <= self.shared_ttl:
+                    return FetchResult(spec.series_id, entry.frame, "shared", version=entry.version,
+                                       store=entry.store)
+                if cached is None or cached.empty:
+                    cached = entry.frame
+        try:
+            if self.flights is None:
+                return self._refresh_and_publish(spec, cached, incremental)
+            result, coalesced = self.flights.do((self.base_url, spec.series_id),
+                                                lambda: self._refresh_and_publish(spec, cached, incremental))
+        except CircuitOpenError:
+            fallback = self._circuit_open_fallback(spec, cached)
+            if fallback is None:
+                raise
+            return fallback
+        # Waiters get their own copy so per-caller bookkeeping never touches the leader's result
+        return replace(result, mode="coalesced") if coalesced else result
+
+    def _circuit_open_fallback(self, spec: FredSeries, cached: Optional[pd.DataFrame]) -> Optional[FetchResult]:
+        entry = self.shared.get(spec.series_id) if self.shared is not None else None
+        if entry is not None:
+            return FetchResult(spec.series_id, entry.frame, "circuit_open", version=entry.version,
+                               store=entry.store)
+        if cached is None or cached.empty:
+            cached = self.cache.load(spec.series_id)
+        if cached is None or cached.empty:
+            return None
+        return FetchResult(spec.series_id, cached, "circuit_open", version=frame_version(cached))
+
+    def _refresh_and_publish(self, spec: FredSeries, cached: Optional[pd.DataFrame],
+                             incremental: bool) -> FetchResult:
+        result = self._refresh_from_source(spec, cached, incremental)
+        if self.shared is not None:
+            entry = self.shared.publish(spec.series_id, result.frame)
+            result.frame = entry.frame
+            result.store = entry.store
+            result.version = entry.version
+        return result
+
+    def _refresh_from_source(self, spec: FredSeries, cached: Optional[pd.DataFrame],
+                             incremental: bool) -> FetchResult:
+        if (cached is None or cached.empty) and not self.cache.conditional_headers(spec.series_id):
+            # No validators to revalidate with: seed the delta from the disk copy instead.
+            cached = self.cache.load(spec.series_id)
+        if incremental and cached is not None and not cached.empty:
+            dates = cached["date"].sort_values()
+            since = dates.iloc[-min(self.revision_window, len(dates))]
+            delta, _ = self.download(spec, start_date=since)
+            if delta.empty:
+                # Header only, or every value in the window is missing ("."): nothing to replace
+                return FetchResult(spec.series_id, cached, "incremental", 0, since)
+            # FRED's answer for [since, today] replaces the cached tail, revisions included
+            merged = pd.concat([cached[cached["date"] < since], delta], ignore_index=True)
+            merged = merged.sort_values("date").reset_index(drop=True)
+            self.cache.store(spec.series_id, merged)
+            return FetchResult(spec.series_id, merged, "incremental", len(delta), since)
+        frame, not_modified = self.download(spec)
+        return FetchResult(spec.series_id, frame, "not_modified" if not_modified else "full", len(frame))
+
+    def refresh_many(self, specs: List[FredSeries], cached: Optional[Dict[str, pd.DataFrame]] = None,
+                     incremental: bool = True, force: bool = False) -> List[FetchResult]:
+        """Refresh several series in parallel; results come back in the order given.
+
+        A failing series is reported through FetchResult.error rather than raised.
+        """
+        cached = cached or {}
+
+        def task(spec):
+            try:
+                return self.refresh(spec, cached.get(spec.series_id), incremental=incremental, force=force)
+            except Exception as e:
+                return FetchResult(spec.series_id, error=e)
+
+        futures = [_SERIES_POOL.submit(task, spec) for spec in specs]
+        return [f.result() for f in futures]
+
+
+def _first_changed_date(old: SeriesStore, new: SeriesStore) -> Optional[np.datetime64]:
+    """Earliest date from which new differs from old (None if identical)."""
+    n = min(len(old), len(new))
+    same = (old.dates[:n] == new.dates[:n]) & (old.values[:n] == new.values[:n])
+    changed = np.flatnonzero(~same)
+    if len(changed):
+        i = int(changed[0])
+        return min(old.dates[i], new.dates[i])
+    if len(old) == len(new):
+        return None
+    return old.dates[n] if len(old) > n else new.dates[n]
+
+
+def asof_join(left: SeriesStore, right: SeriesStore,
+              previous: Optional[Tuple[SeriesStore, SeriesStore, pd.DataFrame]] = None) -> pd.DataFrame:
+    """Each left observation with the latest right value on or before its date (pd.merge_asof semantics).
+
+    previous is an earlier (left, right, joined) triple; rows dated before the first
+    change in either input are reused and only the tail is looked up again.
+    """
+    start = 0
+    if previous is not None:
+        old_left, old_right, joined = previous
+        changes = [d for d in (_first_changed_date(old_left, left), _first_changed_date(old_right, right))
+                   if d is not None]
+        start = len(left) if not changes else int(np.searchsorted(left.dates, min(changes), side="left"))
+        start = min(start, len(joined))
+        if start == len(left) == len(joined):
+            return joined
+    positions = np.searchsorted(right.dates, left.dates[start:], side="right") - 1
+    tail = np.where(positions >= 0, right.values[np.maximum(positions, 0)], np.nan)
+    head = previous[2][right.column].to_numpy()[:start] if start else np.empty(0)
+    return pd.DataFrame({
+        "date": left.dates.astype("datetime64[ns]"),
+        left.column: left.values,
+        right.column: np.concatenate((head, tail)),
+    })
+
+
+def outer_align(stores: List[SeriesStore]) -> pd.DataFrame:
+    """Union of all observation dates with one column per series (NaN where a series has no value)."""
+    if not stores:
+        return pd.DataFrame(columns=["date"])
+    dates = np.unique(np.concatenate([store.dates for store in stores]))
+    columns = {"date": dates.astype("datetime64[ns]")}
+    for store in stores:
+        column = np.full(len(dates), np.nan)
+        column[np.searchsorted(dates, store.dates)] = store.values
+        columns[store.column] = column
+    return pd.DataFrame(columns)
+
+
+class MarketDataStore:
+    """Per-series compact stores plus date-aligned views shared by the agent and dashboard.
+
+    Each series is held as a SeriesStore, whose arrays the analytics read, and as
+    the frame charts read; with a shared cache the store is the one process-wide
+    copy of that version and the frame a zero-copy view over its arrays. Aligned and as-of joined frames are
+    built from the arrays and computed once per set of series versions for the
+    whole process.
+    """
+
+    def __init__(self, shared: Optional[SharedMarketCache] = None):
+        self.shared = shared
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._stores: Dict[str, SeriesStore] = {}
+        self._versions: Dict[str, Optional[str]] = {}
+        self._aligned: Optional[pd.DataFrame] = None
+        # (left_id, right_id) -> (left store, right store, as-of joined frame)
+        self._asof_joins: Dict[Tuple[str, str], Tuple[SeriesStore, SeriesStore, pd.DataFrame]] = {}
+
+    @staticmethod
+    def _as_store(series_id: str, frame: pd.DataFrame, store: Optional[SeriesStore]) -> SeriesStore:
+        return store if store is not None else SeriesStore.from_frame(series_id, frame.columns[1], frame)
+
+    def update(self, series_id: str, frame: pd.DataFrame, version: Optional[str] = None,
+               store: Optional[SeriesStore] = None) -> None:
+        self._stores[series_id] = self._as_store(series_id, frame, store)
+        self._frames[series_id] = frame
+        self._versions[series_id] = version
+        self._aligned = None
+
+    def update_many(self, frames: Dict[str, pd.DataFrame], versions: Optional[Dict[str, str]] = None,
+                    stores: Optional[Dict[str, SeriesStore]] = None) -> None:
+        """Swap in several series at once (readers see all or none of them)."""
+        merged_stores = dict(self._stores)
+        merged_stores.update({sid: self._as_store(sid, frame, (stores or {}).get(sid)) for sid, frame in frames.items()})
+        merged = dict(self._frames)
+        merged.update(frames)
+        merged_versions = dict(self._versions)
+        merged_versions.update({sid: (versions or {}).get(sid) for sid in frames})
+        self._stores = merged_stores
+        self._frames = merged
+        self._versions = merged_versions
+        self._aligned = None
+
+    def version(self, series_id: str, frame: Optional[pd.DataFrame] = None) -> Optional[str]:
+        """Published version of a series; None if unknown or if frame is not the stored one."""
+        if frame is not None and self._frames.get(series_id) is not frame:
+            return None
+        return self._versions.get(series_id)
+
+    def get(self, series_id: str) -> Optional[pd.DataFrame]:
+        return self._frames.get(series_id)
+
+    def store(self, series_id: str) -> Optional[SeriesStore]:
+        return self._stores.get(series_id)
+
+    def series_ids(self) -> List[str]:
+        return list(self._stores)
+
+    def nbytes(self) -> int:
+        return sum(store.nbytes for store in self._stores.values())
+
+    def _derived(self, name: str, series_ids: List[str], compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        versions = tuple(f"{sid}:{self._versions.get(sid)}" for sid in series_ids)
+        if self.shared is None or any(self._versions.get(sid) is None for sid in series_ids):
+            return compute()
+        return self.shared.derived(name, versions, compute)
+
+    def aligned(self, series_ids: Optional[List[str]] = None, ffill: bool = False) -> pd.DataFrame:
+        """Outer-join the requested series on date (one column per series).
+
+        The full join is built once per data change; ffill carries lower-frequency
+        values forward so every row has the latest known observation.
+        """
+        if self._aligned is None:
+            stores = self._stores
+            ids = sorted(stores)
+            self._aligned = self._derived("aligned", ids, lambda: outer_align([stores[sid] for sid in ids]))
+        df = self._aligned
+        if series_ids is not None:
+            columns = [self._stores[sid].column for sid in series_ids if sid in self._stores]
+            df = df[["date"] + columns].dropna(how="all", subset=columns)
+        if ffill:
+            df = df.ffill()
+        return df
+
+    def asof_joined(self, left_id: str, right_id: str) -> Optional[pd.DataFrame]:
+        """left's rows with right's as-of value (e.g. weekly rates with the latest price index).
+
+        Returned from memory while neither series changes; after an update only rows
+        from the first new or revised observation onward are joined again. Treat
+        the frame as read-only.
+        """
+        left = self._stores.get(left_id)
+        right = self._stores.get(right_id)
+        if left is None or right is None or not len(left) or not len(right):
+            return None
+        key = (left_id, right_id)
+        previous = self._asof_joins.get(key)
+        if previous is not None and previous[0] is left and previous[1] is right:
+            return previous[2]
+        joined = self._derived(f"asof_join:{left_id}:{right_id}", [left_id, right_id],
+                               lambda: asof_join(left, right, previous))
+        self._asof_joins[key] = (left, right, joined)
+        return joined
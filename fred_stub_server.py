@@ -0,0 +1,222 @@
+"""
+Local stand-in for fred.stlouisfed.org/graph/fredgraph.csv.
+
+Serves recorded series (seeded from agent_state.json, plus any <SERIES_ID>.csv files
+in a fixtures directory) with the behaviour the agent relies on: `cosd` start-date
+filtering, ETag / If-None-Match revalidation and gzip. Latency, injected 429/5xx
+errors and payload size are configurable so the retry policy and ingestion
+throughput can be measured without network access.
+
+Run standalone and point the agent at it:
+    python fred_stub_server.py --port 8765 --latency-ms 300 --error-rate 0.2
+    FRED_GRAPH_URL=http://127.0.0.1:8765/graph/fredgraph.csv streamlit run dashboard.py
+
+or in-process via FredStubServer(...).start() (see benchmarks/ingestion_benchmark.py).
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# agent_state.json knowledge entries and the FRED series they were recorded from
+RECORDED_SERIES = {"mortgage_rates": "MORTGAGE30US", "home_prices": "CSUSHPINSA"}
+
+
+def load_recorded_series(state_path: str = os.path.join(ROOT, "agent_state.json"),
+                         fixtures_dir: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """Return {series_id: frame(observation_date, value)} from agent_state.json and fixture CSVs."""
+    series = {}
+    if os.path.exists(state_path):
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        for key, series_id in RECORDED_SERIES.items():
+            if key in state:
+                df = pd.read_json(StringIO(state[key]))
+                series[series_id] = pd.DataFrame({"observation_date": df["date"], series_id: df.iloc[:, 1]})
+    if fixtures_dir:
+        for name in sorted(os.listdir(fixtures_dir)):
+            if name.endswith(".csv"):
+                series_id = name[:-4]
+                df = pd.read_csv(os.path.join(fixtures_dir, name))
+                df.columns = ["observation_date", series_id]
+                df["observation_date"] = pd.to_datetime(df["observation_date"])
+                series[series_id] = df
+    return series
+
+
+def scale_history(df: pd.DataFrame, multiplier: int) -> pd.DataFrame:
+    """Grow a series to multiplier x its rows by extending the date range backwards.
+
+    Values are tiled and dates keep the series' own spacing, so the payload looks
+    like a longer history of the same frequency.
+    """
+    if multiplier <= 1 or len(df) < 2:
+        return df
+    freq = pd.infer_freq(df["observation_date"].tail(10)) or (df["observation_date"].iloc[-1] - df["observation_date"].iloc[-2])
+    dates = pd.date_range(end=df["observation_date"].iloc[-1], periods=len(df) * multiplier, freq=freq)
+    values = list(df.iloc[:, 1]) * multiplier
+    return pd.DataFrame({"observation_date": dates, df.columns[1]: values})
+
+
+class FredStubServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, error_codes: Optional[List[int]] = None, retry_after: Optional[int] = None,
+                 history_multiplier: int = 1, gzip_enabled: bool = True, fixtures_dir: Optional[str] = None,
+                 seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_codes = error_codes or [429, 500, 502, 503, 504]
+        self.retry_after = retry_after
+        self.gzip_enabled = gzip_enabled
+        self.series = {sid: scale_history(df, history_multiplier)
+                       for sid, df in load_recorded_series(fixtures_dir=fixtures_dir).items()}
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset_stats()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/graph/fredgraph.csv"
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {"requests": 0, "bytes_sent": 0, "by_status": {}, "by_series": {}}
+
+    def _record(self, series_id: str, status: int, size: int):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_sent"] += size
+            self.stats["by_status"][str(status)] = self.stats["by_status"].get(str(status), 0) + 1
+            self.stats["by_series"][series_id] = self.stats["by_series"].get(series_id, 0) + 1
+
+    def revise(self, series_id: str, date, value: float):
+        """Change a recorded observation, as FRED does when it revises a month."""
+        with self._lock:
+            df = self.series[series_id].copy()
+            df.loc[df["observation_date"] == pd.Timestamp(date), series_id] = value
+            self.series[series_id] = df
+
+    def _render(self, series_id: str, cosd: Optional[str]) -> bytes:
+        df = self.series[series_id]
+        if cosd:
+            df = df[df["observation_date"] >= pd.Timestamp(cosd)]
+        out = df.copy()
+        out["observation_date"] = out["observation_date"].dt.strftime("%Y-%m-%d")
+        return out.to_csv(index=False).encode("utf-8")
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, series_id, status, body=b"", headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+                server._record(series_id, status, len(body))
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+                if parsed.path == "/stats":
+                    body = json.dumps(server.stats).encode("utf-8")
+                    self._send("-", 200, body, {"Content-Type": "application/json"})
+                    return
+                series_id = query.get("id", [""])[0]
+
+                delay = server.latency_ms + server._random.uniform(0, server.jitter_ms)
+                if delay > 0:
+                    time.sleep(delay / 1000.0)
+
+                if server._random.random() < server.error_rate:
+                    status = server._random.choice(server.error_codes)
+                    headers = {"Retry-After": str(server.retry_after)} if server.retry_after is not None else {}
+                    self._send(series_id, status, b"injected error", headers)
+                    return
+                if not parsed.path.endswith("fredgraph.csv") or series_id not in server.series:
+                    self._send(series_id, 404, b"series not found")
+                    return
+
+                body = server._render(series_id, query.get("cosd", [None])[0])
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                headers = {"ETag": etag, "Last-Modified": server.last_modified, "Content-Type": "text/csv"}
+                if_none_match = self.headers.get("If-None-Match")
+                if (if_none_match == etag or
+                        (if_none_match is None and self.headers.get("If-Modified-Since") == server.last_modified)):
+                    self._send(series_id, 304, b"", headers)
+                    return
+                if server.gzip_enabled and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = gzip.compress(body)
+                    headers["Content-Encoding"] = "gzip"
+                self._send(series_id, 200, body, headers)
+
+        return Handler
+
+    def start(self) -> "FredStubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fred-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local FRED fredgraph.csv stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fixed delay before every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="extra uniform random delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of an injected error (0-1)")
+    parser.add_argument("--error-codes", default="429,500,502,503,504", help="comma-separated status codes to inject")
+    parser.add_argument("--retry-after", type=int, default=None, help="Retry-After seconds sent with injected errors")
+    parser.add_argument("--history-multiplier", type=int, default=1, help="grow each series to N x its recorded rows")
+    parser.add_argument("--fixtures", default=None, help="directory of recorded <SERIES_ID>.csv files")
+    parser.add_argument("--no-gzip", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FredStubServer(
+        host=args.host, port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, error_codes=[int(c) for c in args.error_codes.split(",") if c],
+        retry_after=args.retry_after, history_multiplier=args.history_multiplier,
+        gzip_enabled=not args.no_gzip, fixtures_dir=args.fixtures, seed=args.seed,
+    )
+    print(f"Serving {', '.join(sorted(server.series))} at {server.url} (stats: /stats)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Persistent cache of Claude replies.
+
+Replies are stored in SQLite (next to agent_debates.db by default) under a
+SHA-256 of the model, max_tokens and the fully rendered prompt, so rerunning
+the planner, role perspectives or a debate on unchanged inputs is answered from
+disk instead of a new API call. Entries expire after a TTL and the table is
+trimmed to the most recently used max_entries. Recent entries are also held in
+memory, so a repeat hit is a dictionary lookup; their last-used times are
+written back in batches rather than on every hit. Any SQLite error makes the
+cache behave as a miss: it never fails a Claude call.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import config
+
+# Last-used updates held back before being written to disk
+TOUCH_BATCH = 32
+
+
+def cache_key(model: str, max_tokens: int, prompt: Any) -> str:
+    """Content hash of one request; prompt is the rendered text or message content blocks."""
+    payload = json.dumps([model, max_tokens, prompt], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    def __init__(self, db_path: str = "llm_cache.db", ttl_seconds: float = 86400,
+                 max_entries: int = 2000, max_memory: int = 256):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_memory = max_memory
+        self._lock = threading.Lock()
+        self._conn = None
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (text, created_at)
+        self._touched = {}  # key -> last_used not yet written to disk
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, text: str, created_at: float):
+        self._memory[key] = (text, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def _flush_touches(self, conn: sqlite3.Connection):
+        if self._touched:
+            conn.executemany("UPDATE llm_responses SET last_used = ? WHERE key = ?",
+                             [(used, key) for key, used in self._touched.items()])
+            self._touched.clear()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached reply for key, or None if absent or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                try:
+                    row = self._connect().execute(
+                        "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+                    ).fetchone()
+                except Exception:
+                    row = None
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._remember(key, *entry)
+            if entry is None or now - entry[1] > self.ttl_seconds:
+                self._memory.pop(key, None)
+                self.misses += 1
+                return None
+            self._memory.move_to_end(key)
+            self._touched[key] = now
+            if len(self._touched) >= TOUCH_BATCH:
+                try:
+                    conn = self._connect()
+                    self._flush_touches(conn)
+                    conn.commit()
+                except Exception:
+                    self._touched.clear()
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, text: str, model: Optional[str] = None):
+        """Store a reply, then drop expired entries and trim to the max_entries most recently used."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, text, now)
+            try:
+                conn = self._connect()
+                self._flush_touches(conn)
+                conn.execute("INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?, ?)",
+                             (key, model, text, now, now))
+                conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (now - self.ttl_seconds,))
+                conn.execute("""
+                    DELETE FROM llm_responses WHERE key IN (
+                        SELECT key FROM llm_responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,))
+                conn.commit()
+            except Exception:
+                self._touched.clear()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            try:
+                conn = self._connect()
+                conn.execute("DELETE FROM llm_responses")
+                conn.commit()
+            except Exception:
+                pass
+
+
+# Shared by every session in the process (Streamlit serves them all from one)
+LLM_RESPONSE_CACHE = LLMResponseCache(config.LLM_CACHE_PATH, config.LLM_CACHE_TTL_SECONDS,
+                                      config.LLM_CACHE_MAX_ENTRIES)
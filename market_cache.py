@@ -0,0 +1,128 @@
+"""
+Process-wide cache of FRED series and the analytics derived from them.
+
+Streamlit serves every browser session from one process. Instead of each session
+downloading and holding its own copy, sessions share one frame per series
+version and one result per (analytic, input versions) pair. Shared frames are
+views over a SeriesStore's read-only arrays, so assigning into one raises:
+every consumer in the agent and dashboard derives new frames (sort/merge/concat)
+instead.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from series_store import SeriesStore
+
+
+def frame_version(frame: pd.DataFrame) -> str:
+    """Content hash identifying a series version (same data → same version)."""
+    hashed = pd.util.hash_pandas_object(frame, index=False).values
+    return hashlib.sha1(hashed.tobytes()).hexdigest()[:16]
+
+
+class SharedSeriesEntry:
+    __slots__ = ("frame", "store", "version", "fetched_at")
+
+    def __init__(self, frame: pd.DataFrame, store: SeriesStore, version: str, fetched_at: float):
+        self.frame = frame
+        self.store = store
+        self.version = version
+        self.fetched_at = fetched_at
+
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class SharedMarketCache:
+    def __init__(self, max_derived: int = 256):
+        self._lock = threading.Lock()
+        self._series: Dict[str, SharedSeriesEntry] = {}
+        self._derived: "OrderedDict[Tuple[str, Tuple[str, ...]], Any]" = OrderedDict()
+        self.max_derived = max_derived
+
+    def get(self, series_id: str) -> Optional[SharedSeriesEntry]:
+        return self._series.get(series_id)
+
+    def publish(self, series_id: str, frame: pd.DataFrame) -> SharedSeriesEntry:
+        """Record a freshly fetched frame; an unchanged version keeps the existing shared frame.
+
+        The shared frame is a view over the version's SeriesStore, so the fetched copy is not kept.
+        """
+        version = frame_version(frame)
+        with self._lock:
+            entry = self._series.get(series_id)
+            if entry is not None and entry.version == version:
+                entry.fetched_at = time.monotonic()
+                return entry
+            store = SeriesStore.from_frame(series_id, frame.columns[1], frame)
+            entry = SharedSeriesEntry(store.to_frame(), store, version, time.monotonic())
+            self._series[series_id] = entry
+            return entry
+
+    def derived(self, name: str, versions: Tuple[str, ...], compute: Callable[[], Any]) -> Any:
+        """Return an analytic computed from the given input versions, computing it at most once."""
+        key = (name, versions)
+        with self._lock:
+            if key in self._derived:
+                self._derived.move_to_end(key)
+                return self._derived[key]
+        value = compute()
+        with self._lock:
+            self._derived[key] = value
+            while len(self._derived) > self.max_derived:
+                self._derived.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+            self._derived.clear()
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution.
+
+    The first caller runs the function; callers arriving while it is in flight
+    block on its outcome and receive the same value, or the same exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Any, Future] = {}
+
+    def do(self, key: Any, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run fn once per in-flight key; returns (value, shared) where shared means another caller ran it."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result(), True
+        try:
+            value = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value, False
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+# One instance per process, shared by every agent / Streamlit session
+SHARED_MARKET_CACHE = SharedMarketCache()
+FRED_FLIGHTS = SingleFlight()
@@ -0,0 +1,46 @@
+"""
+Scoring rule for a BULLISH/BEARISH/NEUTRAL call against the realised rate move.
+
+DebateDatabase.validate_debate_outcome scores real debates with it and
+trend_backtest applies it to every week of the rate history. Plain Python, so
+the database layer does not depend on the analytics stack.
+"""
+
+from typing import Optional, Tuple
+
+BULLISH, BEARISH, NEUTRAL = "BULLISH", "BEARISH", "NEUTRAL"
+
+# A NEUTRAL call is right if rates move less than this (percent)
+NEUTRAL_MOVE_PCT = 5.0
+ACCURACY_SCALE = 20.0
+
+
+def stance_of(recommendation: Optional[str]) -> str:
+    """Stance named in a free-text recommendation."""
+    text = (recommendation or "").lower()
+    if "bearish" in text:
+        return BEARISH
+    if "bullish" in text:
+        return BULLISH
+    return NEUTRAL
+
+
+def score_stance(stance: str, rate_change: float, base_rate: float) -> Tuple[bool, float]:
+    """(correct, accuracy) for one call.
+
+    BEARISH expects rates to rise or hold, BULLISH to fall, NEUTRAL a move under
+    NEUTRAL_MOVE_PCT. Correct directional calls score |move %| x 20 capped at 100,
+    correct neutral calls 50, wrong calls 0.
+    """
+    change_pct = rate_change / base_rate * 100
+    if stance == BEARISH:
+        correct = rate_change >= 0
+    elif stance == BULLISH:
+        correct = rate_change < 0
+    else:
+        correct = abs(change_pct) < NEUTRAL_MOVE_PCT
+    if not correct:
+        return False, 0.0
+    if stance in (BEARISH, BULLISH):
+        return True, min(100.0, abs(change_pct) * ACCURACY_SCALE)
+    return True, 50.0
@@ -0,0 +1,140 @@
+"""
+Rolling analytics for the weekly mortgage-rate series.
+
+compute_rate_analytics turns a series' date and rate arrays (a SeriesStore's)
+into one frame with a column per indicator (moving averages, EWMA, volatility, momentum, drawdown), computed
+with vectorized NumPy kernels (cumulative sums for the means, a strided window
+view for the volatility) rather than per-statistic pandas passes.
+Given the previous result it only recomputes the rows from the first new or
+revised observation onward, reading just enough history for the longest window.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+MA_WINDOWS = (4, 13, 52)  # weeks: month, quarter, year
+MOMENTUM_LAGS = (4, 9, 13)  # 9: the rising/falling lookback of the insights prompt
+VOLATILITY_WINDOW = 10
+EWMA_SPAN = 12
+# Rows of history a recomputed row can depend on
+LOOKBACK = max(max(MA_WINDOWS), max(MOMENTUM_LAGS) + 1, VOLATILITY_WINDOW) - 1
+
+ANALYTIC_COLUMNS = (
+    [f"ma_{w}" for w in MA_WINDOWS]
+    + ["ewma", "volatility"]
+    + [f"momentum_{lag}" for lag in MOMENTUM_LAGS]
+    + ["drawdown"]
+)
+
+
+def _window_sums(values: np.ndarray, window: int):
+    """Trailing sums over up to `window` points and the number of points in each."""
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(0, end - window)
+    return cumsum[end] - cumsum[start], end - start
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean; the first window-1 rows average what is available (like tail(n).mean())."""
+    sums, counts = _window_sums(values, window)
+    return sums / counts
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sample standard deviation (ddof=1); NaN until two points exist.
+
+    Squared deviations from each window's mean are summed over a strided window
+    view rather than taken from running sums of squares, which cancel badly on
+    flat stretches of rates.
+    """
+    if len(values) == 0:
+        return np.empty(0)
+    windows = sliding_window_view(np.concatenate((np.full(window - 1, np.nan), values)), window)
+    deviations = windows - rolling_mean(values, window)[:, None]
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.sqrt(np.nansum(deviations * deviations, axis=1) / (counts - 1))
+
+
+def ewma(values: np.ndarray, span: int, seed: Optional[float] = None, block: int = 256) -> np.ndarray:
+    """Recursive EWMA (pandas ewm(adjust=False)) continuing from seed when given.
+
+    Each block is solved in closed form with a cumulative sum; blocks keep the
+    decay powers well inside float range for long series.
+    """
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    out = np.empty(len(values))
+    offset = 0
+    if seed is None:
+        if len(values) == 0:
+            return out
+        out[0] = seed = values[0]
+        offset = 1
+    powers = decay ** np.arange(block)
+    for start in range(offset, len(values), block):
+        chunk = values[start:start + block]
+        k = powers[:len(chunk)]
+        out[start:start + len(chunk)] = decay * k * seed + alpha * k * np.cumsum(chunk / k)
+        seed = out[start + len(chunk) - 1]
+    return out
+
+
+def _momentum(values: np.ndarray, lag: int) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    out[lag:] = values[lag:] - values[:-lag]
+    return out
+
+
+def _first_changed_row(dates: np.ndarray, rates: np.ndarray, previous: pd.DataFrame) -> int:
+    """Index of the first row whose date or rate differs from the previous result."""
+    n = min(len(rates), len(previous))
+    same = ((dates[:n] == previous["date"].values[:n]) &
+            (rates[:n] == previous["rate"].values[:n]))
+    changed = np.flatnonzero(~same)
+    return int(changed[0]) if len(changed) else n
+
+
+def compute_rate_analytics(dates: np.ndarray, rates: np.ndarray,
+                           previous: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Return (date, rate) with one column per analytic in ANALYTIC_COLUMNS.
+
+    dates and rates are date-sorted arrays, e.g. a SeriesStore's dates and values.
+    With `previous` (an earlier result for the same series) rows before the first
+    new or revised observation are reused as-is.
+    """
+    rates = np.asarray(rates, dtype=float)
+    start = 0
+    if previous is not None and len(previous) and set(ANALYTIC_COLUMNS) <= set(previous.columns):
+        start = _first_changed_row(dates, rates, previous)
+        if start == len(rates) == len(previous):
+            return previous
+    # History needed to recompute rows start..end exactly
+    context = max(0, start - LOOKBACK)
+    values = rates[context:]
+    keep = start - context
+
+    ewma_seed = peak_seed = None
+    if start > 0:
+        ewma_seed = float(previous["ewma"].iloc[start - 1])
+        peak_seed = float(previous["rate"].iloc[start - 1] - previous["drawdown"].iloc[start - 1])
+
+    tail = {f"ma_{w}": rolling_mean(values, w)[keep:] for w in MA_WINDOWS}
+    tail["ewma"] = ewma(values[keep:], EWMA_SPAN, seed=ewma_seed)
+    tail["volatility"] = rolling_std(values, VOLATILITY_WINDOW)[keep:]
+    for lag in MOMENTUM_LAGS:
+        tail[f"momentum_{lag}"] = _momentum(values, lag)[keep:]
+    peaks = np.maximum.accumulate(values[keep:])
+    if peak_seed is not None:
+        peaks = np.maximum(peaks, peak_seed)
+    tail["drawdown"] = values[keep:] - peaks
+
+    columns = {"date": dates, "rate": rates}
+    for name in ANALYTIC_COLUMNS:
+        head = previous[name].to_numpy()[:start] if start > 0 else np.empty(0)
+        columns[name] = np.concatenate((head, tail[name]))
+    return pd.DataFrame(columns)
@@ -0,0 +1,148 @@
+"""
+Monte Carlo simulation of 12-month mortgage-rate paths.
+
+fit_rate_model fits a discrete Ornstein-Uhlenbeck (mean-reverting) model to
+recent weekly rates by least squares: each week the rate moves kappa of the way
+toward its long-run level mu, plus a normal shock. The shock size is the
+current regime's weekly volatility when one is given (see rate_regimes), else
+the fit's residual spread. simulate_rate_paths draws all paths for a week in
+one vectorized step; runs are split into chunks with independent seeds, and very
+large runs are spread over a process pool when more than one worker is
+configured. The result is identical however the chunks are scheduled.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+import config
+
+HORIZON_WEEKS = 52
+# Recent history the model is fitted to (10 years)
+FIT_WEEKS = 520
+PERCENTILES = (5, 25, 50, 75, 95)
+# Paths per chunk; chunks are the unit of work for the process pool
+CHUNK_PATHS = 10_000
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class RateModel:
+    start_rate: float
+    mu: float  # long-run level the rate reverts to
+    kappa: float  # share of the gap to mu closed each week
+    sigma: float  # weekly shock, percentage points
+
+
+def fit_rate_model(rates: np.ndarray, volatility: Optional[float] = None, fit_weeks: int = FIT_WEEKS) -> Optional[RateModel]:
+    """Least-squares fit of r[t+1] - r[t] = kappa * (mu - r[t]) + e over the last fit_weeks."""
+    rates = np.asarray(rates, dtype=float)[-(fit_weeks + 1):]
+    if len(rates) < 3:
+        return None
+    level, step = rates[:-1], np.diff(rates)
+    slope, intercept = np.polyfit(level, step, 1)
+    kappa = float(np.clip(-slope, 0.0, 1.0))
+    mu = float(intercept / kappa) if kappa > 0 else float(rates[-1])
+    residuals = step - (intercept + slope * level)
+    sigma = float(volatility) if volatility else float(residuals.std(ddof=2))
+    return RateModel(start_rate=float(rates[-1]), mu=mu, kappa=kappa, sigma=sigma)
+
+
+def _simulate_chunk(model: RateModel, n_paths: int, weeks: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """(n_paths, weeks) float32 rate paths, one vectorized step per week."""
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((weeks, n_paths)) * model.sigma
+    paths = np.empty((weeks, n_paths))
+    rate = np.full(n_paths, model.start_rate)
+    for week in range(weeks):
+        # Mortgage rates do not go negative
+        rate = np.maximum(rate + model.kappa * (model.mu - rate) + shocks[week], 0.0)
+        paths[week] = rate
+    return paths.T.astype(np.float32)
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    """Process-wide pool; spawned (not forked) so Streamlit's threads are not copied into workers."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _POOL
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Shut down a failed pool so the next large run starts a fresh one."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def simulate_rate_paths(model: RateModel, n_paths: int = None, weeks: int = HORIZON_WEEKS,
+                        seed: int = None, workers: int = None,
+                        log: Optional[Callable[[str], None]] = None) -> np.ndarray:
+    """(n_paths, weeks) simulated paths; deterministic for a given seed and chunking.
+
+    The process pool is only used for runs of at least MONTE_CARLO_POOL_MIN_PATHS;
+    if it fails, the run is simulated in-process and the failure passed to log.
+    """
+    n_paths = n_paths or config.MONTE_CARLO_PATHS
+    seed = config.MONTE_CARLO_SEED if seed is None else seed
+    workers = config.MONTE_CARLO_WORKERS if workers is None else workers
+    sizes = [min(CHUNK_PATHS, n_paths - start) for start in range(0, n_paths, CHUNK_PATHS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers > 1 and len(sizes) > 1 and n_paths >= config.MONTE_CARLO_POOL_MIN_PATHS:
+        pool = _pool(workers)
+        try:
+            futures = [pool.submit(_simulate_chunk, model, size, weeks, s) for size, s in zip(sizes, seeds)]
+            return np.concatenate([f.result() for f in futures])
+        except Exception as e:
+            _discard_pool(pool)
+            if log:
+                log(f"⚠️ Monte Carlo process pool failed ({e}) → simulating in-process.")
+    return np.concatenate([_simulate_chunk(model, size, weeks, s) for size, s in zip(sizes, seeds)])
+
+
+def simulate_outlook(dates: np.ndarray, rates: np.ndarray, volatility: Optional[float] = None,
+                     threshold: float = config.RATE_CHANGE_THRESHOLD, n_paths: int = None,
+                     weeks: int = HORIZON_WEEKS, log: Optional[Callable[[str], None]] = None) -> Optional[Dict]:
+    """Fitted model, weekly percentile bands and threshold-crossing probabilities.
+
+    dates and rates are the date-sorted weekly series (e.g. a SeriesStore's arrays).
+    """
+    if rates is None or len(rates) < 3:
+        return None
+    model = fit_rate_model(np.asarray(rates, dtype=float), volatility)
+    if model is None:
+        return None
+    paths = simulate_rate_paths(model, n_paths, weeks, log=log)
+    bands = np.percentile(paths, PERCENTILES, axis=0)
+    last_date = pd.Timestamp(dates[-1])
+    up, down = model.start_rate + threshold, model.start_rate - threshold
+    final = paths[:, -1]
+    return {
+        "model": model,
+        "paths": len(paths),
+        "weeks": weeks,
+        "threshold": threshold,
+        "bands": pd.DataFrame(
+            {f"p{p}": band for p, band in zip(PERCENTILES, bands)},
+        ).assign(date=last_date + pd.to_timedelta(np.arange(1, weeks + 1) * 7, unit="D")),
+        "median_end": float(np.median(final)),
+        "p5_end": float(bands[0, -1]),
+        "p95_end": float(bands[-1, -1]),
+        # Where the rate ends the horizon relative to today +/- threshold
+        "p_end_above": float(np.mean(final >= up)),
+        "p_end_below": float(np.mean(final <= down)),
+        # Whether it gets there at any point along the way
+        "p_touch_above": float(np.mean(paths.max(axis=1) >= up)),
+        "p_touch_below": float(np.mean(paths.min(axis=1) <= down)),
+    }
@@ -0,0 +1,150 @@
+"""
+Lagged and rolling correlation between mortgage-rate changes and home-price growth.
+
+Both series are put on a common monthly grid (weekly rates averaged per month)
+and turned into year-over-year changes: rate change in points, home-price change
+in percent. lagged_correlation gives the Pearson correlation of rate changes with
+price changes `lag` months later for every lag at once: the cross products come
+from one FFT convolution and the per-lag means and variances from cumulative
+sums, so the cost is O(n log n) however many lags are asked for. It works along
+the last axis, so many series can be profiled against the same rate series in
+one call.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MAX_LAG_MONTHS = 24
+ROLLING_WINDOW_MONTHS = 60
+# A window's strongest lag within this many months of the full-sample one counts as agreeing
+STABLE_LAG_BAND = 3
+
+
+def _monthly(store) -> Tuple[np.ndarray, np.ndarray]:
+    """Months (datetime64[M]) a SeriesStore has observations in and its mean in each."""
+    keys, inverse = np.unique(store.dates.astype("datetime64[M]"), return_inverse=True)
+    return keys, np.bincount(inverse, weights=store.values) / np.bincount(inverse)
+
+
+def _window_sums(values: np.ndarray, start: np.ndarray, stop: np.ndarray) -> np.ndarray:
+    cumsum = np.concatenate((np.zeros(values.shape[:-1] + (1,)), np.cumsum(values, axis=-1)), axis=-1)
+    return cumsum[..., stop] - cumsum[..., start]
+
+
+def lagged_correlation(x: np.ndarray, y: np.ndarray, max_lag: int = MAX_LAG_MONTHS) -> np.ndarray:
+    """Pearson corr(x[t], y[t + lag]) for lag = 0..max_lag, along the last axis.
+
+    x and y must have the same length and no missing values; leading axes broadcast.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = x.shape[-1]
+    max_lag = min(max_lag, n - 2)
+    # Demeaning does not change the correlation but keeps the sums well conditioned
+    x = x - x.mean(axis=-1, keepdims=True)
+    y = y - y.mean(axis=-1, keepdims=True)
+    nfft = 1 << int(2 * n - 1).bit_length()
+    cross = np.fft.irfft(np.conj(np.fft.rfft(x, nfft)) * np.fft.rfft(y, nfft), nfft)[..., :max_lag + 1]
+
+    lags = np.arange(max_lag + 1)
+    count = n - lags
+    # x[0:n-lag] pairs with y[lag:n]
+    sx = _window_sums(x, np.zeros_like(lags), count)
+    sxx = _window_sums(x * x, np.zeros_like(lags), count)
+    sy = _window_sums(y, lags, np.full_like(lags, n))
+    syy = _window_sums(y * y, lags, np.full_like(lags, n))
+    covariance = cross - sx * sy / count
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return covariance / np.sqrt((sxx - sx * sx / count) * (syy - sy * sy / count))
+
+
+def rolling_lagged_correlation(x: np.ndarray, y: np.ndarray, window: int = ROLLING_WINDOW_MONTHS,
+                               max_lag: int = MAX_LAG_MONTHS) -> np.ndarray:
+    """(lags, windows) matrix of corr(x[t], y[t + lag]) over trailing `window`-month windows.
+
+    Column j scores every lag on the same target months y[j + max_lag : j + max_lag + window].
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    windows = n - max_lag - window + 1
+    if windows <= 0:
+        return np.empty((max_lag + 1, 0))
+    x = x - x.mean()
+    y = y - y.mean()
+    lags = np.arange(max_lag + 1)[:, None]
+    # Row `lag` holds x[t] * y[t + lag], zero past the end of y
+    padded = np.concatenate((y, np.zeros(max_lag)))
+    products = x[None, :] * padded[np.arange(n)[None, :] + lags]
+
+    y_stop = np.arange(windows)[None, :] + max_lag + window
+    y_start = y_stop - window
+    x_start, x_stop = y_start - lags, y_stop - lags
+    cxy = np.concatenate((np.zeros((max_lag + 1, 1)), np.cumsum(products, axis=1)), axis=1)
+    sxy = np.take_along_axis(cxy, x_stop, axis=1) - np.take_along_axis(cxy, x_start, axis=1)
+    cx, cxx = (np.concatenate(([0.0], np.cumsum(v))) for v in (x, x * x))
+    cy, cyy = (np.concatenate(([0.0], np.cumsum(v))) for v in (y, y * y))
+    sx, sxx = cx[x_stop] - cx[x_start], cxx[x_stop] - cxx[x_start]
+    sy, syy = cy[y_stop] - cy[y_start], cyy[y_stop] - cyy[y_start]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (sxy - sx * sy / window) / np.sqrt((sxx - sx * sx / window) * (syy - sy * sy / window))
+
+
+def yoy_changes(rate_store, price_store) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Monthly (months, rate_change, price_yoy) arrays over the months both series cover."""
+    rate_months, rates = _monthly(rate_store)
+    price_months, prices = _monthly(price_store)
+    if not len(rate_months) or not len(price_months):
+        return None
+    # Both series on one month grid, NaN where a series has no observations
+    first = min(rate_months[0], price_months[0])
+    size = int(max(rate_months[-1], price_months[-1]) - first) + 1
+    rate_grid = np.full(size, np.nan)
+    rate_grid[(rate_months - first).astype(int)] = rates
+    price_grid = np.full(size, np.nan)
+    price_grid[(price_months - first).astype(int)] = prices
+    rate_change = rate_grid[12:] - rate_grid[:-12]
+    price_yoy = (price_grid[12:] / price_grid[:-12] - 1) * 100
+    rows = np.flatnonzero(~(np.isnan(rate_change) | np.isnan(price_yoy)))
+    if not len(rows):
+        return None
+    # Keep the trailing run of consecutive months so lags are whole months apart
+    gaps = np.flatnonzero(np.diff(rows) != 1)
+    if len(gaps):
+        rows = rows[gaps[-1] + 1:]
+    months = first + 12 + rows
+    return months.astype("datetime64[ns]"), rate_change[rows], price_yoy[rows]
+
+
+def rate_price_correlation(rate_store, price_store, max_lag: int = MAX_LAG_MONTHS,
+                           window: int = ROLLING_WINDOW_MONTHS) -> Optional[Dict]:
+    """Lag profile, strongest lag and its stability; None without enough overlapping months."""
+    changes = yoy_changes(rate_store, price_store)
+    if changes is None or len(changes[0]) < max_lag + window:
+        return None
+    months, x, y = changes
+    profile = lagged_correlation(x, y, max_lag)
+    best = int(np.nanargmax(np.abs(profile)))
+    rolling = rolling_lagged_correlation(x, y, window, max_lag)
+    window_best = np.nanargmax(np.abs(np.nan_to_num(rolling)), axis=0)
+    at_best = rolling[best]
+    return {
+        "profile": pd.DataFrame({"lag_months": np.arange(len(profile)), "correlation": profile}),
+        "rolling": pd.DataFrame({
+            "date": months[max_lag + window - 1:],
+            "corr_lag_0": rolling[0],
+            "corr_best_lag": at_best,
+            "window_best_lag": window_best,
+        }),
+        "best_lag_months": best,
+        "correlation": float(profile[best]),
+        # Share of rolling windows whose own strongest lag is near the full-sample one
+        "lag_stability": float(np.mean(np.abs(window_best - best) <= STABLE_LAG_BAND)),
+        # Share of rolling windows where the correlation at the best lag keeps its sign
+        "sign_stability": float(np.mean(np.sign(at_best) == np.sign(profile[best]))),
+        "recent_correlation": float(at_best[-1]),
+        "since": pd.Timestamp(months[0]),
+        "months": len(months),
+    }
@@ -0,0 +1,184 @@
+"""
+Regime segmentation of the weekly mortgage-rate series.
+
+The rate history is split into segments by binary segmentation with a
+piecewise-linear cost (log residual variance of a straight-line fit). Every
+candidate split's cost comes from cumulative sums of t, t², y, ty and y², so
+each level of the search is one vectorized O(n) pass and the whole history
+segments in O(n log n). Each segment is then labelled rising, falling, plateau
+or high-volatility from its fitted drift and the spread of its weekly moves.
+
+Given the previous result, segments ending before the last one (and before any
+revised observation) are kept as-is and only the tail is re-segmented, so a new
+week costs a pass over the current regime rather than the whole history.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+RISING, FALLING, PLATEAU, HIGH_VOLATILITY = "rising", "falling", "plateau", "high-volatility"
+
+MIN_SEGMENT_WEEKS = 13  # a quarter
+# Split only if it improves the cost by more than PENALTY x log(weeks)
+PENALTY = 10.0
+# Drift beyond this many points a year counts as a trend
+TREND_PP_PER_YEAR = 0.5
+# Standard deviation of weekly moves (points) above which a segment is high-volatility
+HIGH_VOLATILITY_PP = 0.12
+# Rates print to 0.01; keeps the cost finite for near-perfect line fits
+VARIANCE_FLOOR = 1e-4
+
+SEGMENT_COLUMNS = ["start_row", "end_row", "start", "end", "weeks", "regime",
+                   "drift_pp_per_year", "volatility", "start_rate", "end_rate"]
+
+
+def _cumulative_moments(y: np.ndarray):
+    """Prefix sums of t, t², y, ty, y² (t scaled to [0, 1) to keep them well conditioned)."""
+    t = np.arange(len(y)) / max(len(y), 1)
+    return [np.concatenate(([0.0], np.cumsum(v))) for v in (t, t * t, y, t * y, y * y)]
+
+
+def _segment_costs(moments, a, b):
+    """len x log(residual variance of a line fit to y[a:b]), for scalar or array bounds."""
+    st, stt, sy, sty, syy = (m[b] - m[a] for m in moments)
+    n = b - a
+    tt = stt - st * st / n
+    ty = sty - st * sy / n
+    yy = syy - sy * sy / n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rss = yy - np.where(tt > 0, ty * ty / tt, 0.0)
+    return n * np.log(np.maximum(rss / n, VARIANCE_FLOOR))
+
+
+def changepoints(y: np.ndarray, min_size: int = MIN_SEGMENT_WEEKS, penalty: float = PENALTY,
+                 history: Optional[int] = None) -> np.ndarray:
+    """Sorted segment boundaries of y (always including 0 and len(y)).
+
+    history is the full series length when y is a re-segmented tail, so the
+    split threshold matches a full run.
+    """
+    n = len(y)
+    bounds = [0, n]
+    if n < 2 * min_size:
+        return np.array(bounds)
+    moments = _cumulative_moments(y)
+    threshold = penalty * np.log(history or n)
+    stack = [(0, n)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2 * min_size:
+            continue
+        splits = np.arange(a + min_size, b - min_size + 1)
+        gains = (_segment_costs(moments, a, b)
+                 - _segment_costs(moments, a, splits)
+                 - _segment_costs(moments, splits, b))
+        best = int(np.argmax(gains))
+        if gains[best] > threshold:
+            t = int(splits[best])
+            bounds.append(t)
+            stack.extend(((a, t), (t, b)))
+    return np.array(sorted(bounds))
+
+
+def classify(drift_pp_per_year, volatility):
+    """Regime label(s) for segment drift (points/year) and weekly volatility (points)."""
+    drift = np.asarray(drift_pp_per_year, dtype=float)
+    return np.where(np.asarray(volatility, dtype=float) > HIGH_VOLATILITY_PP, HIGH_VOLATILITY,
+                    np.where(drift > TREND_PP_PER_YEAR, RISING,
+                             np.where(drift < -TREND_PP_PER_YEAR, FALLING, PLATEAU)))
+
+
+def _describe(dates: np.ndarray, rates: np.ndarray, bounds: np.ndarray) -> pd.DataFrame:
+    """One row per segment rates[bounds[i]:bounds[i+1]] (end_row exclusive)."""
+    start, stop = bounds[:-1], bounds[1:]
+    weeks = stop - start
+    moments = _cumulative_moments(rates)
+    st, stt, sy, sty, _ = (m[stop] - m[start] for m in moments)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.where(weeks > 1, (sty - st * sy / weeks) / (stt - st * st / weeks), 0.0)
+    # Slope is per unit of scaled t; one week is 1 / len(rates)
+    drift = slope / max(len(rates), 1) * 52
+    # Spread of weekly moves inside each segment
+    moves = np.concatenate(([0.0], np.diff(rates)))
+    m1 = np.concatenate(([0.0], np.cumsum(moves)))
+    m2 = np.concatenate(([0.0], np.cumsum(moves * moves)))
+    count = weeks - 1
+    first = start + 1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (m1[stop] - m1[first]) / count
+        variance = ((m2[stop] - m2[first]) - count * mean * mean) / (count - 1)
+    volatility = np.sqrt(np.clip(np.nan_to_num(variance), 0.0, None))
+    return pd.DataFrame({
+        "start_row": start,
+        "end_row": stop,
+        "start": dates[start],
+        "end": dates[stop - 1],
+        "weeks": weeks,
+        "regime": classify(drift, volatility),
+        "drift_pp_per_year": drift,
+        "volatility": volatility,
+        "start_rate": rates[start],
+        "end_rate": rates[stop - 1],
+    }, columns=SEGMENT_COLUMNS)
+
+
+def _first_changed_row(dates: np.ndarray, rates: np.ndarray, previous: Dict) -> int:
+    n = min(len(dates), len(previous["dates"]))
+    same = (dates[:n] == previous["dates"][:n]) & (rates[:n] == previous["rates"][:n])
+    changed = np.flatnonzero(~same)
+    return int(changed[0]) if len(changed) else n
+
+
+def detect_regimes(dates: np.ndarray, values: np.ndarray, previous: Optional[Dict] = None) -> Optional[Dict]:
+    """Segment date-sorted rate arrays (a SeriesStore's) into regimes; None with fewer than two observations.
+
+    Returns {"segments": DataFrame[SEGMENT_COLUMNS], "dates", "rates"}. With
+    `previous` (an earlier result for the same series) only segments from the
+    last one, or from the first revised observation, onward are recomputed.
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2:
+        return None
+
+    kept = None
+    restart = 0
+    if previous is not None and len(previous["segments"]):
+        changed = _first_changed_row(dates, values, previous)
+        if changed == len(values) == len(previous["rates"]):
+            return previous
+        segments = previous["segments"]
+        # Segments that end before the first revised row, excluding the open last one
+        closed = segments.iloc[:-1]
+        kept = closed[closed["end_row"].to_numpy() <= changed]
+        restart = int(kept["end_row"].iloc[-1]) if len(kept) else 0
+
+    bounds = changepoints(values[restart:], history=len(values)) + restart
+    tail = _describe(dates, values, bounds)
+    if kept is not None and len(kept):
+        tail = pd.concat([kept, tail], ignore_index=True)
+    return {"segments": tail, "dates": dates, "rates": values}
+
+
+def current_regime(result: Optional[Dict]) -> Optional[Dict]:
+    """Label, start date and age in weeks of the latest regime.
+
+    Consecutive segments with the same label count as one regime.
+    """
+    if result is None or not len(result["segments"]):
+        return None
+    segments = result["segments"]
+    labels = segments["regime"].to_numpy()
+    first = len(labels) - 1
+    while first > 0 and labels[first - 1] == labels[-1]:
+        first -= 1
+    latest = segments.iloc[-1]
+    since = pd.Timestamp(segments["start"].iloc[first])
+    return {
+        "regime": str(labels[-1]),
+        "since": since,
+        "age_weeks": int(segments["weeks"].iloc[first:].sum()),
+        "drift_pp_per_year": float(latest["drift_pp_per_year"]),
+        "volatility": float(latest["volatility"]),
+    }
@@ -0,0 +1,57 @@
+"""
+Compact array-backed storage for one FRED series.
+
+A SeriesStore is two contiguous, read-only NumPy arrays (day-resolution dates
+held as datetime64[ns], and float values) in a __slots__ object. It is the one
+copy of a published series version. The analytics take its arrays directly:
+rolling analytics, regimes, the trend backtest and the rate outlook (via the
+agent), as-of joins and alignment (fred_ingest), as-of lookups (asof_index) and
+the rate/home-price correlation. The frame charts read is a zero-copy view over
+the same arrays (to_frame). One store is built per published series version
+and shared by every session (see market_cache.SharedSeriesEntry).
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class SeriesStore:
+    __slots__ = ("series_id", "column", "dates", "values")
+
+    def __init__(self, series_id: str, column: str, dates: np.ndarray, values: np.ndarray):
+        self.series_id = series_id
+        self.column = column
+        self.dates = dates
+        self.values = values
+
+    @classmethod
+    def from_frame(cls, series_id: str, column: str, frame: pd.DataFrame, dtype=np.float64) -> "SeriesStore":
+        """Copy a (date, column) frame into read-only datetime64[ns] / dtype arrays, sorted by date.
+
+        Dates keep pandas' native unit (same 8 bytes as datetime64[D]) so to_frame needs no copy.
+        """
+        if not frame["date"].is_monotonic_increasing:
+            frame = frame.sort_values("date")
+        dates = np.array(frame["date"].to_numpy(dtype="datetime64[ns]"))
+        values = np.array(frame[column].to_numpy(), dtype=dtype)
+        dates.flags.writeable = False
+        values.flags.writeable = False
+        return cls(series_id, column, dates, values)
+
+    def to_frame(self) -> pd.DataFrame:
+        """(date, column) frame over this store's arrays; no data is copied and it is read-only."""
+        return pd.DataFrame({"date": self.dates, self.column: self.values}, copy=False)
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + self.values.nbytes
+
+    def latest(self) -> Optional[Tuple[pd.Timestamp, float]]:
+        if not len(self.dates):
+            return None
+        return pd.Timestamp(self.dates[-1]), float(self.values[-1])
@@ -0,0 +1,70 @@
+"""
+fred_ingest.asof_join matches pd.merge_asof, both from scratch and when an
+earlier join is reused after new or revised observations. Runs on the recorded
+mortgage-rate and home-price series (agent_state.json).
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fred_ingest import MarketDataStore, asof_join  # noqa: E402
+from fred_stub_server import load_recorded_series  # noqa: E402
+from series_store import SeriesStore  # noqa: E402
+
+
+def _frame(series_id, column):
+    df = load_recorded_series()[series_id]
+    return pd.DataFrame({"date": df["observation_date"], column: df[series_id].astype(float)})
+
+
+@pytest.fixture(scope="module")
+def rates():
+    return _frame("MORTGAGE30US", "rate")
+
+
+@pytest.fixture(scope="module")
+def prices():
+    return _frame("CSUSHPINSA", "price")
+
+
+def _store(series_id, frame):
+    return SeriesStore.from_frame(series_id, frame.columns[1], frame)
+
+
+def _merge_asof(rates, prices):
+    return pd.merge_asof(rates, prices, on="date", direction="backward")
+
+
+def test_asof_join_matches_merge_asof(rates, prices):
+    joined = asof_join(_store("MORTGAGE30US", rates), _store("CSUSHPINSA", prices))
+    pd.testing.assert_frame_equal(joined, _merge_asof(rates, prices))
+
+
+def test_incremental_rejoin_matches_merge_asof(rates, prices):
+    old_rates, old_prices = rates.iloc[:-8], prices.iloc[:-1]
+    left, right = _store("MORTGAGE30US", old_rates), _store("CSUSHPINSA", old_prices)
+    previous = (left, right, asof_join(left, right))
+    # New weeks and a new month arrive, and FRED revises an earlier month
+    revised_prices = prices.copy()
+    revised_prices.loc[revised_prices.index[-4], "price"] += 1.5
+
+    joined = asof_join(_store("MORTGAGE30US", rates), _store("CSUSHPINSA", revised_prices), previous)
+
+    pd.testing.assert_frame_equal(joined, _merge_asof(rates, revised_prices))
+
+
+def test_market_data_store_rejoins_after_update(rates, prices):
+    store = MarketDataStore()
+    store.update("MORTGAGE30US", rates.iloc[:-8])
+    store.update("CSUSHPINSA", prices)
+    first = store.asof_joined("MORTGAGE30US", "CSUSHPINSA")
+    assert store.asof_joined("MORTGAGE30US", "CSUSHPINSA") is first
+
+    store.update("MORTGAGE30US", rates)
+
+    pd.testing.assert_frame_equal(store.asof_joined("MORTGAGE30US", "CSUSHPINSA"), _merge_asof(rates, prices))
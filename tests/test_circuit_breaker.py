@@ -0,0 +1,105 @@
+"""
+CircuitBreaker state machine: closed → open after failure_threshold failures,
+open → half-open once reset_seconds pass, a single half-open probe whose result
+closes or re-opens the circuit, and p99-based timeouts clamped to their bounds.
+Uses a short reset delay instead of the configured one.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError  # noqa: E402
+
+RESET_SECONDS = 0.05
+
+
+def _breaker(**kwargs):
+    kwargs.setdefault("failure_threshold", 3)
+    kwargs.setdefault("reset_seconds", RESET_SECONDS)
+    return CircuitBreaker("fred.example", **kwargs)
+
+
+def _fail(breaker, times):
+    for _ in range(times):
+        probe = breaker.before_request()
+        breaker.record_failure(probe)
+
+
+def _open(breaker):
+    _fail(breaker, breaker.failure_threshold)
+    assert breaker.state == OPEN
+
+
+def test_opens_after_threshold_consecutive_failures():
+    breaker = _breaker()
+    _fail(breaker, 2)
+    breaker.record_success(0.1, breaker.before_request())  # a success resets the count
+    _fail(breaker, 2)
+    assert breaker.state == CLOSED
+
+    _fail(breaker, 1)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    assert breaker.counters["short_circuited"] == 1
+    assert breaker.counters["opened"] == 1
+
+
+def test_single_half_open_probe_closes_on_success():
+    breaker = _breaker()
+    _open(breaker)
+    time.sleep(RESET_SECONDS * 2)
+
+    assert breaker.before_request() is True
+    assert breaker.state == HALF_OPEN
+    # Other callers are short-circuited while the probe is in flight
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    breaker.record_success(0.1, probe=True)
+
+    assert breaker.state == CLOSED
+    assert breaker.before_request() is False
+    assert [(old, new) for _, old, new in breaker.transitions] == [
+        (CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED),
+    ]
+
+
+def test_failed_probe_reopens():
+    breaker = _breaker()
+    _open(breaker)
+    time.sleep(RESET_SECONDS * 2)
+
+    breaker.record_failure(breaker.before_request())
+
+    assert breaker.state == OPEN
+    assert breaker.counters["opened"] == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    time.sleep(RESET_SECONDS * 2)
+    assert breaker.before_request() is True
+
+
+def test_timeout_is_max_until_enough_samples():
+    breaker = _breaker(min_timeout=2, max_timeout=30, timeout_multiplier=3, min_samples=5)
+    for _ in range(4):
+        breaker.record_success(0.5)
+    assert breaker.timeout() == 30
+
+    breaker.record_success(0.5)
+    assert breaker.timeout() == 2  # 0.5 s x 3 = 1.5, clamped up to min_timeout
+
+
+@pytest.mark.parametrize("latency, expected", [(0.1, 2.0), (1.0, 3.0), (20.0, 30.0)])
+def test_timeout_clamps_p99_times_multiplier(latency, expected):
+    breaker = _breaker(min_timeout=2, max_timeout=30, timeout_multiplier=3, min_samples=5)
+    for _ in range(10):
+        breaker.record_success(latency)
+
+    assert breaker.timeout() == pytest.approx(expected)
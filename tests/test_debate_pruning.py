@@ -0,0 +1,60 @@
+"""
+Debate rounds are keyed on market data: regenerating the summary keeps them,
+a market-data change clears them. Runs the agent against the local FRED
+stand-in (fred_stub_server.py), without an LLM client.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from circuit_breaker import HTTP_CIRCUITS  # noqa: E402
+from fred_stub_server import FredStubServer  # noqa: E402
+from market_cache import SHARED_MARKET_CACHE  # noqa: E402
+from AgenticMortgageResearchAgent import DEBATE_KEYS, AgenticMortgageResearchAgent  # noqa: E402
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    stub = FredStubServer().start()
+    monkeypatch.setattr(config, "FRED_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "FRED_EXTRA_SERIES", [])
+    SHARED_MARKET_CACHE.clear()
+    HTTP_CIRCUITS.reset()
+    agent = AgenticMortgageResearchAgent()
+    agent.ingestion.base_url = stub.url
+    agent.summarize_insights()
+    # A finished debate, stamped the way the debate rounds record themselves
+    for name in DEBATE_KEYS:
+        agent.knowledge[name] = {"Planner": {"stance": "NEUTRAL"}}
+        agent.derivations.record(name)
+    yield agent
+    stub.stop()
+    SHARED_MARKET_CACHE.clear()
+
+
+def test_regenerate_summary_keeps_debate(agent):
+    summary_version = agent.derivations.version("summary")
+    agent.summarize_insights(force=True)
+    assert agent.derivations.version("summary") != summary_version
+
+    agent.prune_stale_debate()
+
+    assert all(name in agent.knowledge for name in DEBATE_KEYS)
+    assert not any("cleared stale debate" in line for line in agent.logs)
+
+
+def test_market_data_change_clears_debate_and_names_input(agent):
+    rates = agent.knowledge["mortgage_rates"].copy()
+    rates.loc[rates.index[-1], "rate"] += 0.5
+    agent.knowledge["mortgage_rates"] = rates
+
+    agent.prune_stale_debate()
+
+    assert not any(name in agent.knowledge for name in DEBATE_KEYS)
+    cleared = [line for line in agent.logs if "cleared stale debate" in line]
+    assert len(cleared) == 1 and "rate_insights" in cleared[0]
@@ -0,0 +1,61 @@
+"""
+An incremental refresh re-requests the last few cached observations, so FRED
+revisions to recent months land in the cache. Runs the ingestion engine against
+the local FRED stand-in (fred_stub_server.py).
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fred_cache import FredSeriesCache  # noqa: E402
+from fred_ingest import SERIES_REGISTRY, FredIngestionEngine  # noqa: E402
+from fred_stub_server import FredStubServer  # noqa: E402
+
+PRICES = SERIES_REGISTRY["CSUSHPINSA"]
+
+
+@pytest.fixture
+def stub():
+    stub = FredStubServer().start()
+    yield stub
+    stub.stop()
+
+
+def _engine(stub, cache_dir, revision_window=6):
+    return FredIngestionEngine(requests.Session(), FredSeriesCache(str(cache_dir)), base_url=stub.url,
+                               revision_window=revision_window)
+
+
+def test_incremental_refresh_picks_up_revised_month(stub, tmp_path):
+    engine = _engine(stub, tmp_path / "incremental")
+    cached = engine.refresh(PRICES).frame
+    revised_date = cached["date"].iloc[-4]
+    stub.revise(PRICES.series_id, revised_date, 123.456)
+
+    result = engine.refresh(PRICES, cached)
+
+    assert result.mode == "incremental"
+    assert result.since == cached["date"].iloc[-6]
+    full = _engine(stub, tmp_path / "full").refresh(PRICES, incremental=False).frame
+    pd.testing.assert_frame_equal(result.frame, full)
+    assert result.frame.loc[result.frame["date"] == revised_date, "price"].item() == 123.456
+    # The merged frame is what later cold starts seed from
+    pd.testing.assert_frame_equal(engine.cache.load(PRICES.series_id), full)
+
+
+def test_revision_outside_window_needs_full_download(stub, tmp_path):
+    engine = _engine(stub, tmp_path, revision_window=2)
+    cached = engine.refresh(PRICES).frame
+    stub.revise(PRICES.series_id, cached["date"].iloc[-4], 123.456)
+
+    incremental = engine.refresh(PRICES, cached).frame
+    full = engine.refresh(PRICES, cached, incremental=False).frame
+
+    pd.testing.assert_frame_equal(incremental, cached)
+    assert full["price"].iloc[-4] == 123.456
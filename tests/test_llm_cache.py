@@ -0,0 +1,131 @@
+"""
+LLMResponseCache against a tmp_path database: TTL expiry, least-recently-used
+trimming to max_entries, batched last_used write-back and the in-memory front,
+plus the agent's bypass_llm_cache path (fresh calls whose replies replace the
+cached ones). A fake clock stands in for time.time.
+"""
+
+import os
+import sqlite3
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import llm_cache  # noqa: E402
+from llm_cache import TOUCH_BATCH, LLMResponseCache, cache_key  # noqa: E402
+from AgenticMortgageResearchAgent import AgenticMortgageResearchAgent  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_cache, "time", clock)
+    return clock
+
+
+def _cache(tmp_path, **kwargs):
+    return LLMResponseCache(str(tmp_path / "llm_cache.db"), **kwargs)
+
+
+def _disk(cache, column="key"):
+    with sqlite3.connect(cache.db_path) as conn:
+        return dict(conn.execute(f"SELECT key, {column} FROM llm_responses").fetchall())
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = _cache(tmp_path, ttl_seconds=60)
+    cache.put("old", "stale reply")
+    clock.now += 30
+    cache.put("new", "fresh reply")
+
+    clock.now += 31
+
+    assert cache.get("old") is None
+    assert cache.get("new") == "fresh reply"
+    # Expired rows are dropped from disk on the next write
+    cache.put("newer", "reply")
+    assert set(_disk(cache)) == {"new", "newer"}
+
+
+def test_trims_to_most_recently_used(tmp_path, clock):
+    cache = _cache(tmp_path, max_entries=3)
+    for key in ("a", "b", "c"):
+        clock.now += 1
+        cache.put(key, key.upper())
+    clock.now += 1
+    assert cache.get("a") == "A"  # a is now more recently used than b and c
+
+    clock.now += 1
+    cache.put("d", "D")
+
+    assert set(_disk(cache)) == {"a", "c", "d"}
+    assert _cache(tmp_path).get("b") is None
+
+
+def test_last_used_written_back_in_batches(tmp_path, clock):
+    cache = _cache(tmp_path)
+    keys = [f"key-{i}" for i in range(TOUCH_BATCH)]
+    for key in keys:
+        cache.put(key, "reply")
+    written = _disk(cache, "last_used")
+
+    clock.now += 1
+    for key in keys[:-1]:
+        cache.get(key)
+    assert _disk(cache, "last_used") == written
+
+    cache.get(keys[-1])
+    assert set(_disk(cache, "last_used").values()) == {clock.now}
+
+
+def test_repeat_hits_are_served_from_memory(tmp_path, clock):
+    cache = _cache(tmp_path)
+    cache.put("key", "reply")
+    with sqlite3.connect(cache.db_path) as conn:
+        conn.execute("DELETE FROM llm_responses")
+
+    assert cache.get("key") == "reply"
+    # A new process (empty memory front) misses, then reads from disk once it is there again
+    assert _cache(tmp_path).get("key") is None
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+class FakeClaude:
+    """Messages API stand-in that numbers its replies."""
+
+    def __init__(self):
+        self.calls = 0
+        self.messages = SimpleNamespace(create=self.create)
+
+    def create(self, **request):
+        self.calls += 1
+        return SimpleNamespace(content=[SimpleNamespace(text=f"reply {self.calls}")], usage=None)
+
+
+def test_bypass_makes_fresh_calls_and_replaces_cached_reply(tmp_path, clock):
+    client = FakeClaude()
+    agent = AgenticMortgageResearchAgent(llm_client=client)
+    agent.llm_cache = _cache(tmp_path)
+
+    assert agent._llm_text("prompt", max_tokens=100, cost=0.01) == "reply 1"
+    assert agent._llm_text("prompt", max_tokens=100, cost=0.01) == "reply 1"
+    assert client.calls == 1 and agent.session_cost == pytest.approx(0.01)
+
+    agent.bypass_llm_cache = True
+    assert agent._llm_text("prompt", max_tokens=100, cost=0.01) == "reply 2"
+    agent.bypass_llm_cache = False
+
+    assert agent._llm_text("prompt", max_tokens=100, cost=0.01) == "reply 2"
+    assert client.calls == 2 and agent.session_cost == pytest.approx(0.02)
+    assert _cache(tmp_path).get(cache_key(llm_cache.config.MODEL_NAME, 100, "prompt")) == "reply 2"
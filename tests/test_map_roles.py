@@ -0,0 +1,167 @@
+"""
+_map_roles against a fake Claude client: role calls run together but results
+and logs come back in role order, a failing role re-raises only after the other
+roles' costs are recorded, and with a cacheable shared prefix the other roles
+wait for the first reply to start, at most LLM_PROMPT_CACHE_WAIT_SECONDS.
+"""
+
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+from AgenticMortgageResearchAgent import AgenticMortgageResearchAgent  # noqa: E402
+
+ROLES = ["Planner", "Market Analyst", "Risk Officer"]
+# Matches each role's prompt in _llm_role_insights
+ROLE_PROMPTS = {"Planner": "agent planner", "Market Analyst": "market analyst", "Risk Officer": "risk officer"}
+
+
+def _role_of(request):
+    prompt = request["messages"][0]["content"]
+    return next(role for role, text in ROLE_PROMPTS.items() if text in prompt)
+
+
+class FakeStream:
+    def __init__(self, client, role):
+        self.client = client
+        self.role = role
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        time.sleep(self.client.first_token_delay.get(self.role, 0))
+        self.client.events.append(("first token", self.role))
+        yield f"{self.role} "
+        time.sleep(self.client.delay.get(self.role, 0))
+        yield "reply"
+        self.client.events.append(("done", self.role))
+
+    def get_final_message(self):
+        return SimpleNamespace(usage=SimpleNamespace(input_tokens=10, output_tokens=5))
+
+
+class FakeClaude:
+    """Messages API stand-in; per-role delays decide which call finishes first."""
+
+    def __init__(self, delay=None, first_token_delay=None, fail=()):
+        self.delay = delay or {}
+        self.first_token_delay = first_token_delay or {}
+        self.fail = fail
+        self.events = []
+        self._lock = threading.Lock()
+        self.messages = SimpleNamespace(create=self.create, stream=self.stream)
+
+    def _start(self, request):
+        role = _role_of(request)
+        with self._lock:
+            self.events.append(("sent", role))
+        if role in self.fail:
+            raise RuntimeError(f"{role} call failed")
+        return role
+
+    def create(self, **request):
+        role = self._start(request)
+        time.sleep(self.delay.get(role, 0))
+        with self._lock:
+            self.events.append(("done", role))
+        return SimpleNamespace(content=[SimpleNamespace(text=f"{role} reply")],
+                               usage=SimpleNamespace(input_tokens=10, output_tokens=5))
+
+    def stream(self, **request):
+        return FakeStream(self, self._start(request))
+
+
+@pytest.fixture(autouse=True)
+def plain_role_calls(monkeypatch):
+    monkeypatch.setattr(config, "LLM_STREAMING", False)
+    monkeypatch.setattr(config, "LLM_MAX_CONCURRENCY", 3)
+    monkeypatch.setattr(config, "LLM_PROMPT_CACHE_MIN_TOKENS", 10 ** 6)
+
+
+def _agent(client):
+    agent = AgenticMortgageResearchAgent(llm_client=client)
+    agent.llm_cache = None
+    return agent
+
+
+def _role_lines(agent):
+    """Roles named by the per-call usage lines, in log order."""
+    return [role for line in agent.logs for role in ROLES if f"🧾 {role}:" in line]
+
+
+def test_results_and_logs_keep_role_order():
+    # The Planner finishes last, the Risk Officer first
+    client = FakeClaude(delay={"Planner": 0.3, "Market Analyst": 0.2, "Risk Officer": 0.1})
+    agent = _agent(client)
+
+    agent._llm_role_insights()
+
+    # Sent together, not one after another
+    assert sorted(client.events[:3]) == sorted(("sent", role) for role in ROLES)
+    assert [role for event, role in client.events if event == "done"] == ROLES[::-1]
+    assert list(agent.knowledge["role_insights"]) == ROLES
+    assert agent.knowledge["role_insights"]["Planner"] == "Planner reply"
+    assert _role_lines(agent) == ROLES
+    assert agent.session_cost == pytest.approx(0.006)
+
+
+def test_failing_role_reraises_after_other_costs_recorded():
+    client = FakeClaude(delay={"Planner": 0.1, "Risk Officer": 0.2}, fail=("Market Analyst",))
+    agent = _agent(client)
+
+    with pytest.raises(RuntimeError, match="Market Analyst call failed"):
+        agent._llm_role_insights()
+
+    assert agent.session_cost == pytest.approx(0.004)
+    assert agent.llm_usage["input_tokens"] == 20
+    assert _role_lines(agent) == ["Planner", "Risk Officer"]
+    assert "role_insights" not in agent.knowledge
+
+
+@pytest.fixture
+def cacheable_prefix(monkeypatch):
+    monkeypatch.setattr(config, "LLM_PROMPT_CACHING", True)
+    monkeypatch.setattr(config, "LLM_PROMPT_CACHE_MIN_TOKENS", 1)
+    monkeypatch.setattr(config, "LLM_PROMPT_CACHE_WAIT_SECONDS", 0.1)
+
+
+def test_other_roles_sent_once_first_reply_starts(cacheable_prefix):
+    client = FakeClaude(delay={"Planner": 0.3})
+    agent = _agent(client)
+
+    agent._llm_role_insights()
+
+    assert client.events[:2] == [("sent", "Planner"), ("first token", "Planner")]
+    # The others go out while the Planner is still streaming
+    assert {role for event, role in client.events[2:-1] if event == "sent"} == {"Market Analyst", "Risk Officer"}
+    assert client.events[-1] == ("done", "Planner")
+    assert not any("reply not started" in line for line in agent.logs)
+    assert list(agent.knowledge["role_insights"]) == ROLES
+
+
+def test_stalled_first_reply_stops_the_wait(cacheable_prefix):
+    client = FakeClaude(first_token_delay={"Planner": 0.5})
+    agent = _agent(client)
+
+    start = time.perf_counter()
+    agent._llm_role_insights()
+
+    sent = [role for event, role in client.events if event == "sent"]
+    assert sent[0] == "Planner" and set(sent[1:]) == {"Market Analyst", "Risk Officer"}
+    # The others went out before the Planner's first token, after the 0.1 s wait
+    assert client.events[-2:] == [("first token", "Planner"), ("done", "Planner")]
+    assert any("Planner: reply not started after 0.1s" in line for line in agent.logs)
+    assert time.perf_counter() - start < 0.9
+    assert list(agent.knowledge["role_insights"]) == ROLES
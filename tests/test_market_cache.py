@@ -0,0 +1,86 @@
+"""
+SingleFlight collapses concurrent calls for one key into a single execution:
+waiters get the leader's value, or its exception, and the key is released
+afterwards.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from market_cache import SingleFlight  # noqa: E402
+
+WAITERS = 4
+
+
+def _run_concurrently(flights, key, fn):
+    """Start the leader, wait until it is inside fn, then start WAITERS callers for the same key."""
+    with ThreadPoolExecutor(max_workers=WAITERS + 1) as pool:
+        leader = pool.submit(flights.do, key, fn)
+        fn.entered.wait(5)
+        waiters = [pool.submit(flights.do, key, fn) for _ in range(WAITERS)]
+        # Give the waiters time to find the in-flight key and block on the leader's outcome
+        time.sleep(0.2)
+        fn.release.set()
+        return leader, waiters
+
+
+class _BlockingCall:
+    def __init__(self, result=None, error=None):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+        self.result = result
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        self.entered.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    fn = _BlockingCall(result="frame")
+
+    leader, waiters = _run_concurrently(flights, "MORTGAGE30US", fn)
+
+    assert leader.result() == ("frame", False)
+    assert [w.result() for w in waiters] == [("frame", True)] * WAITERS
+    assert fn.calls == 1
+    assert flights.in_flight() == 0
+
+
+def test_waiters_receive_the_leaders_error():
+    flights = SingleFlight()
+    fn = _BlockingCall(error=ConnectionError("FRED down"))
+
+    leader, waiters = _run_concurrently(flights, "MORTGAGE30US", fn)
+
+    for future in [leader] + waiters:
+        with pytest.raises(ConnectionError, match="FRED down"):
+            future.result()
+    assert fn.calls == 1
+    assert flights.in_flight() == 0
+
+
+def test_later_calls_and_other_keys_run_again():
+    flights = SingleFlight()
+    calls = []
+
+    def fetch(key):
+        return lambda: calls.append(key) or key
+
+    assert flights.do("MORTGAGE30US", fetch("MORTGAGE30US")) == ("MORTGAGE30US", False)
+    assert flights.do("MORTGAGE30US", fetch("MORTGAGE30US")) == ("MORTGAGE30US", False)
+    assert flights.do("CSUSHPINSA", fetch("CSUSHPINSA")) == ("CSUSHPINSA", False)
+    assert calls == ["MORTGAGE30US", "MORTGAGE30US", "CSUSHPINSA"]
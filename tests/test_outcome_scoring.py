@@ -0,0 +1,61 @@
+"""
+One scoring rule for debate outcomes and the trend-signal backtest:
+validate_debate_outcome scores a saved debate with outcome_scoring, and
+trend_backtest's vectorized score_stances gives the same result per call.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DebateDatabase  # noqa: E402
+from outcome_scoring import BEARISH, BULLISH, NEUTRAL, score_stance, stance_of  # noqa: E402
+from trend_backtest import score_stances  # noqa: E402
+
+
+@pytest.mark.parametrize("stance, change, expected", [
+    (BEARISH, 0.0, (True, 0.0)),
+    (BEARISH, 0.35, (True, 100.0)),
+    (BEARISH, -0.1, (False, 0.0)),
+    (BULLISH, -0.14, (True, 40.0)),
+    (BULLISH, 0.0, (False, 0.0)),
+    (NEUTRAL, 0.3, (True, 50.0)),
+    (NEUTRAL, -0.4, (False, 0.0)),
+])
+def test_score_stance(stance, change, expected):
+    correct, accuracy = score_stance(stance, change, 7.0)
+    assert correct == expected[0]
+    assert accuracy == pytest.approx(expected[1])
+
+
+def test_stance_of_reads_bearish_first():
+    assert stance_of("Bearish, though some bullish signs") == BEARISH
+    assert stance_of("Mildly BULLISH") == BULLISH
+    assert stance_of(None) == NEUTRAL
+
+
+def test_vectorized_scores_match_scalar_rule():
+    rng = np.random.default_rng(0)
+    stances = rng.choice([BULLISH, BEARISH, NEUTRAL], 500)
+    change = rng.normal(0, 0.5, 500).round(2)
+    base = rng.uniform(3, 8, 500)
+
+    correct, accuracy = score_stances(stances, change, base)
+
+    expected = [score_stance(*args) for args in zip(stances, change, base)]
+    assert correct.tolist() == [c for c, _ in expected]
+    np.testing.assert_allclose(accuracy, [a for _, a in expected])
+
+
+def test_validate_debate_outcome_scores_with_the_shared_rule(tmp_path):
+    db = DebateDatabase(str(tmp_path / "debates.db"))
+    debate_id = db.save_debate("Stay BULLISH on refinancing", 0.8, 0.0, [], {"mortgage_rate": 7.0, "rate_12mo_avg": 6.8})
+
+    result = db.validate_debate_outcome(debate_id, current_rate=6.86)
+
+    assert result["status"] == "correct"
+    assert result["accuracy"] == pytest.approx(score_stance(BULLISH, 6.86 - 7.0, 7.0)[1])
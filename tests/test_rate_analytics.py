@@ -0,0 +1,67 @@
+"""
+The cumulative-sum rolling kernels and the blockwise EWMA match pandas
+rolling/ewm, and an incremental recompute matches one from scratch. Runs on
+the recorded mortgage-rate series (agent_state.json).
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fred_stub_server import load_recorded_series  # noqa: E402
+from rate_analytics import (  # noqa: E402
+    EWMA_SPAN, MA_WINDOWS, MOMENTUM_LAGS, VOLATILITY_WINDOW, compute_rate_analytics, ewma, rolling_mean, rolling_std,
+)
+
+
+@pytest.fixture(scope="module")
+def rates():
+    df = load_recorded_series()["MORTGAGE30US"]
+    return pd.DataFrame({"date": df["observation_date"], "rate": df["MORTGAGE30US"].astype(float)})
+
+
+@pytest.mark.parametrize("window", MA_WINDOWS)
+def test_rolling_mean_matches_pandas(rates, window):
+    expected = rates["rate"].rolling(window, min_periods=1).mean().to_numpy()
+    np.testing.assert_allclose(rolling_mean(rates["rate"].to_numpy(), window), expected, rtol=0, atol=1e-10)
+
+
+def test_rolling_std_matches_pandas(rates):
+    expected = rates["rate"].rolling(VOLATILITY_WINDOW, min_periods=1).std().to_numpy()
+    np.testing.assert_allclose(rolling_std(rates["rate"].to_numpy(), VOLATILITY_WINDOW), expected,
+                               rtol=0, atol=1e-10)
+
+
+def test_ewma_matches_pandas(rates):
+    expected = rates["rate"].ewm(span=EWMA_SPAN, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(ewma(rates["rate"].to_numpy(), EWMA_SPAN), expected, rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize("lag", MOMENTUM_LAGS)
+def test_momentum_matches_pandas(rates, lag):
+    expected = rates["rate"].diff(lag).to_numpy()
+    np.testing.assert_allclose(_analytics(rates)[f"momentum_{lag}"].to_numpy(), expected, rtol=0, atol=1e-10)
+
+
+def _analytics(rates, previous=None):
+    return compute_rate_analytics(rates["date"].to_numpy(), rates["rate"].to_numpy(), previous)
+
+
+def test_incremental_recompute_matches_full(rates):
+    previous = _analytics(rates.iloc[:-20])
+    updated = rates.copy()
+    updated.loc[updated.index[-30], "rate"] += 0.25  # a revision inside the reused rows' lookback
+
+    result = _analytics(updated, previous)
+
+    pd.testing.assert_frame_equal(result, _analytics(updated), rtol=0, atol=1e-10)
+
+
+def test_unchanged_rates_return_previous(rates):
+    previous = _analytics(rates)
+    assert _analytics(rates.copy(), previous) is previous
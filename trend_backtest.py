@@ -0,0 +1,90 @@
+"""
+Historical backtest of the heuristic trend signal.
+
+For every week of the rate history this reconstructs what analyze_rates would
+have said ("Rates Elevated" vs "Rates Cooling", i.e. rate above or below its
+52-week mean) and the BULLISH/BEARISH/NEUTRAL stance that implies, then scores
+it against the realised rate move at several horizons with the rule
+DebateDatabase.validate_debate_outcome applies to real debates
+(outcome_scoring.score_stance, vectorized over the whole series).
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import config
+from outcome_scoring import BEARISH, BULLISH, NEUTRAL, score_stance
+from rate_analytics import rolling_mean
+
+BACKTEST_HORIZONS = (4, 13, 26, 52)  # weeks ahead
+# analyze_rates' trend signal compares the rate with its 52-week mean (rate_analytics ma_52)
+SIGNAL_WINDOW = 52
+# Weeks before the 52-week mean is over a full year of data
+WARMUP_WEEKS = SIGNAL_WINDOW - 1
+# outcome_scoring.score_stance applied elementwise to arrays of stances, moves and base rates
+_score_stances = np.vectorize(score_stance, otypes=[bool, float])
+
+
+def score_stances(stances: np.ndarray, rate_change: np.ndarray, base_rate: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(correct, accuracy) arrays, one entry per call (see outcome_scoring.score_stance)."""
+    if len(stances) == 0:
+        return np.empty(0, dtype=bool), np.empty(0)
+    return _score_stances(stances, rate_change, base_rate)
+
+
+def signal_history(dates: np.ndarray, rates: np.ndarray, band: float = config.RATE_CHANGE_THRESHOLD) -> pd.DataFrame:
+    """Weekly trend_signal and stances for the whole series (date-sorted arrays, e.g. a SeriesStore's).
+
+    "trend" maps Elevated → BEARISH and Cooling → BULLISH; "banded" calls NEUTRAL
+    while the rate is within `band` points of its 52-week mean.
+    """
+    rate = np.asarray(rates, dtype=float)
+    spread = rate - rolling_mean(rate, SIGNAL_WINDOW)
+    elevated = spread > 0
+    return pd.DataFrame({
+        "date": dates,
+        "rate": rate,
+        "trend_signal": np.where(elevated, "Rates Elevated", "Rates Cooling"),
+        "trend": np.where(elevated, BEARISH, BULLISH),
+        "banded": np.where(spread > band, BEARISH, np.where(spread < -band, BULLISH, NEUTRAL)),
+    })
+
+
+def backtest_trend_signal(dates: np.ndarray, rates: np.ndarray, horizons=BACKTEST_HORIZONS,
+                          band: float = config.RATE_CHANGE_THRESHOLD) -> Optional[Dict]:
+    """Score the weekly signal at each horizon; None if the history is too short."""
+    signals = signal_history(dates, rates, band).iloc[WARMUP_WEEKS:].reset_index(drop=True)
+    rate = signals["rate"].to_numpy()
+    rows = []
+    for h in horizons:
+        if len(rate) <= h:
+            continue
+        change = rate[h:] - rate[:-h]
+        base = rate[:-h]
+        for rule in ("trend", "banded"):
+            stances = signals[rule].to_numpy()[:-h]
+            correct, accuracy = score_stances(stances, change, base)
+            row = {
+                "rule": rule,
+                "horizon_weeks": h,
+                "weeks": len(change),
+                "hit_rate": correct.mean() * 100,
+                "mean_accuracy": accuracy.mean(),
+                # Share of weeks in which rates rose or held: what always-BEARISH would score
+                "base_rate": (change >= 0).mean() * 100,
+            }
+            for stance in (BULLISH, BEARISH, NEUTRAL):
+                mask = stances == stance
+                row[f"{stance.lower()}_calls"] = int(mask.sum())
+                row[f"{stance.lower()}_hit_rate"] = correct[mask].mean() * 100 if mask.any() else np.nan
+            rows.append(row)
+    if not rows:
+        return None
+    return {
+        "summary": pd.DataFrame(rows),
+        "signals": signals,
+        "since": pd.Timestamp(signals["date"].iloc[0]),
+        "weeks": len(signals),
+    }